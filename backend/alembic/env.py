@@ -27,6 +27,7 @@ if config.config_file_name is not None:
 # add your model's MetaData object here
 # for 'autogenerate' support
 from app.db import Base
+import app.models  # noqa: F401 - registra todos os modelos no metadata
 target_metadata = Base.metadata
 
 # other values from the config, defined by the needs of env.py,
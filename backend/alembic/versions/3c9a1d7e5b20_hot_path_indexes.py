@@ -0,0 +1,67 @@
+"""hot path indexes
+
+Revision ID: 3c9a1d7e5b20
+Revises: f101ec5b7d66
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a1d7e5b20'
+down_revision: Union[str, Sequence[str], None] = 'f101ec5b7d66'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Pedidos por mesa (listagens e fechamento) e relatórios por período
+    op.create_index('ix_orders_table_id_created_at', 'orders', ['table_id', 'created_at'], unique=False)
+    op.create_index('ix_orders_created_at', 'orders', ['created_at'], unique=False)
+    op.create_index('ix_order_items_order_id_product_id', 'order_items', ['order_id', 'product_id'], unique=False)
+    op.create_index('ix_payments_order_id', 'payments', ['order_id'], unique=False)
+    op.create_index('ix_payments_created_at', 'payments', ['created_at'], unique=False)
+    # Fila de impressão: filtro por status e polling do próximo pendente
+    op.create_index('ix_print_queue_status_created_at', 'print_queue', ['status', 'created_at'], unique=False)
+    op.create_index(
+        'ix_print_queue_pending_created_at',
+        'print_queue',
+        ['created_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+        sqlite_where=sa.text("status = 'pending'"),
+    )
+    # Mesas: abertas/fechadas, consumo por quarto e relatórios por garçom
+    op.create_index('ix_tables_is_closed', 'tables', ['is_closed'], unique=False)
+    op.create_index('ix_tables_room_id_closed_at', 'tables', ['room_id', 'closed_at'], unique=False)
+    op.create_index('ix_tables_created_by_created_at', 'tables', ['created_by', 'created_at'], unique=False)
+    op.create_index('ix_tables_created_at', 'tables', ['created_at'], unique=False)
+    op.create_index(
+        'ix_tables_open_name',
+        'tables',
+        ['name'],
+        unique=False,
+        postgresql_where=sa.text('is_closed = false'),
+        sqlite_where=sa.text('is_closed = 0'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tables_open_name', table_name='tables')
+    op.drop_index('ix_tables_created_at', table_name='tables')
+    op.drop_index('ix_tables_created_by_created_at', table_name='tables')
+    op.drop_index('ix_tables_room_id_closed_at', table_name='tables')
+    op.drop_index('ix_tables_is_closed', table_name='tables')
+    op.drop_index('ix_print_queue_pending_created_at', table_name='print_queue')
+    op.drop_index('ix_print_queue_status_created_at', table_name='print_queue')
+    op.drop_index('ix_payments_created_at', table_name='payments')
+    op.drop_index('ix_payments_order_id', table_name='payments')
+    op.drop_index('ix_order_items_order_id_product_id', table_name='order_items')
+    op.drop_index('ix_orders_created_at', table_name='orders')
+    op.drop_index('ix_orders_table_id_created_at', table_name='orders')
@@ -0,0 +1,47 @@
+"""order totals columns
+
+Revision ID: 8b2f4c6a1d93
+Revises: 3c9a1d7e5b20
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8b2f4c6a1d93'
+down_revision: Union[str, Sequence[str], None] = '3c9a1d7e5b20'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('orders', sa.Column('total_amount', sa.Float(), server_default='0', nullable=False))
+    op.add_column('orders', sa.Column('total_items', sa.Integer(), server_default='0', nullable=False))
+    # Backfill dos pedidos existentes a partir dos itens
+    op.execute(
+        """
+        UPDATE orders SET
+            total_amount = COALESCE(
+                (SELECT SUM(order_items.unit_price * order_items.quantity)
+                 FROM order_items WHERE order_items.order_id = orders.id),
+                0
+            ),
+            total_items = COALESCE(
+                (SELECT SUM(order_items.quantity)
+                 FROM order_items WHERE order_items.order_id = orders.id),
+                0
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('orders') as batch_op:
+        batch_op.drop_column('total_items')
+        batch_op.drop_column('total_amount')
@@ -0,0 +1,169 @@
+"""archive tables
+
+Revision ID: b7e4f0a2d815
+Revises: a6d1e9c4f372
+Create Date: 2026-10-18 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7e4f0a2d815'
+down_revision: Union[str, Sequence[str], None] = 'a6d1e9c4f372'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Tabelas quentes que ganham AUTOINCREMENT no SQLite (ids arquivados não
+# podem ser reaproveitados)
+HOT_TABLES = ('print_queue', 'payments', 'order_items', 'orders', 'tables')
+
+
+def _column(name, type_, nullable=True):
+    return sa.Column(name, type_, autoincrement=False, nullable=nullable)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'archive_tables',
+        _column('id', sa.Integer(), nullable=False),
+        _column('name', sa.String(), nullable=False),
+        _column('is_closed', sa.Boolean()),
+        _column('created_by', sa.String(), nullable=False),
+        _column('created_at', sa.DateTime()),
+        _column('closed_at', sa.DateTime()),
+        _column('closed_by', sa.String()),
+        _column('business_date', sa.Date()),
+        _column('closed_business_date', sa.Date()),
+        _column('version_id', sa.Integer(), nullable=False),
+        _column('room_id', sa.Integer()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_archive_tables_business_date', 'archive_tables', ['business_date']
+    )
+    op.create_index(
+        'ix_archive_tables_room_id_closed_business_date',
+        'archive_tables',
+        ['room_id', 'closed_business_date'],
+    )
+    op.create_index(
+        'ix_archive_tables_created_by_created_at',
+        'archive_tables',
+        ['created_by', 'created_at'],
+    )
+
+    op.create_table(
+        'archive_orders',
+        _column('id', sa.Integer(), nullable=False),
+        _column('table_id', sa.Integer(), nullable=False),
+        _column('comment', sa.String()),
+        _column('status', sa.String(), nullable=False),
+        _column('created_at', sa.DateTime(timezone=True)),
+        _column('created_by', sa.String(), nullable=False),
+        _column('business_date', sa.Date()),
+        _column('business_hour', sa.Integer()),
+        _column('updated_at', sa.DateTime(timezone=True)),
+        _column('updated_by', sa.String()),
+        _column('cancelled_at', sa.DateTime(timezone=True)),
+        _column('cancelled_by', sa.String()),
+        _column('total_amount', sa.Integer(), nullable=False),
+        _column('total_items', sa.Integer(), nullable=False),
+        _column('version_id', sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archive_orders_table_id', 'archive_orders', ['table_id'])
+    op.create_index(
+        'ix_archive_orders_business_date_hour',
+        'archive_orders',
+        ['business_date', 'business_hour'],
+    )
+    op.create_index('ix_archive_orders_created_at', 'archive_orders', ['created_at'])
+
+    op.create_table(
+        'archive_order_items',
+        _column('id', sa.Integer(), nullable=False),
+        _column('order_id', sa.Integer(), nullable=False),
+        _column('product_id', sa.Integer(), nullable=False),
+        _column('quantity', sa.Integer(), nullable=False),
+        _column('unit_price', sa.Integer(), nullable=False),
+        _column('comment', sa.String()),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_archive_order_items_order_id_product_id',
+        'archive_order_items',
+        ['order_id', 'product_id'],
+    )
+
+    op.create_table(
+        'archive_payments',
+        _column('id', sa.Integer(), nullable=False),
+        _column('order_id', sa.Integer(), nullable=False),
+        _column('method', sa.String(), nullable=False),
+        _column('status', sa.String(), nullable=False),
+        _column('amount', sa.Integer(), nullable=False),
+        _column('amount_paid', sa.Integer(), nullable=False),
+        _column('change', sa.Integer()),
+        _column('service_tax', sa.Integer()),
+        _column('service_tax_included', sa.String()),
+        _column('created_at', sa.DateTime(timezone=True)),
+        _column('business_date', sa.Date()),
+        _column('business_hour', sa.Integer()),
+        _column('paid_at', sa.DateTime(timezone=True)),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_archive_payments_order_id', 'archive_payments', ['order_id'])
+    op.create_index(
+        'ix_archive_payments_business_date', 'archive_payments', ['business_date']
+    )
+    op.create_index(
+        'ix_archive_payments_created_at', 'archive_payments', ['created_at']
+    )
+
+    op.create_table(
+        'archive_print_queue',
+        _column('id', sa.Integer(), nullable=False),
+        _column('type', sa.String(), nullable=False),
+        _column('order_id', sa.Integer()),
+        _column('table_id', sa.Integer(), nullable=False),
+        _column('content', sa.String(), nullable=False),
+        _column('status', sa.String(), nullable=False),
+        _column('created_at', sa.DateTime(), nullable=False),
+        _column('printed_at', sa.DateTime()),
+        _column('printer', sa.String()),
+        _column('retry_count', sa.Integer(), nullable=False),
+        _column('error_message', sa.String()),
+        _column('fiscal', sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(
+        'ix_archive_print_queue_table_id', 'archive_print_queue', ['table_id']
+    )
+    op.create_index('ix_print_queue_table_id', 'print_queue', ['table_id'])
+
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in HOT_TABLES:
+            with op.batch_alter_table(
+                table,
+                recreate='always',
+                table_kwargs={'sqlite_autoincrement': True},
+            ):
+                pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_print_queue_table_id', table_name='print_queue')
+    for table in (
+        'archive_print_queue',
+        'archive_payments',
+        'archive_order_items',
+        'archive_orders',
+        'archive_tables',
+    ):
+        op.drop_table(table)
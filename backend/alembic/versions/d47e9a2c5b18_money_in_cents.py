@@ -0,0 +1,56 @@
+"""money in cents
+
+Revision ID: d47e9a2c5b18
+Revises: 8b2f4c6a1d93
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd47e9a2c5b18'
+down_revision: Union[str, Sequence[str], None] = '8b2f4c6a1d93'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Colunas de dinheiro: Float em reais -> Integer em centavos
+MONEY_COLUMNS = {
+    'products': ['price'],
+    'order_items': ['unit_price'],
+    'orders': ['total_amount'],
+    'payments': ['amount', 'amount_paid', 'change', 'service_tax'],
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table, columns in MONEY_COLUMNS.items():
+        for column in columns:
+            op.execute(f'UPDATE {table} SET "{column}" = ROUND("{column}" * 100)')
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Float(),
+                    type_=sa.Integer(),
+                    postgresql_using=f'"{column}"::integer',
+                )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table, columns in MONEY_COLUMNS.items():
+        with op.batch_alter_table(table) as batch_op:
+            for column in columns:
+                batch_op.alter_column(
+                    column,
+                    existing_type=sa.Integer(),
+                    type_=sa.Float(),
+                    postgresql_using=f'"{column}"::double precision',
+                )
+        for column in columns:
+            op.execute(f'UPDATE {table} SET "{column}" = "{column}" / 100.0')
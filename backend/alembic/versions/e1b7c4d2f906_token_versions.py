@@ -0,0 +1,48 @@
+"""token versions
+
+Revision ID: e1b7c4d2f906
+Revises: d9a4b6c3e785
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e1b7c4d2f906'
+down_revision: Union[str, Sequence[str], None] = 'd9a4b6c3e785'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TABLES = ('users', 'clients')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in TABLES:
+        op.add_column(
+            table,
+            sa.Column(
+                'token_version', sa.Integer(), server_default='1', nullable=False
+            ),
+        )
+    # A revogação de tokens é indexada pelo id: no SQLite, sem AUTOINCREMENT,
+    # o id do último usuário ou cliente excluído voltaria no próximo cadastro
+    if op.get_bind().dialect.name == 'sqlite':
+        for table in TABLES:
+            with op.batch_alter_table(
+                table,
+                recreate='always',
+                table_kwargs={'sqlite_autoincrement': True},
+            ):
+                pass
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('token_version')
@@ -0,0 +1,117 @@
+"""business date columns
+
+Revision ID: e5a3c8f1b264
+Revises: d47e9a2c5b18
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from app.core.business_day import business_date, business_hour
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a3c8f1b264'
+down_revision: Union[str, Sequence[str], None] = 'd47e9a2c5b18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 1000
+
+
+def _backfill(table: str, columns: dict) -> None:
+    """Preenche as colunas de dia comercial a partir de ``columns[coluna]``.
+
+    O fuso e o corte dependem da configuração, então a conversão é feita em
+    Python, em lotes.
+    """
+    bind = op.get_bind()
+    source = sa.table(
+        table,
+        sa.column('id', sa.Integer()),
+        *(sa.column(name, sa.DateTime()) for name in set(columns.values())),
+    )
+    target = sa.table(table, sa.column('id'), *(sa.column(name) for name in columns))
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(source)
+            .where(source.c.id > last_id)
+            .order_by(source.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        values = []
+        for row in rows:
+            value = {'row_id': row.id}
+            for name, moment_column in columns.items():
+                moment = row._mapping[moment_column]
+                if moment is None:
+                    value[name] = None
+                elif name.endswith('_hour'):
+                    value[name] = business_hour(moment)
+                else:
+                    value[name] = business_date(moment)
+            values.append(value)
+        bind.execute(
+            target.update()
+            .where(target.c.id == sa.bindparam('row_id'))
+            .values({name: sa.bindparam(name) for name in columns}),
+            values,
+        )
+        last_id = rows[-1].id
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in ('orders', 'payments'):
+        op.add_column(table, sa.Column('business_date', sa.Date(), nullable=True))
+        op.add_column(table, sa.Column('business_hour', sa.Integer(), nullable=True))
+        _backfill(
+            table, {'business_date': 'created_at', 'business_hour': 'created_at'}
+        )
+    op.add_column('tables', sa.Column('business_date', sa.Date(), nullable=True))
+    op.add_column(
+        'tables', sa.Column('closed_business_date', sa.Date(), nullable=True)
+    )
+    _backfill(
+        'tables', {'business_date': 'created_at', 'closed_business_date': 'closed_at'}
+    )
+
+    op.create_index(
+        'ix_orders_business_date_hour',
+        'orders',
+        ['business_date', 'business_hour'],
+        unique=False,
+    )
+    op.create_index(
+        'ix_payments_business_date', 'payments', ['business_date'], unique=False
+    )
+    op.create_index(
+        'ix_tables_business_date', 'tables', ['business_date'], unique=False
+    )
+    op.create_index(
+        'ix_tables_room_id_closed_business_date',
+        'tables',
+        ['room_id', 'closed_business_date'],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_tables_room_id_closed_business_date', table_name='tables')
+    op.drop_index('ix_tables_business_date', table_name='tables')
+    op.drop_index('ix_payments_business_date', table_name='payments')
+    op.drop_index('ix_orders_business_date_hour', table_name='orders')
+    with op.batch_alter_table('tables') as batch_op:
+        batch_op.drop_column('closed_business_date')
+        batch_op.drop_column('business_date')
+    for table in ('payments', 'orders'):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('business_hour')
+            batch_op.drop_column('business_date')
@@ -0,0 +1,36 @@
+"""version id columns
+
+Revision ID: f3b8d2a6c917
+Revises: e5a3c8f1b264
+Create Date: 2026-10-18 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f3b8d2a6c917'
+down_revision: Union[str, Sequence[str], None] = 'e5a3c8f1b264'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+VERSIONED_TABLES = ('orders', 'tables', 'products')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    for table in VERSIONED_TABLES:
+        op.add_column(
+            table,
+            sa.Column('version_id', sa.Integer(), server_default='1', nullable=False),
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for table in VERSIONED_TABLES:
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.drop_column('version_id')
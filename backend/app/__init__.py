@@ -7,6 +7,7 @@ mesas, produtos e usuários de um sistema de quiosque.
 
 __version__ = "1.0.0"
 
+import asyncio
 import json
 import platform
 import sys
@@ -16,10 +17,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 from sqlalchemy import text
+from sqlalchemy.orm.exc import StaleDataError
 
 from app.api import (
     auth,
     categories,
+    changes,
+    client_auth,
+    metrics,
     payments,
     print_queue,
     print_queues,
@@ -31,24 +36,39 @@ from app.api import (
     users,
 )
 from app.core.config import Settings
+from app.core.metrics import MetricsMiddleware, mark_process_dead
+from app.core.query_counter import QueryCountMiddleware
+from app.core.revocation import run_revocation_sync
+from app.core.security import shutdown_bcrypt_pool
+from app.core.server_timing import TimedRoute
+from app.core.versioning import stale_data_handler
 from app.db import Base, SessionLocal, engine
 from app.middleware_logging import LoggingMiddleware
 from app.crud.user import create_user, get_user_by_username
 from app.schemas.user import UserCreate, RoleEnum
 
-# Configurar Loguru para logs JSON
+settings = Settings()
+
+# Configurar Loguru para logs JSON. enqueue: a serialização e a escrita no
+# stdout rodam numa thread do loguru, fora do event loop
 logger.remove()
-logger.add(sys.stdout, serialize=True, backtrace=True, diagnose=True)
+logger.add(
+    sys.stdout,
+    serialize=True,
+    enqueue=True,
+    backtrace=True,
+    diagnose=settings.LOG_DIAGNOSE,
+)
 
 app = FastAPI()
+# Rotas declaradas direto no app (/health) também medem handler/serialização
+app.router.route_class = TimedRoute
 
 app.title = "FastAPI Restaurant Management"
 app.description = "A simple restaurant management system built with FastAPI."
 app.version = "1.0.0"
 
 # Configuração CORS
-settings = Settings()
-
 # Para desenvolvimento: liberar toda rede interna
 if settings.DEBUG:
     app.add_middleware(
@@ -69,18 +89,27 @@ else:
     )
 
 app.add_middleware(LoggingMiddleware)
+app.add_middleware(MetricsMiddleware)
+# Mais externo: o contador de SQL cobre toda a requisição, inclusive o log
+app.add_middleware(QueryCountMiddleware, enforce=settings.SQL_QUERY_BUDGET_ENFORCE)
+
+# Escrita concorrente perdida (version_id_col) responde 409
+app.add_exception_handler(StaleDataError, stale_data_handler)
 
 # Rotas
 app.include_router(auth.router)
 app.include_router(users.router)
+app.include_router(client_auth.router)
 app.include_router(categories.router)
 app.include_router(tables.router)
 app.include_router(products.router)
 app.include_router(reports.router)
 app.include_router(rooms.router)
 app.include_router(system_status.router)
+app.include_router(changes.router)
 app.include_router(print_queue.router)
 app.include_router(print_queues.router)
+app.include_router(metrics.router)
 
 
 @app.get("/health", tags=["Health"])
@@ -119,6 +148,7 @@ async def startup_event():
                     role=RoleEnum.ADMINISTRATOR,
                 )
                 create_user(db, admin_data)
+                db.commit()
                 logger.info("✅ Usuário admin criado com sucesso!")
                 logger.info("📋 Credenciais padrão: admin / admin123")
             else:
@@ -130,3 +160,16 @@ async def startup_event():
         logger.error(f"❌ Erro durante configuração automática: {e}")
         # Não falhar a aplicação se não conseguir configurar
         logger.warning("⚠️ Aplicação continuará sem configuração automática")
+
+    # Revogação de tokens: carrega as versões dos usuários e acompanha o feed
+    app.state.revocation_sync = asyncio.create_task(run_revocation_sync(SessionLocal))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Encerra a sincronização de revogações, o pool de bcrypt e os logs."""
+    app.state.revocation_sync.cancel()
+    shutdown_bcrypt_pool()
+    mark_process_dead()
+    # Esvazia a fila do sink de logs
+    await logger.complete()
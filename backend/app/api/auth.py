@@ -1,24 +1,94 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import math
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
 
-from app.core.security import create_access_token, verify_password
-from app.crud.user import get_user_by_username
+from app.core.metrics import LOGIN_ATTEMPTS
+from app.core.rate_limit import login_rate_limiter
+from app.core.security import (
+    create_user_token,
+    hash_password_async,
+    password_needs_rehash,
+    verify_password_async,
+)
+from app.core.server_timing import TimedRoute
+from app.crud.refresh_token import (
+    issue_refresh_token,
+    revoke_refresh_token,
+    rotate_refresh_token,
+)
+from app.crud.user import get_user_by_username, update_user_password
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
-from app.schemas.auth import LoginRequest, Token, TokenData
+from app.schemas.auth import LoginRequest, RefreshRequest, Token, TokenData
 
-router = APIRouter(prefix="/login", tags=["Auth"])
+router = APIRouter(prefix="/login", tags=["Auth"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=Token)
-def login(
-    form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)
+async def login(
+    request: Request,
+    form_data: OAuth2PasswordRequestForm = Depends(),
+    db: DbSession = Depends(get_db),
 ):
-    user = get_user_by_username(db, form_data.username)
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    # Recusa rajadas antes de ir ao banco ou gastar CPU com bcrypt
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await login_rate_limiter.check(form_data.username, client_ip)
+    if retry_after:
+        LOGIN_ATTEMPTS.labels("user", "rate_limited").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    user = await run_db(db, get_user_by_username, form_data.username)
+    # bcrypt é CPU-bound: roda no pool de processos próprio
+    if not user or not await verify_password_async(
+        form_data.password, user.hashed_password
+    ):
+        LOGIN_ATTEMPTS.labels("user", "failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
         )
-    token = create_access_token(data={"sub": user.username, "role": user.role})
-    return {"access_token": token, "token_type": "bearer"}
+    # BCRYPT_ROUNDS mudou: refaz o hash com a senha que acabou de conferir
+    if password_needs_rehash(user.hashed_password):
+        hashed_password = await hash_password_async(form_data.password)
+        await run_db_commit(db, update_user_password, user.username, hashed_password)
+    refresh_token = await run_db_commit(db, issue_refresh_token, user.username)
+    token = create_user_token(user)
+    LOGIN_ATTEMPTS.labels("user", "success").inc()
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/refresh", response_model=Token)
+async def refresh(body: RefreshRequest, db: DbSession = Depends(get_db)):
+    """Troca o refresh token por um novo access token, sem conferir senha.
+
+    O refresh token é de uso único: a resposta traz o próximo.
+    """
+    rotated = await run_db_commit(db, rotate_refresh_token, body.refresh_token)
+    if rotated is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+    user, refresh_token = rotated
+    token = create_user_token(user)
+    return {
+        "access_token": token,
+        "token_type": "bearer",
+        "refresh_token": refresh_token,
+    }
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(body: RefreshRequest, db: DbSession = Depends(get_db)):
+    """Revoga o refresh token (e os renovados a partir do mesmo login)."""
+    await run_db_commit(db, revoke_refresh_token, body.refresh_token)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
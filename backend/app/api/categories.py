@@ -3,22 +3,23 @@ from typing import List, Optional
 
 from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, status, UploadFile
 from fastapi.responses import Response
-from sqlalchemy.orm import Session
 
+from app.core.server_timing import TimedRoute
 from app.crud import category as category_crud
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
 from app.schemas import category as category_schema
 from app.schemas.auth import TokenData
 
-router = APIRouter(prefix="/categories", tags=["Categories"])
+router = APIRouter(prefix="/categories", tags=["Categories"], route_class=TimedRoute)
 
 
 @router.post(
     "/", response_model=category_schema.CategoryOut, status_code=status.HTTP_201_CREATED
 )
-def create_category(
+async def create_category(
     category_in: category_schema.CategoryCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Cria uma nova categoria de produto."""
@@ -28,34 +29,38 @@ def create_category(
         )
 
     # Verificar se já existe uma categoria com o mesmo nome
-    existing_category = category_crud.get_category_by_name(db, category_in.name)
+    existing_category = await run_db(
+        db, category_crud.get_category_by_name, category_in.name
+    )
     if existing_category:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Já existe uma categoria com o nome '{category_in.name}'"
         )
 
-    return category_crud.create_category(db, category_in)
+    return await run_db_commit(db, category_crud.create_category, category_in)
 
 
 @router.get("/", response_model=List[category_schema.CategoryOut])
-def get_categories(
+async def get_categories(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Lista todas as categorias, opcionalmente filtradas por status ativo."""
-    return category_crud.get_all_categories(db, is_active)
+    return await run_db(db, category_crud.get_all_categories, is_active)
 
 
 @router.get("/{category_id}", response_model=category_schema.CategoryOut)
-def get_category(
+async def get_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Busca uma categoria específica pelo ID."""
-    category = category_crud.get_category_with_print_queue(db, category_id)
+    category = await run_db(
+        db, category_crud.get_category_with_print_queue, category_id
+    )
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
@@ -80,10 +85,10 @@ def get_category(
 
 
 @router.patch("/{category_id}", response_model=category_schema.CategoryOut)
-def update_category(
+async def update_category(
     category_id: int,
     updates: category_schema.CategoryUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Atualiza uma categoria existente."""
@@ -92,7 +97,7 @@ def update_category(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    category = category_crud.get_category(db, category_id)
+    category = await run_db(db, category_crud.get_category, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
@@ -100,20 +105,22 @@ def update_category(
 
     # Se estiver tentando atualizar o nome, verificar se já existe
     if updates.name and updates.name != category.name:
-        existing_category = category_crud.get_category_by_name(db, updates.name)
+        existing_category = await run_db(
+            db, category_crud.get_category_by_name, updates.name
+        )
         if existing_category:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f"Já existe uma categoria com o nome '{updates.name}'"
             )
 
-    return category_crud.update_category(db, category, updates)
+    return await run_db_commit(db, category_crud.update_category, category, updates)
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Remove uma categoria."""
@@ -122,7 +129,7 @@ def delete_category(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    category = category_crud.get_category(db, category_id)
+    category = await run_db(db, category_crud.get_category, category_id)
     if not category:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Category not found"
@@ -135,4 +142,4 @@ def delete_category(
             detail=f"Não é possível excluir a categoria '{category.name}' pois ela possui produtos associados"
         )
 
-    category_crud.delete_category(db, category) 
\ No newline at end of file
+    await run_db_commit(db, category_crud.delete_category, category) 
\ No newline at end of file
@@ -0,0 +1,76 @@
+"""
+Endpoints do feed de alterações.
+
+Clientes guardam o ``cursor`` e perguntam só pelo que mudou depois dele,
+em vez de recarregar ``/tables/`` ou ``/print-queue/all`` inteiros. Para
+começar: ler o cursor atual em ``/changes/cursor``, carregar o estado
+completo e, a partir daí, seguir ``/changes/?after=<cursor>``.
+
+Eventos de usuários e clientes (nomes, credenciais) só aparecem para
+administradores.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+
+from app.core.query_counter import query_budget
+from app.core.server_timing import TimedRoute
+from app.crud import change_event as change_event_crud
+from app.db import DbSession, run_db
+from app.dependencies import get_current_user, get_db
+from app.schemas.auth import TokenData
+from app.schemas.change_event import ChangeCursor, ChangeFeed
+
+router = APIRouter(prefix="/changes", tags=["Changes"], route_class=TimedRoute)
+
+# Entidades fora do feed de quem não é administrador
+ADMIN_ONLY_ENTITIES = ("user", "client")
+
+
+@router.get("/", response_model=ChangeFeed)
+@query_budget(1)
+async def get_changes(
+    after: int = Query(0, ge=0, description="Cursor: id do último evento visto"),
+    limit: int = Query(100, ge=1, le=1000),
+    entity: Optional[str] = Query(
+        None, description="order, table, product, print_queue ou payment"
+    ),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Eventos gravados depois do cursor ``after``, em ordem."""
+    exclude_entities = ()
+    if current_user.role != "administrator":
+        if entity in ADMIN_ONLY_ENTITIES:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Only administrators can read user and client changes",
+            )
+        exclude_entities = ADMIN_ONLY_ENTITIES
+    # Um evento a mais só para saber se ainda há o que ler
+    events = await run_db(
+        db,
+        change_event_crud.get_changes,
+        after,
+        limit + 1,
+        entity,
+        exclude_entities=exclude_entities,
+    )
+    has_more = len(events) > limit
+    events = events[:limit]
+    return {
+        "events": events,
+        "cursor": events[-1].id if events else after,
+        "has_more": has_more,
+    }
+
+
+@router.get("/cursor", response_model=ChangeCursor)
+@query_budget(1)
+async def get_change_cursor(
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Cursor atual do feed (id do último evento gravado)."""
+    return {"cursor": await run_db(db, change_event_crud.get_last_change_id)}
@@ -2,12 +2,19 @@
 Endpoints para autenticação de clientes.
 
 Este módulo contém os endpoints para autenticação e gerenciamento de clientes.
+Clientes são os agentes de impressão: fazem login com ``client_id`` e
+``client_secret`` e recebem um token de longa duração limitado aos seus
+escopos, sem usar a senha de nenhum garçom.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+import math
 
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+
+from app.core.metrics import LOGIN_ATTEMPTS
+from app.core.rate_limit import login_rate_limiter
 from app.core.security import create_client_token
+from app.core.server_timing import TimedRoute
 from app.crud.client import (
     authenticate_client,
     create_client,
@@ -15,46 +22,84 @@ from app.crud.client import (
     get_client_by_client_id_str,
     get_client_by_id,
     get_clients,
+    rotate_client_secret,
     update_client,
 )
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
+from app.schemas.auth import TokenData
 from app.schemas.client import (
     ClientCreate,
     ClientLogin,
     ClientResponse,
+    ClientSecretResponse,
     ClientToken,
     ClientUpdate,
 )
 
-router = APIRouter(prefix="/client", tags=["Client Auth"])
+router = APIRouter(prefix="/client", tags=["Client Auth"], route_class=TimedRoute)
+
+
+def _with_secret(created) -> ClientSecretResponse:
+    client, client_secret = created
+    response = ClientResponse.model_validate(client)
+    return ClientSecretResponse(**response.model_dump(), client_secret=client_secret)
 
 
 @router.post("/login", response_model=ClientToken)
-def client_login(client_login: ClientLogin, db: Session = Depends(get_db)):
+async def client_login(
+    client_login: ClientLogin, request: Request, db: DbSession = Depends(get_db)
+):
     """Endpoint para login de clientes usando client_id e client_secret."""
-    client = authenticate_client(db, client_login.client_id, client_login.client_secret)
+    client_ip = request.client.host if request.client else "unknown"
+    retry_after = await login_rate_limiter.check(client_login.client_id, client_ip)
+    if retry_after:
+        LOGIN_ATTEMPTS.labels("client", "rate_limited").inc()
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many login attempts, try again later",
+            headers={"Retry-After": str(math.ceil(retry_after))},
+        )
+
+    client = await run_db(
+        db, authenticate_client, client_login.client_id, client_login.client_secret
+    )
     if not client:
+        LOGIN_ATTEMPTS.labels("client", "failure").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid client credentials",
         )
-
-    token = create_client_token(client_id=client.client_id, role=client.role)
+    LOGIN_ATTEMPTS.labels("client", "success").inc()
+
+    token = create_client_token(
+        client_id=client.client_id,
+        role=client.role,
+        scopes=client.scopes,
+        client_pk=client.id,
+        token_version=client.token_version,
+    )
     return {
         "access_token": token,
         "token_type": "bearer",
         "client_id": client.client_id,
         "role": client.role,
+        "scopes": client.scopes,
     }
 
 
-@router.post("/", response_model=ClientResponse)
-def create_new_client(
+@router.post(
+    "/", response_model=ClientSecretResponse, status_code=status.HTTP_201_CREATED
+)
+async def create_new_client(
     client: ClientCreate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
-    """Cria um novo cliente (apenas administradores)."""
+    """Cria um novo cliente (apenas administradores).
+
+    A resposta traz o ``client_secret`` gerado; ele não é exibido de novo.
+    """
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -62,22 +107,22 @@ def create_new_client(
         )
 
     # Verifica se já existe um cliente com o mesmo client_id
-    existing_client = get_client_by_client_id_str(db, client.client_id)
+    existing_client = await run_db(db, get_client_by_client_id_str, client.client_id)
     if existing_client:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Client ID already exists",
         )
 
-    return create_client(db, client)
+    return _with_secret(await run_db_commit(db, create_client, client))
 
 
 @router.get("/", response_model=list[ClientResponse])
-def list_clients(
+async def list_clients(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
     """Lista todos os clientes (apenas administradores)."""
     if current_user.role != "administrator":
@@ -86,14 +131,14 @@ def list_clients(
             detail="Only administrators can list clients",
         )
 
-    return get_clients(db, skip=skip, limit=limit)
+    return await run_db(db, get_clients, skip=skip, limit=limit)
 
 
 @router.get("/{client_id}", response_model=ClientResponse)
-def get_client(
+async def get_client(
     client_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
     """Obtém um cliente específico (apenas administradores)."""
     if current_user.role != "administrator":
@@ -102,7 +147,7 @@ def get_client(
             detail="Only administrators can view client details",
         )
 
-    client = get_client_by_id(db, client_id)
+    client = await run_db(db, get_client_by_id, client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -113,11 +158,11 @@ def get_client(
 
 
 @router.put("/{client_id}", response_model=ClientResponse)
-def update_client_details(
+async def update_client_details(
     client_id: int,
     client_update: ClientUpdate,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
     """Atualiza um cliente (apenas administradores)."""
     if current_user.role != "administrator":
@@ -126,7 +171,7 @@ def update_client_details(
             detail="Only administrators can update clients",
         )
 
-    client = update_client(db, client_id, client_update)
+    client = await run_db_commit(db, update_client, client_id, client_update)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -136,11 +181,34 @@ def update_client_details(
     return client
 
 
+@router.post("/{client_id}/rotate-secret", response_model=ClientSecretResponse)
+async def rotate_secret(
+    client_id: int,
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Gera um novo segredo para o cliente (apenas administradores)."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Only administrators can update clients",
+        )
+
+    rotated = await run_db_commit(db, rotate_client_secret, client_id)
+    if not rotated:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client not found",
+        )
+
+    return _with_secret(rotated)
+
+
 @router.delete("/{client_id}")
-def delete_client_endpoint(
+async def delete_client_endpoint(
     client_id: int,
-    db: Session = Depends(get_db),
-    current_user: dict = Depends(get_current_user),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
 ):
     """Remove um cliente (apenas administradores)."""
     if current_user.role != "administrator":
@@ -149,7 +217,7 @@ def delete_client_endpoint(
             detail="Only administrators can delete clients",
         )
 
-    success = delete_client(db, client_id)
+    success = await run_db_commit(db, delete_client, client_id)
     if not success:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -0,0 +1,34 @@
+"""
+Endpoint de métricas Prometheus.
+
+Sem autenticação, como o ``/health``: é lido pelo Prometheus da rede
+interna. As métricas estão descritas em ``app.core.metrics``.
+"""
+
+from datetime import datetime
+
+from fastapi import APIRouter, Depends, Response
+from prometheus_client import CONTENT_TYPE_LATEST
+from starlette.concurrency import run_in_threadpool
+
+from app.core.metrics import generate_metrics, print_queue_metrics
+from app.core.query_counter import query_budget
+from app.core.server_timing import TimedRoute
+from app.crud import print_queue as print_queue_crud
+from app.db import DbSession, run_db
+from app.dependencies import get_db
+
+router = APIRouter(tags=["Metrics"], route_class=TimedRoute)
+
+
+@router.get("/metrics", include_in_schema=False)
+@query_budget(1)
+async def metrics(db: DbSession = Depends(get_db)):
+    """Métricas no formato texto do Prometheus."""
+    pending, oldest = await run_db(db, print_queue_crud.get_pending_print_queue_summary)
+    oldest_age = (datetime.utcnow() - oldest).total_seconds() if oldest else None
+    # No modo multiprocesso o scrape lê os arquivos de todos os workers
+    content = await run_in_threadpool(
+        generate_metrics, print_queue_metrics(pending, oldest_age)
+    )
+    return Response(content=content, media_type=CONTENT_TYPE_LATEST)
@@ -7,9 +7,10 @@ Este módulo contém os endpoints para gerenciar configurações de filas de imp
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
+from app.core.server_timing import TimedRoute
 from app.crud import print_queue_config as print_queue_config_crud
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
 from app.schemas.auth import TokenData
 from app.schemas.print_queue_config import (
@@ -18,12 +19,14 @@ from app.schemas.print_queue_config import (
     PrintQueueConfigUpdate,
 )
 
-router = APIRouter(prefix="/print-queues", tags=["Print Queues"])
+router = APIRouter(
+    prefix="/print-queues", tags=["Print Queues"], route_class=TimedRoute
+)
 
 
 @router.get("/", response_model=List[PrintQueueConfigOut])
-def get_print_queues(
-    db: Session = Depends(get_db),
+async def get_print_queues(
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Lista todas as filas de impressão."""
@@ -33,13 +36,13 @@ def get_print_queues(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    return print_queue_config_crud.get_all_print_queue_configs(db)
+    return await run_db(db, print_queue_config_crud.get_all_print_queue_configs)
 
 
 @router.get("/{print_queue_id}", response_model=PrintQueueConfigOut)
-def get_print_queue(
+async def get_print_queue(
     print_queue_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Busca uma fila de impressão específica."""
@@ -49,7 +52,9 @@ def get_print_queue(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    print_queue = print_queue_config_crud.get_print_queue_config(db, print_queue_id)
+    print_queue = await run_db(
+        db, print_queue_config_crud.get_print_queue_config, print_queue_id
+    )
     if not print_queue:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Print queue not found"
@@ -58,9 +63,9 @@ def get_print_queue(
 
 
 @router.post("/", response_model=PrintQueueConfigOut, status_code=status.HTTP_201_CREATED)
-def create_print_queue(
+async def create_print_queue(
     print_queue_in: PrintQueueConfigCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Cria uma nova fila de impressão."""
@@ -70,14 +75,16 @@ def create_print_queue(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    return print_queue_config_crud.create_print_queue_config(db, print_queue_in)
+    return await run_db_commit(
+        db, print_queue_config_crud.create_print_queue_config, print_queue_in
+    )
 
 
 @router.put("/{print_queue_id}", response_model=PrintQueueConfigOut)
-def update_print_queue(
+async def update_print_queue(
     print_queue_id: int,
     print_queue_update: PrintQueueConfigUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Atualiza uma fila de impressão existente."""
@@ -87,8 +94,11 @@ def update_print_queue(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    print_queue = print_queue_config_crud.update_print_queue_config(
-        db, print_queue_id, print_queue_update
+    print_queue = await run_db_commit(
+        db,
+        print_queue_config_crud.update_print_queue_config,
+        print_queue_id,
+        print_queue_update,
     )
     if not print_queue:
         raise HTTPException(
@@ -98,9 +108,9 @@ def update_print_queue(
 
 
 @router.delete("/{print_queue_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_print_queue(
+async def delete_print_queue(
     print_queue_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Remove uma fila de impressão."""
@@ -111,7 +121,9 @@ def delete_print_queue(
         )
     
     try:
-        success = print_queue_config_crud.delete_print_queue_config(db, print_queue_id)
+        success = await run_db_commit(
+            db, print_queue_config_crud.delete_print_queue_config, print_queue_id
+        )
         if not success:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="Print queue not found"
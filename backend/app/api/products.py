@@ -1,24 +1,37 @@
 import os
 from typing import List, Optional
 
-from fastapi import APIRouter, Body, Depends, File, HTTPException, Query, status, UploadFile
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    File,
+    Header,
+    HTTPException,
+    Query,
+    status,
+    UploadFile,
+)
 from fastapi.responses import Response
 from sqlalchemy.orm import Session
 
+from app.core.server_timing import TimedRoute
+from app.core.versioning import check_if_match, set_etag
 from app.crud import product as product_crud
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
 from app.schemas import product as product_schema
 from app.schemas.auth import TokenData
 
-router = APIRouter(prefix="/products", tags=["Products"])
+router = APIRouter(prefix="/products", tags=["Products"], route_class=TimedRoute)
 
 
 @router.post(
     "/", response_model=product_schema.ProductOut, status_code=status.HTTP_201_CREATED
 )
-def create_product(
+async def create_product(
     product_in: product_schema.ProductCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -26,39 +39,41 @@ def create_product(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    return product_crud.create_product(db, product_in)
+    return await run_db_commit(db, product_crud.create_product, product_in)
 
 
 @router.get("/", response_model=List[product_schema.ProductWithCategory])
-def get_products(
+async def get_products(
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
     category_id: Optional[int] = Query(None, description="Filter by category ID"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Lista produtos com informações de suas categorias."""
-    return product_crud.get_all_products(db, is_active, category_id)
+    return await run_db(db, product_crud.get_all_products, is_active, category_id)
 
 
 @router.get("/{product_id}", response_model=product_schema.ProductWithCategory)
-def get_product(
+async def get_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Busca um produto específico com informações da sua categoria."""
-    product = product_crud.get_product_with_category(db, product_id)
+    product = await run_db(db, product_crud.get_product_with_category, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
+    set_etag(response, product)
     return product
 
 
 @router.delete("/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_product(
+async def delete_product(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -66,20 +81,22 @@ def delete_product(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    product = product_crud.get_product(db, product_id)
+    product = await run_db(db, product_crud.get_product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
 
-    product_crud.delete_product(db, product)
+    await run_db_commit(db, product_crud.delete_product, product)
 
 
 @router.patch("/{product_id}", response_model=product_schema.ProductOut)
-def update_product(
+async def update_product(
     product_id: int,
     updates: product_schema.ProductUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -87,57 +104,74 @@ def update_product(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    product = product_crud.get_product(db, product_id)
+    product = await run_db(db, product_crud.get_product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
+    check_if_match(if_match, product)
 
-    return product_crud.update_product(db, product, updates)
+    product = await run_db_commit(db, product_crud.update_product, product, updates)
+    set_etag(response, product)
+    return product
 
 
 @router.patch("/{product_id}/increase_stock", response_model=product_schema.ProductOut)
-def increase_product_stock(
+async def increase_product_stock(
     product_id: int,
+    response: Response,
     quantity: int = Body(..., embed=True, gt=0),
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    product = product_crud.get_product(db, product_id)
+    product = await run_db(db, product_crud.get_product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
+    check_if_match(if_match, product)
     try:
-        return product_crud.increase_stock(db, product, quantity)
+        product = await run_db_commit(
+            db, product_crud.increase_stock, product, quantity
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    set_etag(response, product)
+    return product
 
 
 @router.patch("/{product_id}/decrease_stock", response_model=product_schema.ProductOut)
-def decrease_product_stock(
+async def decrease_product_stock(
     product_id: int,
+    response: Response,
     quantity: int = Body(..., embed=True, gt=0),
-    db: Session = Depends(get_db),
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    product = product_crud.get_product(db, product_id)
+    product = await run_db(db, product_crud.get_product, product_id)
     if not product:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Product not found"
         )
+    check_if_match(if_match, product)
     try:
-        return product_crud.decrease_stock(db, product, quantity)
+        product = await run_db_commit(
+            db, product_crud.decrease_stock, product, quantity
+        )
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    set_etag(response, product)
+    return product
 
 
 # Configurações para upload de imagem
@@ -167,7 +201,7 @@ def validate_image_file(file: UploadFile) -> None:
 async def upload_product_image(
     product_id: int,
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """
@@ -182,7 +216,7 @@ async def upload_product_image(
     
     try:
         # Verificar se o produto existe
-        product = product_crud.get_product(db, product_id)
+        product = await run_db(db, product_crud.get_product, product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -193,16 +227,17 @@ async def upload_product_image(
         validate_image_file(file)
         
         # Ler o conteúdo do arquivo
-        image_content = file.file.read()
-        
-        # Atualizar o produto com a imagem
-        product.image_data = image_content
-        product.image_filename = file.filename
-        product.image_content_type = file.content_type
+        image_content = await file.read()
         
-        # Salvar no banco de dados
-        db.commit()
-        db.refresh(product)
+        # Atualizar o produto com a imagem e salvar no banco de dados
+        await run_db_commit(
+            db,
+            product_crud.set_product_image,
+            product,
+            image_content,
+            file.filename,
+            file.content_type,
+        )
         
         return {
             "message": "Imagem do produto enviada com sucesso",
@@ -215,7 +250,7 @@ async def upload_product_image(
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await run_db(db, Session.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao processar upload: {str(e)}"
@@ -225,7 +260,7 @@ async def upload_product_image(
 @router.get("/{product_id}/image")
 async def get_product_image(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """
@@ -233,7 +268,7 @@ async def get_product_image(
     """
     try:
         # Buscar o produto
-        product = product_crud.get_product(db, product_id)
+        product = await run_db(db, product_crud.get_product, product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -267,7 +302,7 @@ async def get_product_image(
 @router.delete("/{product_id}/image", status_code=status.HTTP_204_NO_CONTENT)
 async def delete_product_image(
     product_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """
@@ -280,7 +315,7 @@ async def delete_product_image(
     
     try:
         # Buscar o produto
-        product = product_crud.get_product(db, product_id)
+        product = await run_db(db, product_crud.get_product, product_id)
         if not product:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -293,18 +328,15 @@ async def delete_product_image(
                 detail="Produto não possui imagem"
             )
         
-        # Remover a imagem
-        product.image_data = None
-        product.image_filename = None
-        product.image_content_type = None
-        
-        # Salvar no banco de dados
-        db.commit()
+        # Remover a imagem e salvar no banco de dados
+        await run_db_commit(
+            db, product_crud.set_product_image, product, None, None, None
+        )
         
     except HTTPException:
         raise
     except Exception as e:
-        db.rollback()
+        await run_db(db, Session.rollback)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Erro ao remover imagem: {str(e)}"
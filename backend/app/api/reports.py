@@ -7,10 +7,12 @@ Este módulo contém os endpoints para geração de relatórios e analytics.
 from typing import Optional
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy.orm import Session
 
+from app.core.query_counter import query_budget
+from app.core.server_timing import TimedRoute
 from app.crud import report as report_crud
-from app.dependencies import get_current_user, get_db
+from app.db import DbSession, run_db
+from app.dependencies import get_current_user, get_read_db
 from app.models.room import Room
 from app.schemas.auth import TokenData
 from app.schemas.report import (
@@ -24,13 +26,14 @@ from app.schemas.report import (
     WaiterCommissionReport,
 )
 
-router = APIRouter(prefix="/reports", tags=["Reports"])
+router = APIRouter(prefix="/reports", tags=["Reports"], route_class=TimedRoute)
 
 
 @router.get("/daily-sales/{date}", response_model=DailySalesReport)
-def get_daily_sales_report(
+@query_budget(5)
+async def get_daily_sales_report(
     date: str,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de vendas diárias."""
@@ -42,17 +45,17 @@ def get_daily_sales_report(
         )
 
     try:
-        report_data = report_crud.get_daily_sales_report(db, date)
+        report_data = await run_db(db, report_crud.get_daily_sales_report, date)
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/top-products", response_model=TopProductsReport)
-def get_top_products_report(
+async def get_top_products_report(
     limit: int = Query(10, ge=1, le=100, description="Quantidade de produtos"),
     days: int = Query(30, ge=1, le=365, description="Período em dias"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de produtos mais vendidos."""
@@ -64,17 +67,18 @@ def get_top_products_report(
         )
 
     try:
-        report_data = report_crud.get_top_products_report(db, limit, days)
+        report_data = await run_db(db, report_crud.get_top_products_report, limit, days)
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/waiter-commission", response_model=WaiterCommissionReport)
-def get_waiter_commission_report(
+@query_budget(4)
+async def get_waiter_commission_report(
     start_date: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de comissão de garçons."""
@@ -86,16 +90,19 @@ def get_waiter_commission_report(
         )
 
     try:
-        report_data = report_crud.get_waiter_commission_report(db, start_date, end_date)
+        report_data = await run_db(
+            db, report_crud.get_waiter_commission_report, start_date, end_date
+        )
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/payment-methods", response_model=PaymentMethodsReport)
-def get_payment_methods_report(
+@query_budget(2)
+async def get_payment_methods_report(
     days: int = Query(30, ge=1, le=365, description="Período em dias"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de métodos de pagamento."""
@@ -107,16 +114,17 @@ def get_payment_methods_report(
         )
 
     try:
-        report_data = report_crud.get_payment_methods_report(db, days)
+        report_data = await run_db(db, report_crud.get_payment_methods_report, days)
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/table-performance", response_model=TablePerformanceReport)
-def get_table_performance_report(
+@query_budget(4)
+async def get_table_performance_report(
     days: int = Query(30, ge=1, le=365, description="Período em dias"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de performance das mesas."""
@@ -128,16 +136,17 @@ def get_table_performance_report(
         )
 
     try:
-        report_data = report_crud.get_table_performance_report(db, days)
+        report_data = await run_db(db, report_crud.get_table_performance_report, days)
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/hourly-sales/{date}", response_model=HourlySalesReport)
-def get_hourly_sales_report(
+@query_budget(3)
+async def get_hourly_sales_report(
     date: str,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de vendas por hora."""
@@ -149,18 +158,18 @@ def get_hourly_sales_report(
         )
 
     try:
-        report_data = report_crud.get_hourly_sales_report(db, date)
+        report_data = await run_db(db, report_crud.get_hourly_sales_report, date)
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.get("/user-sales/{username}", response_model=UserSalesReport)
-def get_user_sales_report(
+async def get_user_sales_report(
     username: str,
     start_date: Optional[str] = Query(None, description="Data inicial (YYYY-MM-DD)"),
     end_date: Optional[str] = Query(None, description="Data final (YYYY-MM-DD)"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de vendas de um usuário específico."""
@@ -172,8 +181,8 @@ def get_user_sales_report(
         )
 
     try:
-        report_data = report_crud.get_user_sales_report(
-            db, username, start_date, end_date
+        report_data = await run_db(
+            db, report_crud.get_user_sales_report, username, start_date, end_date
         )
         return report_data
     except ValueError as e:
@@ -1,59 +1,61 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
 
+from app.core.query_counter import query_budget
+from app.core.server_timing import TimedRoute
 from app.crud.room import create_room, delete_room, disassociate_room_tables, get_room, get_rooms, get_room_tables, update_room
-from app.dependencies import get_current_user, get_db
+from app.db import DbSession, run_db, run_db_commit
+from app.dependencies import get_current_user, get_db, get_read_db
 from app.schemas.auth import TokenData
 from app.schemas.room import RoomCreate, RoomOut, RoomUpdate
 from app.schemas.report import RoomConsumptionReport
 from app.schemas.table import TableOut
 
-router = APIRouter(prefix="/rooms", tags=["Rooms"])
+router = APIRouter(prefix="/rooms", tags=["Rooms"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=RoomOut, status_code=201)
-def create(
+async def create(
     room: RoomCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=403, detail="Only administrators can create rooms."
         )
-    return create_room(db, room)
+    return await run_db_commit(db, create_room, room)
 
 
 @router.get("/", response_model=List[RoomOut])
-def list_rooms(
-    db: Session = Depends(get_db), current_user: TokenData = Depends(get_current_user)
+async def list_rooms(
+    db: DbSession = Depends(get_db), current_user: TokenData = Depends(get_current_user)
 ):
-    return get_rooms(db)
+    return await run_db(db, get_rooms)
 
 
 @router.get("/{room_id}", response_model=RoomOut)
-def get(
+async def get(
     room_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    room = get_room(db, room_id)
+    room = await run_db(db, get_room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
 
 
 @router.get("/{room_id}/tables", response_model=List[TableOut])
-def get_room_tables_endpoint(
+async def get_room_tables_endpoint(
     room_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Busca todas as mesas associadas a um quarto."""
     try:
-        tables = get_room_tables(db, room_id)
+        tables = await run_db(db, get_room_tables, room_id)
         return tables
     except HTTPException as e:
         raise e
@@ -62,23 +64,23 @@ def get_room_tables_endpoint(
 
 
 @router.put("/{room_id}", response_model=RoomOut)
-def update(
+async def update(
     room_id: int,
     room_update: RoomUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=403, detail="Only administrators can update rooms."
         )
-    return update_room(db, room_id, room_update)
+    return await run_db_commit(db, update_room, room_id, room_update)
 
 
 @router.delete("/{room_id}", status_code=204)
-def delete(
+async def delete(
     room_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """
@@ -91,60 +93,71 @@ def delete(
         raise HTTPException(
             status_code=403, detail="Only administrators can delete rooms."
         )
-    delete_room(db, room_id)
+    await run_db_commit(db, delete_room, room_id)
 
 
 
 
 
 @router.get("/{room_id}/consumption-report", response_model=RoomConsumptionReport)
-def get_room_consumption_report(
+@query_budget(6)
+async def get_room_consumption_report(
     room_id: int,
     date: str = Query(None, description="Data do relatório (YYYY-MM-DD). Se não informada, usa a data atual"),
     include_all_tables: bool = Query(False, description="Incluir todas as mesas fechadas, mesmo sem pedidos"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_read_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Gera relatório de consumo de um quarto específico em uma data."""
     
     # Verificar se o quarto existe
     from app.crud.room import get_room
-    room = get_room(db, room_id)
+    room = await run_db(db, get_room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
     try:
         from app.crud.report import get_room_consumption_report
-        report_data = get_room_consumption_report(db, room_id, date, include_all_tables)
+        report_data = await run_db(
+            db, get_room_consumption_report, room_id, date, include_all_tables
+        )
         return report_data
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
 
 
 @router.post("/{room_id}/print-consumption-report")
-def print_room_consumption_report(
+async def print_room_consumption_report(
     room_id: int,
     date: str = Query(None, description="Data do relatório (YYYY-MM-DD). Se não informada, usa a data atual"),
     include_all_tables: bool = Query(False, description="Incluir todas as mesas fechadas, mesmo sem pedidos"),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Adiciona relatório de consumo do quarto à fila de impressão."""
     
     # Verificar se o quarto existe
     from app.crud.room import get_room
-    room = get_room(db, room_id)
+    room = await run_db(db, get_room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     
     try:
         # Gerar o relatório
         from app.crud.report import get_room_consumption_report
-        report_data = get_room_consumption_report(db, room_id, date, include_all_tables)
+        report_data = await run_db(
+            db, get_room_consumption_report, room_id, date, include_all_tables
+        )
         
         # Adicionar à fila de impressão
         from app.crud.print_queue import create_room_consumption_report_print_item
-        print_item = create_room_consumption_report_print_item(db, room_id, date or "hoje", report_data)
+        print_item = await run_db_commit(
+            db,
+            create_room_consumption_report_print_item,
+            room_id,
+            date or "hoje",
+            report_data,
+        )
         
         return {
             "message": "Relatório de consumo adicionado à fila de impressão",
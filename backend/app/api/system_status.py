@@ -1,29 +1,51 @@
+from collections import Counter
+from datetime import datetime, timedelta
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from loguru import logger
 from sqlalchemy.orm import Session
 
+from app.core.config import Settings
+from app.core.pool_monitor import pool_status
+from app.core.rate_limit import login_rate_limiter
+from app.core.revocation import revocations
+from app.core.server_timing import TimedRoute
+from app.core.token_cache import token_cache
+from app.crud import archive as archive_crud
+from app.crud import order as order_crud
 from app.crud import system_status as system_status_crud
+from app.db import (
+    DbSession,
+    async_engine,
+    async_read_engine,
+    engine,
+    read_engine,
+    run_db,
+    run_db_commit,
+)
 from app.dependencies import get_current_user, get_db
 from app.schemas import system_status as system_status_schema
 from app.schemas.auth import TokenData
 
-router = APIRouter(prefix="/system", tags=["System Status"])
+settings = Settings()
+
+router = APIRouter(prefix="/system", tags=["System Status"], route_class=TimedRoute)
 
 
 @router.get("/status", response_model=system_status_schema.SystemStatusOut)
-def get_system_status(
-    db: Session = Depends(get_db),
+async def get_system_status(
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Retorna o status atual do sistema."""
-    return system_status_crud.get_system_status(db)
+    return await run_db_commit(db, system_status_crud.get_system_status)
 
 
 @router.patch("/status", response_model=system_status_schema.SystemStatusOut)
-def update_system_status(
+async def update_system_status(
     updates: system_status_schema.SystemStatusUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     """Atualiza o status do sistema (apenas administradores)."""
@@ -32,4 +54,143 @@ def update_system_status(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    return system_status_crud.update_system_status(db, updates, current_user.username) 
\ No newline at end of file
+    return await run_db_commit(
+        db, system_status_crud.update_system_status, updates, current_user.username
+    )
+
+
+@router.get("/order-totals", response_model=system_status_schema.OrderTotalsCheck)
+async def check_order_totals(
+    limit: int = Query(100, ge=1, le=1000),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Confere os totais persistidos dos pedidos contra a soma dos itens."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+
+    mismatches = await run_db(db, order_crud.find_order_total_mismatches, limit)
+    return {"consistent": not mismatches, "mismatches": mismatches}
+
+
+@router.post(
+    "/order-totals/repair", response_model=system_status_schema.OrderTotalsRepair
+)
+async def repair_order_totals(
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Regrava os totais divergentes a partir dos itens (apenas administradores)."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+
+    return {"repaired": await run_db_commit(db, _repair_order_totals)}
+
+
+def _repair_order_totals(db: Session) -> int:
+    mismatches = order_crud.find_order_total_mismatches(db, limit=None)
+    return order_crud.repair_order_totals(
+        db, [mismatch["order_id"] for mismatch in mismatches]
+    )
+
+
+@router.post("/archive", response_model=system_status_schema.ArchiveRun)
+async def archive_closed_tables(
+    older_than_days: Optional[int] = Query(None, ge=0),
+    batch_size: Optional[int] = Query(None, ge=1, le=5000),
+    max_batches: int = Query(50, ge=1, le=1000),
+    db: DbSession = Depends(get_db),
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Move mesas fechadas antigas e seus dados para o arquivo (administradores).
+
+    Cada lote é uma transação própria, para não segurar a escrita do banco
+    por muito tempo.
+    """
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+
+    days = settings.ARCHIVE_AFTER_DAYS if older_than_days is None else older_than_days
+    closed_before = datetime.utcnow() - timedelta(days=days)
+    moved = Counter()
+    batches = 0
+    done = False
+    while batches < max_batches:
+        batch = await run_db_commit(
+            db,
+            archive_crud.archive_closed_tables,
+            closed_before,
+            batch_size or settings.ARCHIVE_BATCH_SIZE,
+        )
+        if not batch:
+            done = True
+            break
+        batches += 1
+        moved.update(batch)
+
+    logger.info(
+        {
+            "event": "archive_closed_tables",
+            "closed_before": closed_before.isoformat(),
+            "batches": batches,
+            "moved": dict(moved),
+            "done": done,
+            "user": current_user.username,
+        }
+    )
+    return {
+        "closed_before": closed_before,
+        "batches": batches,
+        "moved": moved,
+        "done": done,
+    }
+
+
+@router.get("/db-pool")
+async def get_db_pool_status(
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Retorna o uso do pool de conexões (apenas administradores)."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+
+    pools = {"primary": pool_status(engine.pool)}
+    if async_engine is not None:
+        pools["primary_async"] = pool_status(async_engine.pool)
+    if read_engine is not engine:
+        pools["reports"] = pool_status(read_engine.pool)
+    if async_read_engine is not async_engine:
+        pools["reports_async"] = pool_status(async_read_engine.pool)
+    return pools
+
+
+@router.get("/auth-cache")
+async def get_auth_cache_status(
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Retorna os contadores do cache de tokens (apenas administradores)."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+    return {**token_cache.snapshot(), "revocations": revocations.snapshot()}
+
+
+@router.get("/login-rate-limit")
+async def get_login_rate_limit_status(
+    current_user: TokenData = Depends(get_current_user),
+):
+    """Retorna as tentativas de login aceitas e recusadas (apenas administradores)."""
+    if current_user.role != "administrator":
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
+        )
+    return login_rate_limiter.snapshot()
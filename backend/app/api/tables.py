@@ -1,16 +1,22 @@
 import json
 from collections import defaultdict
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response, status
 from sqlalchemy.orm import Session
 
+from app.core.metrics import ORDERS_CREATED
+from app.core.money import SERVICE_TAX_RATE
+from app.core.query_counter import query_budget
+from app.core.server_timing import TimedRoute
+from app.core.versioning import check_if_match, set_etag
 from app.crud import print_queue as print_queue_crud
 from app.crud import table as table_crud
 from app.crud.order import get_orders_by_table
 from app.crud.table import create_table
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
-from app.models.product import Product
+from app.crud import product as product_crud
 from app.schemas.auth import TokenData
 from app.schemas.print_queue import PrintQueueCreate
 from app.schemas.table import TableCloseRequest, TableCreate, TableOut, TableUpdate
@@ -18,35 +24,38 @@ from app.schemas.order import OrderCreate, OrderOut, OrderUpdate, OrderUpdateWit
 from app.crud import order as order_crud
 from app.crud import system_status as system_status_crud
 
-router = APIRouter(prefix="/tables", tags=["Tables"])
+router = APIRouter(prefix="/tables", tags=["Tables"], route_class=TimedRoute)
 
 
 # Criar mesa - qualquer usuário logado
 @router.post("/", response_model=TableOut, status_code=201)
-def create_table_endpoint(
+async def create_table_endpoint(
     table: TableCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    return create_table(db, table, created_by=current_user.username)
+    return await run_db_commit(
+        db, create_table, table, created_by=current_user.username
+    )
 
 
 @router.get("/", response_model=list[TableOut])
-def get_tables(
+@query_budget(2)
+async def get_tables(
     is_closed: bool = Query(
         ..., description="Filter by table closed status (true/false)"
     ),
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    return table_crud.get_tables(db, is_closed)
+    return await run_db(db, table_crud.get_tables, is_closed)
 
 
 # Remover mesa - só administrador
 @router.delete("/{table_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_table(
+async def remove_table(
     table_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -54,15 +63,18 @@ def remove_table(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Table not found"
         )
 
-    from app.crud import order as order_crud
+    await run_db_commit(db, _delete_table, table)
+
 
-    order_crud.delete_orders_by_table(db, table_id)
+def _delete_table(db: Session, table) -> None:
+    """Remove a mesa e seus pedidos na mesma transação."""
+    order_crud.delete_orders_by_table(db, table.id)
     table_crud.delete_table(db, table)
 
 
@@ -72,10 +84,11 @@ def remove_table(
     response_model=None,  # Resposta customizada
     status_code=status.HTTP_200_OK,
 )
-def close_table(
+@query_budget(10)
+async def close_table(
     table_id: int,
     close_req: TableCloseRequest,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role not in ("administrator", "waiter"):
@@ -83,7 +96,7 @@ def close_table(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Table not found"
@@ -93,12 +106,22 @@ def close_table(
             status_code=status.HTTP_400_BAD_REQUEST, detail="Table already closed"
         )
 
-    result = table_crud.close_table(
+    return await run_db_commit(
+        db, _close_table, table, close_req, current_user.username
+    )
+
+
+def _close_table(
+    db: Session, table, close_req: TableCloseRequest, closed_by: str
+) -> dict:
+    """Fecha a mesa, monta a resposta e enfileira a conta para impressão."""
+    table_id = table.id
+    closing = table_crud.close_table(
         db,
         table,
         service_tax=close_req.service_tax,
         generate_invoice=close_req.generate_invoice,
-        closed_by=current_user.username,
+        closed_by=closed_by,
     )
     # Buscar todos os pedidos da mesa
     orders = get_orders_by_table(db, table_id)
@@ -111,8 +134,10 @@ def close_table(
             "orders": []
         }
 
-    # Calcular total dos pedidos (excluindo pedidos cancelados)
-    total_amount = sum(order.total_amount for order in orders if order.status != "cancelled")
+    # Totais (sem pedidos cancelados) já somados no banco pelo close_table
+    total_amount = closing["total"]
+    service_tax_amount = closing["service_tax"]
+    total_with_tax = closing["total_with_service_tax"]
     orders_count = len([order for order in orders if order.status != "cancelled"])
 
     # Preparar dados dos pedidos para resposta
@@ -143,16 +168,24 @@ def close_table(
         f"{table.name.center(32)}",
         "=" * 32,
         f"CONTA FECHADA",
-        f"Data: {result['closed_at'].strftime('%d/%m/%Y %H:%M')}",
-        f"Fechada por: {result['closed_by']}",
+        f"Data: {table.closed_at.strftime('%d/%m/%Y %H:%M')}",
+        f"Fechada por: {table.closed_by}",
         "-" * 32,
         "Pedidos:",
     ]
 
+    products = product_crud.get_products_by_ids(
+        db,
+        (
+            item["product_id"]
+            for order_data in orders_data
+            for item in order_data["items"]
+        ),
+    )
     for order_data in orders_data:
         lines.append(f"Pedido #{order_data['id']} - {order_data['status']}")
         for item in order_data["items"]:
-            product = db.query(Product).filter(Product.id == item["product_id"]).first()
+            product = products.get(item["product_id"])
             product_name = product.name if product else f"ID {item['product_id']}"
             subtotal = item["quantity"] * item["unit_price"]
             lines.append(
@@ -165,13 +198,11 @@ def close_table(
     lines.append(f"Total de pedidos: {orders_count}")
     lines.append(f"Subtotal: R$ {total_amount:.2f}")
     
-    if close_req.service_tax > 0:
-        service_tax_amount = total_amount * (close_req.service_tax / 100)
-        lines.append(f"Taxa de serviço ({close_req.service_tax}%): R$ {service_tax_amount:.2f}")
-        total_with_tax = total_amount + service_tax_amount
-        lines.append(f"Total: R$ {total_with_tax:.2f}")
-    else:
-        lines.append(f"Total: R$ {total_amount:.2f}")
+    if close_req.service_tax:
+        lines.append(
+            f"Taxa de serviço ({SERVICE_TAX_RATE:.0%}): R$ {service_tax_amount:.2f}"
+        )
+    lines.append(f"Total: R$ {total_with_tax:.2f}")
 
     lines.append("=" * 32)
     lines.append("\n")
@@ -192,10 +223,10 @@ def close_table(
         "orders_count": orders_count,
         "orders": orders_data,
         "service_tax": close_req.service_tax,
-        "service_tax_amount": total_amount * (close_req.service_tax / 100) if close_req.service_tax > 0 else 0,
-        "total_with_tax": total_amount + (total_amount * (close_req.service_tax / 100)) if close_req.service_tax > 0 else total_amount,
-        "closed_at": result["closed_at"].isoformat(),
-        "closed_by": result["closed_by"],
+        "service_tax_amount": service_tax_amount,
+        "total_with_tax": total_with_tax,
+        "closed_at": table.closed_at.isoformat(),
+        "closed_by": table.closed_by,
     }
 
 
@@ -204,10 +235,12 @@ def close_table(
     response_model=TableOut,
     status_code=status.HTTP_200_OK,
 )
-def update_table_endpoint(
+async def update_table_endpoint(
     table_id: int,
     table_update: TableUpdate,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -215,13 +248,16 @@ def update_table_endpoint(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
 
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Table not found"
         )
+    check_if_match(if_match, table)
 
-    return table_crud.update_table(db, table, table_update)
+    table = await run_db_commit(db, table_crud.update_table, table_id, table_update)
+    set_etag(response, table)
+    return table
 
 
 # ============================================================================
@@ -231,29 +267,38 @@ def update_table_endpoint(
 @router.post(
     "/{table_id}/orders", response_model=OrderOut, status_code=status.HTTP_201_CREATED
 )
-def create_order(
+@query_budget(13)
+async def create_order(
     table_id: int,
     order: OrderCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     # Verificar se o sistema está habilitado para novos pedidos
-    if not system_status_crud.is_orders_enabled(db):
-        system_status = system_status_crud.get_system_status(db)
+    if not await run_db(db, system_status_crud.is_orders_enabled):
+        system_status = await run_db(db, system_status_crud.get_system_status)
         reason = system_status.reason or "Sistema temporariamente indisponível para novos pedidos"
         raise HTTPException(
             status_code=status.HTTP_423_LOCKED,
             detail=f"Novos pedidos estão bloqueados. Motivo: {reason}"
         )
     
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     if table.is_closed is True:
         raise HTTPException(status_code=404, detail="Table is closed")
-    new_order = order_crud.create_order(
-        db, order, table_id, created_by=current_user.username
+    new_order = await run_db_commit(
+        db, _create_order, table, order, current_user.username
     )
+    ORDERS_CREATED.inc()
+    return new_order
+
+
+def _create_order(db: Session, table, order: OrderCreate, created_by: str):
+    """Cria o pedido e enfileira o ticket para impressão."""
+    table_id = table.id
+    new_order = order_crud.create_order(db, order, table_id, created_by=created_by)
     # Gera conteúdo para impressão (layout melhorado)
     lines = [
         f"{table.name.center(32)}",
@@ -264,8 +309,11 @@ def create_order(
         "Itens:",
     ]
     total = 0
+    products = product_crud.get_products_by_ids(
+        db, (item.product_id for item in new_order.items)
+    )
     for item in new_order.items:
-        product = db.query(Product).filter(Product.id == item.product_id).first()
+        product = products.get(item.product_id)
         product_name = product.name if product else f"ID {item.product_id}"
         subtotal = item.quantity * item.unit_price
         total += subtotal
@@ -293,15 +341,16 @@ def create_order(
 @router.get(
     "/{table_id}/orders", response_model=List[OrderOut], status_code=status.HTTP_200_OK
 )
-def list_orders(
+@query_budget(3)
+async def list_orders(
     table_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
-    return order_crud.get_orders_by_table(db, table_id)
+    return await run_db(db, order_crud.get_orders_by_table, table_id)
 
 
 @router.get(
@@ -309,28 +358,31 @@ def list_orders(
     response_model=OrderOut,
     status_code=status.HTTP_200_OK,
 )
-def get_order_by_id(
+@query_budget(3)
+async def get_order_by_id(
     table_id: int,
     order_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    order = order_crud.get_order(db, order_id)
+    order = await run_db(db, order_crud.get_order, order_id)
     if not order or order.table_id != table_id:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    set_etag(response, order)
     return order
 
 
 @router.delete("/{table_id}/orders/{order_id}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_order(
+async def remove_order(
     table_id: int,
     order_id: int,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
@@ -338,15 +390,15 @@ def remove_order(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
     
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    order = order_crud.get_order(db, order_id)
+    order = await run_db(db, order_crud.get_order, order_id)
     if not order or order.table_id != table_id:
         raise HTTPException(status_code=404, detail="Order not found")
     
-    order_crud.delete_order(db, order_id)
+    await run_db_commit(db, order_crud.delete_order, order_id)
 
 
 @router.put(
@@ -354,20 +406,23 @@ def remove_order(
     response_model=OrderOut,
     status_code=status.HTTP_200_OK,
 )
-def update_order(
+async def update_order(
     table_id: int,
     order_id: int,
     order_update: OrderUpdateWithItems,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    order = order_crud.get_order(db, order_id)
+    order = await run_db(db, order_crud.get_order, order_id)
     if not order or order.table_id != table_id:
         raise HTTPException(status_code=404, detail="Order not found")
+    check_if_match(if_match, order)
     
     # Verificar permissões baseadas no status do pedido
     if order.status == "finished":
@@ -385,11 +440,18 @@ def update_order(
     
     # Administradores podem modificar pedidos em qualquer status
     # e podem cancelar pedidos e modificar itens
-    updated_order = order_crud.update_order_with_items(db, order_id, order_update, updated_by=current_user.username)
+    updated_order = await run_db_commit(
+        db,
+        order_crud.update_order_with_items,
+        order_id,
+        order_update,
+        updated_by=current_user.username,
+    )
     
     if not updated_order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    set_etag(response, updated_order)
     return updated_order
 
 
@@ -398,19 +460,22 @@ def update_order(
     response_model=OrderOut,
     status_code=status.HTTP_200_OK,
 )
-def finish_order(
+async def finish_order(
     table_id: int,
     order_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    order = order_crud.get_order(db, order_id)
+    order = await run_db(db, order_crud.get_order, order_id)
     if not order or order.table_id != table_id:
         raise HTTPException(status_code=404, detail="Order not found")
+    check_if_match(if_match, order)
     
     if order.status == "finished":
         raise HTTPException(
@@ -428,11 +493,14 @@ def finish_order(
     order_update = OrderUpdate(status="finished")
 
     # Atualizar o pedido
-    updated_order = order_crud.update_order(db, order_id, order_update, updated_by=current_user.username)
+    updated_order = await run_db_commit(
+        db, order_crud.update_order, order_id, order_update, updated_by=current_user.username
+    )
     
     if not updated_order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    set_etag(response, updated_order)
     return updated_order
 
 
@@ -441,19 +509,22 @@ def finish_order(
     response_model=OrderOut,
     status_code=status.HTTP_200_OK,
 )
-def cancel_order(
+async def cancel_order(
     table_id: int,
     order_id: int,
-    db: Session = Depends(get_db),
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
-    table = table_crud.get_table(db, table_id)
+    table = await run_db(db, table_crud.get_table, table_id)
     if not table:
         raise HTTPException(status_code=404, detail="Table not found")
     
-    order = order_crud.get_order(db, order_id)
+    order = await run_db(db, order_crud.get_order, order_id)
     if not order or order.table_id != table_id:
         raise HTTPException(status_code=404, detail="Order not found")
+    check_if_match(if_match, order)
     
     if order.status == "cancelled":
         raise HTTPException(
@@ -471,9 +542,12 @@ def cancel_order(
     order_update = OrderUpdate(status="cancelled")
 
     # Atualizar o pedido
-    updated_order = order_crud.update_order(db, order_id, order_update, updated_by=current_user.username)
+    updated_order = await run_db_commit(
+        db, order_crud.update_order, order_id, order_update, updated_by=current_user.username
+    )
     
     if not updated_order:
         raise HTTPException(status_code=404, detail="Order not found")
     
+    set_etag(response, updated_order)
     return updated_order
@@ -1,8 +1,9 @@
 from typing import List
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
 
+from app.core.security import hash_password_async
+from app.core.server_timing import TimedRoute
 from app.crud.user import (
     create_user,
     delete_user,
@@ -10,55 +11,57 @@ from app.crud.user import (
     get_users,
     update_user_password,
 )
+from app.db import DbSession, run_db, run_db_commit
 from app.dependencies import get_current_user, get_db
 from app.schemas.auth import TokenData
 from app.schemas.user import RoleEnum, UserCreate, UserOut, UserPasswordUpdate
 
-router = APIRouter(prefix="/users", tags=["Users"])
+router = APIRouter(prefix="/users", tags=["Users"], route_class=TimedRoute)
 
 
 @router.post("/", response_model=UserOut, status_code=status.HTTP_201_CREATED)
-def create(
+async def create(
     user: UserCreate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    existing_user = get_user_by_username(db, user.username)
+    existing_user = await run_db(db, get_user_by_username, user.username)
     if existing_user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT, detail="Username already registered"
         )
-    return create_user(db, user)
+    hashed_password = await hash_password_async(user.password)
+    return await run_db_commit(db, create_user, user, hashed_password)
 
 
 @router.get("/", response_model=List[UserOut], status_code=status.HTTP_200_OK)
-def read_users(
+async def read_users(
     skip: int = 0,
     limit: int = 100,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    users = get_users(db, skip=skip, limit=limit)
+    users = await run_db(db, get_users, skip=skip, limit=limit)
     return users
 
 
 @router.get("/{username}", response_model=UserOut, status_code=status.HTTP_200_OK)
-def read_user(
+async def read_user(
     username: str,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     # Administrador pode buscar qualquer usuário
     if current_user.role == "administrator":
-        user = get_user_by_username(db, username)
+        user = await run_db(db, get_user_by_username, username)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -69,7 +72,7 @@ def read_user(
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    user = get_user_by_username(db, username)
+    user = await run_db(db, get_user_by_username, username)
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -78,16 +81,16 @@ def read_user(
 
 
 @router.delete("/{username}", status_code=status.HTTP_204_NO_CONTENT)
-def remove_user(
+async def remove_user(
     username: str,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    deleted = delete_user(db, username)
+    deleted = await run_db_commit(db, delete_user, username)
     if not deleted:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -98,17 +101,20 @@ def remove_user(
 @router.put(
     "/{username}/password", response_model=UserOut, status_code=status.HTTP_200_OK
 )
-def change_password(
+async def change_password(
     username: str,
     body: UserPasswordUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, detail="Access forbidden"
         )
-    updated_user = update_user_password(db, username, body.password)
+    hashed_password = await hash_password_async(body.password)
+    updated_user = await run_db_commit(
+        db, update_user_password, username, hashed_password, revoke_sessions=True
+    )
     if not updated_user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="User not found"
@@ -121,16 +127,16 @@ from app.schemas.user import UserRoleUpdate
 
 
 @router.put("/{username}/role", response_model=UserOut, status_code=status.HTTP_200_OK)
-def update_user_role_api(
+async def update_user_role_api(
     username: str,
     body: UserRoleUpdate,
-    db: Session = Depends(get_db),
+    db: DbSession = Depends(get_db),
     current_user: TokenData = Depends(get_current_user),
 ):
     if current_user.role != "administrator":
         raise HTTPException(status_code=403, detail="Access forbidden")
 
-    updated_user = update_user_role(db, username, body.role)
+    updated_user = await run_db_commit(db, update_user_role, username, body.role)
     if not updated_user:
         raise HTTPException(status_code=404, detail="User not found")
 
@@ -0,0 +1,68 @@
+"""
+Dia comercial do quiosque.
+
+Pedidos, pagamentos e mesas guardam o dia comercial (``business_date``) e
+a hora local (``business_hour``) em que foram criados, calculados no fuso
+do quiosque. O dia comercial só vira no horário de corte: com corte às
+4h, uma venda às 01:30 de sábado conta para sexta. Assim os relatórios
+do dia viram buscas por igualdade num índice, sem intervalos de
+``created_at`` e sem misturar colunas com e sem fuso.
+
+Datas sem fuso (``datetime.utcnow`` e o ``CURRENT_TIMESTAMP`` do SQLite)
+são tratadas como UTC.
+"""
+
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+from app.core.config import Settings
+
+settings = Settings()
+
+
+@lru_cache(maxsize=None)
+def business_timezone() -> ZoneInfo:
+    return ZoneInfo(settings.BUSINESS_TIMEZONE)
+
+
+def to_local_time(moment: Optional[datetime] = None) -> datetime:
+    """Converte ``moment`` (agora, se omitido) para o fuso do quiosque."""
+    if moment is None:
+        moment = datetime.now(timezone.utc)
+    elif moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(business_timezone())
+
+
+def business_date(moment: Optional[datetime] = None) -> date:
+    """Dia comercial de ``moment``, respeitando o horário de corte."""
+    local = to_local_time(moment)
+    return (local - timedelta(hours=settings.BUSINESS_DAY_CUTOFF_HOUR)).date()
+
+
+def business_hour(moment: Optional[datetime] = None) -> int:
+    """Hora local (0-23) de ``moment``."""
+    return to_local_time(moment).hour
+
+
+def parse_business_date(value: str) -> date:
+    """Converte o ``YYYY-MM-DD`` recebido pelos relatórios."""
+    return datetime.strptime(value, "%Y-%m-%d").date()
+
+
+def _created_at(context) -> Optional[datetime]:
+    # INSERTs que já trazem created_at (importações, seeds) usam esse valor;
+    # com o default do servidor o momento do INSERT é agora
+    return context.get_current_parameters().get("created_at")
+
+
+def business_date_default(context) -> date:
+    """Default de coluna: dia comercial do ``created_at`` da linha."""
+    return business_date(_created_at(context))
+
+
+def business_hour_default(context) -> int:
+    """Default de coluna: hora local do ``created_at`` da linha."""
+    return business_hour(_created_at(context))
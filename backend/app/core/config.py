@@ -1,4 +1,5 @@
 from datetime import timedelta
+from typing import Optional
 
 from pydantic import ConfigDict
 from pydantic_settings import BaseSettings
@@ -8,12 +9,74 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str
     ACCESS_TOKEN_EXPIRE_MINUTES: int
+    # Refresh tokens (/login/refresh): renovam o access token sem bcrypt
+    REFRESH_TOKEN_EXPIRE_DAYS: int = 30
     DATABASE_URL: str
+    # Usa AsyncSession (asyncpg/aiosqlite) nas rotas em vez da Session síncrona
+    DATABASE_ASYNC: bool = False
+    # Réplica de leitura para os relatórios (vazio = usa o DATABASE_URL)
+    REPORTS_DATABASE_URL: Optional[str] = None
+    # Pool de conexões (não se aplica ao SQLite em memória)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    # Checkouts mais lentos que isso geram warning no log
+    DB_POOL_SLOW_CHECKOUT_MS: float = 100.0
+    # Falha a requisição que passar do @query_budget da rota (usar nos testes)
+    SQL_QUERY_BUDGET_ENFORCE: bool = False
+    # Dia comercial: fuso do quiosque e hora em que o dia vira (vendas da
+    # madrugada antes do corte contam para o dia anterior)
+    BUSINESS_TIMEZONE: str = "America/Sao_Paulo"
+    BUSINESS_DAY_CUTOFF_HOUR: int = 4
+    # Arquivamento: mesas fechadas há mais de N dias saem das tabelas quentes
+    ARCHIVE_AFTER_DAYS: int = 90
+    ARCHIVE_BATCH_SIZE: int = 200
+    # bcrypt: custo dos hashes novos (hashes com outro custo são refeitos no
+    # login) e processos dedicados ao hash
+    BCRYPT_ROUNDS: int = 12
+    BCRYPT_WORKERS: int = 2
+    # Limite de tentativas de login (token bucket; burst 0 desliga): por
+    # usuário + IP e por IP. Com RATE_LIMIT_REDIS_URL o limite é
+    # compartilhado entre os workers
+    LOGIN_RATE_LIMIT_BURST: int = 5
+    LOGIN_RATE_LIMIT_PER_MINUTE: float = 5.0
+    LOGIN_IP_RATE_LIMIT_BURST: int = 30
+    LOGIN_IP_RATE_LIMIT_PER_MINUTE: float = 30.0
+    LOGIN_RATE_LIMIT_MAX_KEYS: int = 10000
+    RATE_LIMIT_REDIS_URL: Optional[str] = None
+    # Intervalo em que cada worker lê as revogações de tokens publicadas
+    # pelos outros (exclusão de usuário, troca de papel ou senha)
+    REVOCATION_SYNC_SECONDS: float = 2.0
+    # Cache de tokens JWT verificados (0 desliga); a validade é o exp do
+    # token, limitada a AUTH_CACHE_TTL_SECONDS
+    AUTH_CACHE_SIZE: int = 4096
+    AUTH_CACHE_TTL_SECONDS: int = 900
+    # Log de acesso: rotas de polling entram só numa fração das vezes
+    # (erros e requisições lentas sempre); LOG_DIAGNOSE mostra variáveis
+    # locais nos tracebacks (pode expor dados, só em desenvolvimento)
+    LOG_SAMPLED_PATHS: str = "/tables/,/health,/print-queue/pending-count"
+    LOG_SAMPLE_RATE: float = 0.05
+    LOG_SLOW_REQUEST_MS: float = 500.0
+    LOG_DIAGNOSE: bool = False
+    # Header Server-Timing (auth, db, handler, serialize) nas respostas
+    SERVER_TIMING: bool = False
+    # Perfil SQLite em arquivo: WAL, pragmas e escritas serializadas
+    SQLITE_PROFILE: bool = True
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MiB
+    SQLITE_CACHE_SIZE_KB: int = 65536  # 64 MiB
     # Configuração simplificada para rede interna apenas
     CORS_ORIGINS: str = "http://localhost:5173,http://127.0.0.1:5173,http://localhost:3000,http://127.0.0.1:3000"
     CLIENT_ID: str = ""
     CLIENT_SECRET: str = ""
     CLIENT_ROLE: str = "client"
+    # Tokens de clientes (agentes de impressão) e cache das credenciais
+    CLIENT_TOKEN_EXPIRE_HOURS: int = 24
+    CLIENT_CACHE_TTL_SECONDS: int = 60
     HOST: str = "127.0.0.1"
     PORT: int = 8000
     DEBUG: bool = True
@@ -22,6 +85,19 @@ class Settings(BaseSettings):
     def access_token_expiration(self) -> timedelta:
         return timedelta(minutes=self.ACCESS_TOKEN_EXPIRE_MINUTES)
 
+    @property
+    def client_token_expiration(self) -> timedelta:
+        return timedelta(hours=self.CLIENT_TOKEN_EXPIRE_HOURS)
+
+    @property
+    def refresh_token_expiration(self) -> timedelta:
+        return timedelta(days=self.REFRESH_TOKEN_EXPIRE_DAYS)
+
+    @property
+    def log_sampled_paths(self) -> list[str]:
+        paths = (path.strip() for path in self.LOG_SAMPLED_PATHS.split(","))
+        return [path for path in paths if path]
+
     @property
     def cors_origins_list(self) -> list[str]:
         """Converte a string de CORS_ORIGINS em uma lista e adiciona toda a rede 192.168.*"""
@@ -0,0 +1,174 @@
+"""
+Métricas Prometheus (``GET /metrics``).
+
+Os contadores, histogramas e gauges de processo ficam neste módulo e são
+alimentados pelo ``MetricsMiddleware`` (latência, requisições em andamento,
+comandos SQL por requisição), pelos eventos do pool de conexões e pelas
+rotas de login e de pedidos. A fila de impressão é lida do banco a cada
+scrape, então vale para todos os workers.
+
+Com vários workers do uvicorn, exporte ``PROMETHEUS_MULTIPROC_DIR`` (um
+diretório vazio, limpo a cada deploy) antes de iniciar o servidor: cada
+processo grava os valores em arquivos ali e o scrape soma todos, seja qual
+for o worker que responder.
+"""
+
+import os
+import time
+from typing import Iterable, Optional
+
+from prometheus_client import (
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from prometheus_client.core import GaugeMetricFamily, Metric
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.core.query_counter import current_query_stats
+
+# Lido pelo prometheus_client na importação
+MULTIPROCESS = "PROMETHEUS_MULTIPROC_DIR" in os.environ
+UNMATCHED_ROUTE = "unmatched"
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Duração das requisições HTTP por rota e status.",
+    ["method", "route", "status"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0),
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "Requisições HTTP em andamento.",
+    multiprocess_mode="livesum",
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements",
+    "Comandos SQL executados por requisição.",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55),
+)
+DB_POOL_SIZE = Gauge(
+    "db_pool_size",
+    "Conexões fixas dos pools (sem o overflow).",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+DB_POOL_IN_USE = Gauge(
+    "db_pool_connections_in_use",
+    "Conexões do pool em uso pelas requisições.",
+    ["pool"],
+    multiprocess_mode="livesum",
+)
+ORDERS_CREATED = Counter(
+    "orders_created_total",
+    "Pedidos criados (pedidos por minuto: rate(...[5m]) * 60).",
+)
+LOGIN_ATTEMPTS = Counter(
+    "login_attempts_total",
+    "Tentativas de login por tipo (user, client) e resultado.",
+    ["kind", "result"],
+)
+
+
+class MetricsMiddleware:
+    """Latência, requisições em andamento e SQL por rota (ASGI puro).
+
+    Fica dentro do ``QueryCountMiddleware`` para ler o contador de SQL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        REQUESTS_IN_PROGRESS.inc()
+        start_time = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            duration = time.perf_counter() - start_time
+            REQUESTS_IN_PROGRESS.dec()
+            # Template da rota (/tables/{table_id}), não o path: cardinalidade
+            # limitada mesmo com ids na URL
+            route = getattr(scope.get("route"), "path", UNMATCHED_ROUTE)
+            REQUEST_LATENCY.labels(scope["method"], route, str(status_code)).observe(
+                duration
+            )
+            stats = current_query_stats()
+            if stats is not None:
+                REQUEST_DB_STATEMENTS.labels(route).observe(stats.count)
+
+
+def install_pool_metrics(engine: Engine, name: str) -> None:
+    """Conexões em uso e tamanho do pool ``name`` de um engine."""
+    pool = engine.pool
+    if isinstance(pool, QueuePool):
+        DB_POOL_SIZE.labels(name).set(pool.size())
+    in_use = DB_POOL_IN_USE.labels(name)
+
+    @event.listens_for(engine, "checkout")
+    def count_checkout(dbapi_connection, connection_record, connection_proxy):
+        in_use.inc()
+
+    @event.listens_for(engine, "checkin")
+    def count_checkin(dbapi_connection, connection_record):
+        in_use.dec()
+
+
+def print_queue_metrics(
+    pending: int, oldest_pending_age: Optional[float]
+) -> list[Metric]:
+    """Gauges da fila de impressão, calculados no scrape a partir do banco."""
+    depth = GaugeMetricFamily(
+        "print_queue_pending", "Itens pendentes na fila de impressão."
+    )
+    depth.add_metric([], pending)
+    age = GaugeMetricFamily(
+        "print_queue_oldest_pending_age_seconds",
+        "Idade do item pendente mais antigo (0 com a fila vazia).",
+    )
+    age.add_metric([], oldest_pending_age or 0.0)
+    return [depth, age]
+
+
+class _Families:
+    def __init__(self, families: Iterable[Metric]):
+        self.families = list(families)
+
+    def collect(self) -> Iterable[Metric]:
+        return self.families
+
+
+def generate_metrics(families: Iterable[Metric] = ()) -> bytes:
+    """Texto do scrape: métricas dos processos e ``families`` do banco."""
+    if MULTIPROCESS:
+        # Soma os arquivos de todos os workers (registry novo a cada scrape)
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry) + generate_latest(_Families(families))
+
+
+def mark_process_dead() -> None:
+    """Descarta os gauges ``live*`` deste worker (shutdown)."""
+    if MULTIPROCESS:
+        multiprocess.mark_process_dead(os.getpid())
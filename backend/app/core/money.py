@@ -0,0 +1,58 @@
+"""
+Valores monetários.
+
+O banco guarda dinheiro em centavos inteiros (coluna ``Integer``) e o
+Python enxerga ``Decimal`` com duas casas, de modo que somas no banco e
+contas no código são exatas. Os schemas continuam expondo ``float``.
+"""
+
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from sqlalchemy import func, type_coerce
+from sqlalchemy.types import Integer, TypeDecorator
+
+CENT = Decimal("0.01")
+ZERO = Decimal("0.00")
+# Taxa de serviço cobrada ao fechar a mesa ou no pagamento
+SERVICE_TAX_RATE = Decimal("0.10")
+
+
+def to_money(value) -> Optional[Decimal]:
+    """Converte float/int/str/Decimal para ``Decimal`` arredondado ao centavo."""
+    if value is None:
+        return None
+    if not isinstance(value, Decimal):
+        # str() evita herdar o erro binário do float (0.1 -> 0.1000000000000000055)
+        value = Decimal(str(value))
+    return value.quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def calculate_service_tax(amount) -> Decimal:
+    """Taxa de serviço sobre ``amount``, arredondada ao centavo."""
+    return to_money(to_money(amount) * SERVICE_TAX_RATE)
+
+
+class Money(TypeDecorator):
+    """Coluna em centavos inteiros exposta como ``Decimal``."""
+
+    impl = Integer
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        return int(to_money(value) * 100)
+
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return (Decimal(int(value)) / 100).quantize(CENT)
+
+
+def money_sum(expression):
+    """``SUM()`` de uma expressão em centavos, devolvido como ``Decimal``.
+
+    Sem linhas a soma é zero (e não ``NULL``).
+    """
+    return type_coerce(func.coalesce(func.sum(expression), 0), Money())
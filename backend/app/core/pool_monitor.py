@@ -0,0 +1,118 @@
+"""
+Monitoramento do pool de conexões.
+
+Este módulo contém as classes de pool instrumentadas usadas pelos engines
+do SQLAlchemy. Cada checkout é cronometrado: checkouts acima do limite
+configurado geram um warning no log e tudo é acumulado em contadores
+expostos pelo endpoint administrativo ``GET /system/db-pool``.
+"""
+
+import threading
+import time
+
+from loguru import logger
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+
+class PoolStats:
+    """Contadores acumulados de checkout de um pool."""
+
+    def __init__(self, name: str, slow_checkout_ms: float):
+        self.name = name
+        self.slow_checkout_ms = slow_checkout_ms
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.slow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def record_checkout(self, wait_ms: float) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+            slow = wait_ms > self.slow_checkout_ms
+            if slow:
+                self.slow_checkouts += 1
+        if slow:
+            logger.warning(
+                {
+                    "event": "db_pool_slow_checkout",
+                    "pool": self.name,
+                    "wait_ms": round(wait_ms, 2),
+                    "threshold_ms": self.slow_checkout_ms,
+                }
+            )
+
+    def record_timeout(self) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.warning({"event": "db_pool_timeout", "pool": self.name})
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": (
+                    round(self.total_wait_ms / self.checkouts, 3)
+                    if self.checkouts
+                    else 0.0
+                ),
+                "max_wait_ms": round(self.max_wait_ms, 3),
+                "slow_checkout_threshold_ms": self.slow_checkout_ms,
+            }
+
+
+class MonitoredPoolMixin:
+    """Mede o tempo de espera de cada checkout do pool."""
+
+    stats: PoolStats
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            self.stats.record_timeout()
+            raise
+        self.stats.record_checkout((time.perf_counter() - start) * 1000)
+        return connection
+
+
+def monitored_pool_class(
+    name: str, slow_checkout_ms: float, async_mode: bool = False
+) -> type[Pool]:
+    """Cria uma classe de pool instrumentada com contadores próprios.
+
+    Os contadores ficam na classe (e não na instância) para sobreviver ao
+    ``Pool.recreate()`` executado em ``engine.dispose()``.
+    """
+    base = AsyncAdaptedQueuePool if async_mode else QueuePool
+    return type(
+        f"Monitored{base.__name__}",
+        (MonitoredPoolMixin, base),
+        {"stats": PoolStats(name, slow_checkout_ms)},
+    )
+
+
+def pool_status(pool: Pool) -> dict:
+    """Estado atual do pool (conexões em uso/overflow) e contadores de espera."""
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update(
+            {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": max(pool.overflow(), 0),
+                "timeout_s": pool.timeout(),
+            }
+        )
+    stats = getattr(pool, "stats", None)
+    if isinstance(stats, PoolStats):
+        status.update(stats.snapshot())
+    return status
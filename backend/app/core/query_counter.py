@@ -0,0 +1,141 @@
+"""
+Contador de comandos SQL por requisição.
+
+Listeners ``before/after_cursor_execute`` nos engines somam cada comando e
+o seu tempo ao contador da requisição atual, guardado em um ``ContextVar``
+(que chega às funções CRUD tanto no threadpool quanto no ``run_sync`` da
+AsyncSession).
+
+Cada rota pode declarar um orçamento com ``@query_budget(n)``. Acima dele a
+requisição gera um warning no log; com ``SQL_QUERY_BUDGET_ENFORCE=true``
+(modo de teste) ela falha com ``QueryBudgetExceeded``, para que um N+1 novo
+quebre a suíte antes de chegar aos tablets.
+"""
+
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+class QueryStats:
+    """Comandos executados dentro de um escopo (normalmente uma requisição)."""
+
+    def __init__(self, record: bool = False):
+        self.count = 0
+        # Segundos gastos nos comandos (cursor.execute)
+        self.duration = 0.0
+        self.statements: Optional[list[str]] = [] if record else None
+
+    def add(self, statement: str) -> None:
+        self.count += 1
+        if self.statements is not None:
+            self.statements.append(statement)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Rota executou mais comandos SQL do que o orçamento declarado."""
+
+
+_current_stats: ContextVar[Optional[QueryStats]] = ContextVar(
+    "sql_query_stats", default=None
+)
+
+
+def current_query_stats() -> Optional[QueryStats]:
+    return _current_stats.get()
+
+
+@contextmanager
+def count_queries(record: bool = False) -> Iterator[QueryStats]:
+    """Conta os comandos SQL executados dentro do bloco.
+
+    Também serve para testes::
+
+        with count_queries() as stats:
+            table_crud.get_tables(db, False)
+        assert stats.count == 1
+    """
+    stats = QueryStats(record=record)
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+def install_query_counter(engine: Engine) -> None:
+    """Liga o contador a um engine (síncrono ou ``async_engine.sync_engine``)."""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count_statement(conn, cursor, statement, parameters, context, executemany):
+        stats = _current_stats.get()
+        if stats is not None:
+            stats.add(statement)
+            conn.info["query_started_at"] = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def time_statement(conn, cursor, statement, parameters, context, executemany):
+        started_at = conn.info.pop("query_started_at", None)
+        stats = _current_stats.get()
+        if stats is not None and started_at is not None:
+            stats.duration += time.perf_counter() - started_at
+
+
+def query_budget(max_queries: int) -> Callable:
+    """Declara o máximo de comandos SQL de uma rota.
+
+    Vai abaixo do decorator do router::
+
+        @router.post("/{table_id}/orders")
+        @query_budget(10)
+        async def create_order(...):
+    """
+
+    def decorator(endpoint: Callable) -> Callable:
+        endpoint.query_budget = max_queries
+        return endpoint
+
+    return decorator
+
+
+class QueryCountMiddleware:
+    """Abre o contador de cada requisição HTTP e confere o orçamento da rota."""
+
+    def __init__(self, app, enforce: bool = False):
+        self.app = app
+        self.enforce = enforce
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with count_queries(record=self.enforce) as stats:
+            await self.app(scope, receive, send)
+
+        # O roteamento grava a rota encontrada no próprio scope
+        route = scope.get("route")
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        if budget is None or stats.count <= budget:
+            return
+
+        route_path = getattr(route, "path", scope["path"])
+        if self.enforce:
+            raise QueryBudgetExceeded(
+                f"{scope['method']} {route_path}: {stats.count} comandos SQL "
+                f"(orçamento {budget})\n" + "\n".join(stats.statements)
+            )
+        logger.warning(
+            {
+                "event": "sql_query_budget_exceeded",
+                "method": scope["method"],
+                "route": route_path,
+                "queries": stats.count,
+                "budget": budget,
+            }
+        )
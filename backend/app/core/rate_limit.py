@@ -0,0 +1,160 @@
+"""
+Limitador de tentativas de login (token bucket).
+
+Cada tentativa consome uma ficha de dois baldes: um por usuário + IP
+(``LOGIN_RATE_LIMIT_*``) e um por IP (``LOGIN_IP_RATE_LIMIT_*``, contra
+quem testa vários usuários). As fichas voltam continuamente na taxa
+configurada. Balde vazio responde 429 com ``Retry-After`` antes de
+qualquer consulta ao banco ou bcrypt.
+
+Por padrão os baldes ficam na memória do processo (com no máximo
+``LOGIN_RATE_LIMIT_MAX_KEYS`` chaves). Com ``RATE_LIMIT_REDIS_URL`` eles
+ficam no Redis e o limite vale para todos os workers do uvicorn; se o
+Redis falhar, o login segue sem limite (e um warning vai para o log).
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from loguru import logger
+
+from app.core.config import Settings
+
+settings = Settings()
+
+
+class MemoryBuckets:
+    """Baldes na memória do processo, LRU limitada a ``max_keys``."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    async def take(self, key: str, capacity: int, per_second: float) -> float:
+        """Consome uma ficha; devolve 0 ou os segundos até a próxima ficha."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.pop(key, (capacity, now))
+        tokens = min(capacity, tokens + (now - updated) * per_second)
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / per_second
+        self._buckets[key] = (tokens, now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+# O relógio é o do Redis (TIME): workers com relógios diferentes veem o
+# mesmo balde
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or capacity
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(capacity, tokens + (now - updated) * per_second)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(capacity / per_second) + 1)
+return tostring(retry_after)
+"""
+
+
+class RedisBuckets:
+    """Baldes compartilhados entre workers, atualizados por um script Lua."""
+
+    def __init__(self, url: str):
+        # Dependência opcional: só é necessária com RATE_LIMIT_REDIS_URL
+        from redis.asyncio import Redis
+
+        self._redis = Redis.from_url(url)
+        self._take = self._redis.register_script(_TAKE_SCRIPT)
+
+    async def take(self, key: str, capacity: int, per_second: float) -> float:
+        retry_after = await self._take(
+            keys=[f"quiosque:ratelimit:{key}"], args=[capacity, per_second]
+        )
+        return float(retry_after)
+
+
+class LoginRateLimiter:
+    """Aplica os dois baldes do login e conta as tentativas recusadas."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.allowed = 0
+        self.rejected = {"user_ip": 0, "ip": 0}
+        self.backend_errors = 0
+
+    async def check(self, username: str, client_ip: str) -> float:
+        """0 se a tentativa pode seguir, senão os segundos para tentar de novo."""
+        limits = (
+            (
+                "ip",
+                f"ip:{client_ip}",
+                settings.LOGIN_IP_RATE_LIMIT_BURST,
+                settings.LOGIN_IP_RATE_LIMIT_PER_MINUTE,
+            ),
+            (
+                "user_ip",
+                f"user_ip:{username.lower()}:{client_ip}",
+                settings.LOGIN_RATE_LIMIT_BURST,
+                settings.LOGIN_RATE_LIMIT_PER_MINUTE,
+            ),
+        )
+        for reason, key, capacity, per_minute in limits:
+            if capacity <= 0:
+                continue
+            try:
+                retry_after = await self.buckets.take(key, capacity, per_minute / 60)
+            except Exception as exc:
+                with self._lock:
+                    self.backend_errors += 1
+                logger.warning({"event": "login_rate_limit_error", "error": str(exc)})
+                return 0.0
+            if retry_after:
+                with self._lock:
+                    self.rejected[reason] += 1
+                logger.warning(
+                    {
+                        "event": "login_rate_limited",
+                        "reason": reason,
+                        "username": username,
+                        "client_ip": client_ip,
+                        "retry_after": round(retry_after, 1),
+                    }
+                )
+                return retry_after
+        with self._lock:
+            self.allowed += 1
+        return 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "backend": type(self.buckets).__name__,
+                "allowed": self.allowed,
+                "rejected": dict(self.rejected),
+                "backend_errors": self.backend_errors,
+            }
+
+
+def _build_buckets(redis_url: Optional[str]):
+    if redis_url:
+        return RedisBuckets(redis_url)
+    return MemoryBuckets(settings.LOGIN_RATE_LIMIT_MAX_KEYS)
+
+
+login_rate_limiter = LoginRateLimiter(_build_buckets(settings.RATE_LIMIT_REDIS_URL))
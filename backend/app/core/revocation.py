@@ -0,0 +1,169 @@
+"""
+Revogação de tokens de usuários e clientes sem consulta ao banco por requisição.
+
+Cada usuário tem um ``token_version``, gravado no claim ``ver`` dos
+access tokens junto com o id do usuário (``uid``). Excluir o usuário,
+trocar o papel ou a senha (pelo administrador) incrementa a versão e
+publica um evento ``user`` no feed de alterações (``app.crud.change_event``).
+Clientes (agentes) seguem o mesmo esquema com o claim ``cid`` e eventos
+``client``: excluir, desativar, trocar papel/escopos ou rotacionar o
+segredo invalida os tokens de longa duração já emitidos. Cada worker
+guarda em memória a versão atual de cada um e recusa tokens com versão
+menor: ``get_current_user`` continua sendo uma consulta a um dict.
+
+As versões são indexadas pelo id, não pelo nome: um usuário excluído e
+recriado com o mesmo nome ganha outro id (``users`` e ``clients`` não
+reaproveitam ids), e os tokens emitidos antes da exclusão continuam
+recusados.
+
+O worker que fez a alteração aplica a nova versão logo após o commit; os
+outros leem o feed a cada ``REVOCATION_SYNC_SECONDS`` (uma consulta
+indexada por worker, não por requisição).
+"""
+
+import asyncio
+import math
+import threading
+from datetime import datetime
+
+from loguru import logger
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import Settings
+from app.crud.change_event import get_changes, get_last_change_id
+from app.models.change_event import ChangeEvent
+from app.models.client import Client
+from app.models.user import User
+
+settings = Settings()
+
+# Versão de usuários excluídos: nenhum token é aceito
+DELETED = math.inf
+_PENDING = "token_revocations"
+# Entidades do feed com versão de tokens
+ENTITIES = {"user": User, "client": Client}
+
+
+class RevocationCache:
+    """Versão atual dos tokens por (entidade, id), sincronizada pelo feed."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._versions: dict[tuple[str, int], float] = {}
+        self.cursor = 0
+        self.rejected = 0
+        self.synced_at = None
+
+    def is_revoked(self, entity: str, entity_id: int, token_version: int) -> bool:
+        current = self._versions.get((entity, entity_id))
+        if current is None or token_version >= current:
+            return False
+        with self._lock:
+            self.rejected += 1
+        return True
+
+    def apply(self, entity: str, entity_id: int, version: float) -> None:
+        with self._lock:
+            self._versions[(entity, entity_id)] = version
+
+    def load(self, db: Session) -> None:
+        """Estado inicial: versões atuais e exclusões recentes."""
+        cursor = get_last_change_id(db)
+        versions = {
+            (entity, entity_id): version
+            for entity, model in ENTITIES.items()
+            for entity_id, version in db.execute(select(model.id, model.token_version))
+        }
+        # Tokens de excluídos antes do start ainda podem estar válidos (os de
+        # clientes duram mais)
+        since = datetime.utcnow() - max(
+            settings.access_token_expiration, settings.client_token_expiration
+        )
+        deleted = db.execute(
+            select(ChangeEvent.entity, ChangeEvent.entity_id).where(
+                ChangeEvent.entity.in_(ENTITIES),
+                ChangeEvent.action == "deleted",
+                ChangeEvent.created_at >= since,
+            )
+        )
+        for entity, entity_id in deleted:
+            versions.setdefault((entity, entity_id), DELETED)
+        with self._lock:
+            self._versions = versions
+            self.cursor = cursor
+            self.synced_at = datetime.utcnow()
+
+    def sync(self, db: Session, batch_size: int = 500) -> int:
+        """Aplica os eventos ``user`` e ``client`` publicados depois do cursor."""
+        applied = 0
+        while True:
+            events = get_changes(
+                db, after=self.cursor, limit=batch_size, entities=ENTITIES
+            )
+            for change in events:
+                data = change.data or {}
+                if change.action == "deleted":
+                    self.apply(change.entity, change.entity_id, DELETED)
+                elif "token_version" in data:
+                    self.apply(change.entity, change.entity_id, data["token_version"])
+                self.cursor = change.id
+            applied += len(events)
+            if len(events) < batch_size:
+                break
+        self.synced_at = datetime.utcnow()
+        return applied
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                **{
+                    f"{entity}s": sum(key[0] == entity for key in self._versions)
+                    for entity in ENTITIES
+                },
+                "deleted": sum(v == DELETED for v in self._versions.values()),
+                "cursor": self.cursor,
+                "rejected": self.rejected,
+                "synced_at": self.synced_at,
+            }
+
+
+revocations = RevocationCache()
+
+
+def revoke_on_commit(db: Session, entity: str, entity_id: int, version: float) -> None:
+    """Aplica a nova versão neste worker quando a transação for confirmada."""
+    db.info.setdefault(_PENDING, []).append((entity, entity_id, version))
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_committed_revocations(session: Session) -> None:
+    for entity, entity_id, version in session.info.pop(_PENDING, ()):
+        revocations.apply(entity, entity_id, version)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_revocations(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _load_and_sync(session_factory, initial: bool) -> None:
+    with session_factory() as db:
+        if initial:
+            revocations.load(db)
+        else:
+            revocations.sync(db)
+
+
+async def run_revocation_sync(session_factory) -> None:
+    """Carrega o estado e acompanha o feed até ser cancelada (startup)."""
+    initial = True
+    while True:
+        try:
+            await run_in_threadpool(_load_and_sync, session_factory, initial)
+            initial = False
+        except Exception as exc:
+            logger.warning({"event": "revocation_sync_error", "error": str(exc)})
+        await asyncio.sleep(settings.REVOCATION_SYNC_SECONDS)
@@ -1,26 +1,85 @@
+import asyncio
+import hashlib
+import hmac
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timezone
+from typing import Optional
 
-import bcrypt
 from jose import jwt
 
+import bcrypt_worker
 from app.core.config import Settings
 
 settings = Settings()
 ALGORITHM = settings.ALGORITHM
 SECRET_KEY = settings.SECRET_KEY
 
+# Escopos dos tokens de clientes (agentes de impressão): cada escopo libera
+# os endpoints com estes prefixos. Tokens de usuários não têm escopo.
+CLIENT_SCOPES = {
+    "print_queue": ("/print-queue/", "/print-queues/"),
+    "changes": ("/changes/",),
+}
 
-def hash_password(password: str) -> str:
-    hashed = bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt())
-    return hashed.decode("utf-8")
+# bcrypt roda num pool de processos próprio e limitado: uma rajada de logins
+# na troca de turno não ocupa o threadpool nem o GIL das rotas de pedidos. Os
+# processos executam as funções de ``bcrypt_worker``, que não importa ``app``.
+_bcrypt_pool: Optional[ProcessPoolExecutor] = None
+
+
+def hash_password(password: str, rounds: Optional[int] = None) -> str:
+    return bcrypt_worker.hash_password(password, rounds or settings.BCRYPT_ROUNDS)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return bcrypt.checkpw(
-        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    return bcrypt_worker.verify_password(plain_password, hashed_password)
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """True se o hash foi gerado com um custo diferente de ``BCRYPT_ROUNDS``."""
+    # Formato: $2b$<custo>$<salt+hash>
+    return int(hashed_password.split("$")[2]) != settings.BCRYPT_ROUNDS
+
+
+def _get_bcrypt_pool() -> ProcessPoolExecutor:
+    global _bcrypt_pool
+    if _bcrypt_pool is None:
+        _bcrypt_pool = ProcessPoolExecutor(
+            max_workers=settings.BCRYPT_WORKERS,
+            # spawn: o fork de um processo com threads (pool de conexões,
+            # event loop) pode herdar locks presos
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _bcrypt_pool
+
+
+async def _run_bcrypt(fn, *args):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_bcrypt_pool(), fn, *args)
+
+
+async def hash_password_async(password: str) -> str:
+    """``hash_password`` no pool de bcrypt, com o custo atual."""
+    return await _run_bcrypt(
+        bcrypt_worker.hash_password, password, settings.BCRYPT_ROUNDS
     )
 
 
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` no pool de bcrypt."""
+    return await _run_bcrypt(
+        bcrypt_worker.verify_password, plain_password, hashed_password
+    )
+
+
+def shutdown_bcrypt_pool() -> None:
+    global _bcrypt_pool
+    if _bcrypt_pool is not None:
+        _bcrypt_pool.shutdown(cancel_futures=True)
+        _bcrypt_pool = None
+
+
 def create_access_token(data: dict, expires_delta=None) -> str:
     to_encode = data.copy()
     expire = datetime.now(timezone.utc) + (
@@ -28,3 +87,63 @@ def create_access_token(data: dict, expires_delta=None) -> str:
     )
     to_encode.update({"exp": expire})
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def create_user_token(user) -> str:
+    """Access token do usuário, com o id e a versão checados na revogação."""
+    return create_access_token(
+        {
+            "sub": user.username,
+            "uid": user.id,
+            "role": user.role,
+            "ver": user.token_version,
+        }
+    )
+
+
+def hash_client_secret(client_secret: str) -> str:
+    """HMAC-SHA256 do segredo de cliente.
+
+    Os segredos são gerados pelo servidor com 256 bits aleatórios: não
+    precisam de bcrypt e a conferência custa microssegundos.
+    """
+    return hmac.new(
+        SECRET_KEY.encode("utf-8"), client_secret.encode("utf-8"), hashlib.sha256
+    ).hexdigest()
+
+
+def verify_client_secret(client_secret: str, secret_hash: str) -> bool:
+    return hmac.compare_digest(hash_client_secret(client_secret), secret_hash)
+
+
+def scope_allows(scopes: list[str], path: str) -> bool:
+    """True se algum dos escopos libera o endpoint ``path``."""
+    return any(
+        path.startswith(prefix)
+        for scope in scopes
+        for prefix in CLIENT_SCOPES.get(scope, ())
+    )
+
+
+def create_client_token(
+    client_id: str,
+    role: str,
+    scopes: Optional[list[str]] = None,
+    client_pk: Optional[int] = None,
+    token_version: int = 1,
+) -> str:
+    """Token de longa duração de um cliente, limitado aos ``scopes``.
+
+    ``client_pk`` (``Client.id``) e ``token_version`` vão nos claims ``cid``
+    e ``ver``, checados na revogação.
+    """
+    return create_access_token(
+        {
+            "sub": client_id,
+            "cid": client_pk,
+            "role": role,
+            "scope": " ".join(scopes or ["print_queue"]),
+            "ver": token_version,
+        },
+        expires_delta=settings.client_token_expiration,
+    )
@@ -0,0 +1,139 @@
+"""
+Tempo de cada etapa da requisição (header ``Server-Timing``).
+
+O ``LoggingMiddleware`` abre um ``RequestTimings`` por requisição num
+``ContextVar``; cada etapa soma o seu tempo nele:
+
+- ``auth``: ``get_current_user`` (token, revogação e escopo);
+- ``db``: tempo e número de comandos SQL, medidos pelo contador de
+  ``app.core.query_counter`` (``before/after_cursor_execute``);
+- ``handler``: a função da rota, incluindo as chamadas ao banco;
+- ``serialize``: do retorno da rota até a resposta pronta (validação pelo
+  ``response_model`` e JSON).
+
+As rotas são medidas pelo ``TimedRoute``, o ``route_class`` dos routers.
+Com ``SERVER_TIMING=true`` a resposta leva o header, que aparece na aba de
+rede do devtools dos tablets; os mesmos campos vão sempre para o log.
+"""
+
+import asyncio
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional
+
+from fastapi.routing import APIRoute
+
+from app.core.query_counter import QueryStats
+
+
+class RequestTimings:
+    """Duração (ms) das etapas de uma requisição."""
+
+    def __init__(self):
+        self.durations: dict[str, float] = {}
+        self.handler_end: Optional[float] = None
+
+    def add(self, name: str, duration_ms: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + duration_ms
+
+    def log_fields(self, stats: Optional[QueryStats]) -> dict:
+        fields = {f"{name}_ms": round(ms, 2) for name, ms in self.durations.items()}
+        if stats is not None:
+            fields["db_ms"] = round(stats.duration * 1000, 2)
+        return fields
+
+    def header(self, stats: Optional[QueryStats], total_ms: float) -> str:
+        metrics = [f"{name};dur={ms:.2f}" for name, ms in self.durations.items()]
+        if stats is not None:
+            metrics.append(
+                f'db;dur={stats.duration * 1000:.2f};desc="{stats.count} SQL"'
+            )
+        metrics.append(f"total;dur={total_ms:.2f}")
+        return ", ".join(metrics)
+
+
+_current_timings: ContextVar[Optional[RequestTimings]] = ContextVar(
+    "request_timings", default=None
+)
+
+
+def current_timings() -> Optional[RequestTimings]:
+    return _current_timings.get()
+
+
+@contextmanager
+def request_timings() -> Iterator[RequestTimings]:
+    timings = RequestTimings()
+    token = _current_timings.set(timings)
+    try:
+        yield timings
+    finally:
+        _current_timings.reset(token)
+
+
+@contextmanager
+def timed(name: str) -> Iterator[None]:
+    """Soma a duração do bloco à etapa ``name`` da requisição atual."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings = _current_timings.get()
+        if timings is not None:
+            timings.add(name, (time.perf_counter() - start) * 1000)
+
+
+def _finish_handler(start: float) -> None:
+    timings = _current_timings.get()
+    if timings is not None:
+        timings.handler_end = time.perf_counter()
+        timings.add("handler", (timings.handler_end - start) * 1000)
+
+
+def _timed_endpoint(endpoint: Callable) -> Callable:
+    # functools.wraps mantém a assinatura (dependências do FastAPI) e os
+    # atributos da função, como o query_budget
+    if asyncio.iscoroutinefunction(endpoint):
+
+        @functools.wraps(endpoint)
+        async def timed_endpoint(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return await endpoint(*args, **kwargs)
+            finally:
+                _finish_handler(start)
+
+    else:
+
+        @functools.wraps(endpoint)
+        def timed_endpoint(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return endpoint(*args, **kwargs)
+            finally:
+                _finish_handler(start)
+
+    return timed_endpoint
+
+
+class TimedRoute(APIRoute):
+    """Rota que mede a função da rota e a serialização da resposta."""
+
+    def __init__(self, path: str, endpoint: Callable, **kwargs):
+        super().__init__(path, _timed_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self) -> Callable:
+        handler = super().get_route_handler()
+
+        async def timed_handler(request):
+            response = await handler(request)
+            timings = _current_timings.get()
+            if timings is not None and timings.handler_end is not None:
+                timings.add(
+                    "serialize", (time.perf_counter() - timings.handler_end) * 1000
+                )
+            return response
+
+        return timed_handler
@@ -0,0 +1,147 @@
+"""
+Perfil de produção para SQLite.
+
+Quiosques pequenos rodam com SQLite em uma única máquina. Para aguentar
+vários garçons lançando pedidos ao mesmo tempo, cada conexão nova recebe
+os pragmas do perfil (WAL, ``synchronous``, ``busy_timeout``, mmap e
+cache) e as escritas são serializadas:
+
+- leituras rodam em autocommit, sem segurar lock nenhum (no WAL leitores
+  não bloqueiam o escritor);
+- o primeiro comando de escrita de uma transação abre ``BEGIN IMMEDIATE``,
+  que reserva o lock de escrita do arquivo logo no início e evita o
+  ``database is locked`` da promoção de leitura para escrita;
+- no engine síncrono, um lock do processo enfileira os escritores antes do
+  ``BEGIN IMMEDIATE``, de modo que eles esperam em fila no Python em vez
+  de disputar o arquivo no busy handler do SQLite.
+
+No engine assíncrono o lock do processo não é usado (bloquearia o event
+loop); a espera fica com o ``busy_timeout`` na thread do aiosqlite.
+"""
+
+import threading
+from typing import Optional
+
+from loguru import logger
+from sqlalchemy import event
+from sqlalchemy.engine import Engine, make_url
+
+from app.core.config import Settings
+
+# Comandos que abrem a transação de escrita
+WRITE_KEYWORDS = {
+    "INSERT",
+    "UPDATE",
+    "DELETE",
+    "REPLACE",
+    "CREATE",
+    "DROP",
+    "ALTER",
+    "SAVEPOINT",
+}
+
+_WRITE_TXN = "sqlite_write_txn"
+_HOLDS_LOCK = "sqlite_write_lock"
+
+
+def is_file_sqlite(database_url: str) -> bool:
+    """Indica se a URL aponta para um arquivo SQLite (não em memória)."""
+    url = make_url(database_url)
+    return url.get_backend_name() == "sqlite" and url.database not in (
+        None,
+        "",
+        ":memory:",
+    )
+
+
+def sqlite_pragmas(settings: Settings) -> list[str]:
+    """Pragmas aplicados em cada conexão nova."""
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        # Valor negativo = tamanho em KiB em vez de número de páginas
+        f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}",
+    ]
+
+
+def configure_sqlite_engine(
+    engine: Engine, settings: Settings, write_lock: Optional[threading.Lock] = None
+) -> None:
+    """Aplica o perfil SQLite a um engine (síncrono ou ``async_engine.sync_engine``).
+
+    Com ``write_lock`` as transações de escrita do engine são enfileiradas
+    nesse lock; sem ele a serialização fica só com o ``BEGIN IMMEDIATE``.
+    """
+    pragmas = sqlite_pragmas(settings)
+    lock_timeout = settings.SQLITE_BUSY_TIMEOUT_MS / 1000
+
+    def release(info: dict) -> None:
+        info[_WRITE_TXN] = False
+        if info.pop(_HOLDS_LOCK, False):
+            write_lock.release()
+
+    @event.listens_for(engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record):
+        # O driver não abre transações sozinho; quem decide é o BEGIN abaixo
+        dbapi_connection.isolation_level = None
+        cursor = dbapi_connection.cursor()
+        try:
+            for pragma in pragmas:
+                cursor.execute(pragma)
+        finally:
+            cursor.close()
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def begin_write(conn, cursor, statement, parameters, context, executemany):
+        if conn.info.get(_WRITE_TXN):
+            return
+        keyword = statement.lstrip().split(None, 1)[0].upper() if statement else ""
+        if keyword not in WRITE_KEYWORDS:
+            return
+        if write_lock is not None:
+            if write_lock.acquire(timeout=lock_timeout):
+                conn.info[_HOLDS_LOCK] = True
+            else:
+                logger.warning(
+                    {"event": "sqlite_write_lock_timeout", "timeout_s": lock_timeout}
+                )
+        try:
+            cursor.execute("BEGIN IMMEDIATE")
+        except Exception:
+            release(conn.info)
+            raise
+        conn.info[_WRITE_TXN] = True
+
+    @event.listens_for(engine, "commit")
+    def commit_write(conn):
+        if not conn.info.get(_WRITE_TXN):
+            return
+        # O evento roda antes do COMMIT do SQLAlchemy; o commit é feito aqui
+        # para só liberar a fila depois dele (o do SQLAlchemy vira no-op)
+        try:
+            conn.connection.dbapi_connection.commit()
+        finally:
+            release(conn.info)
+
+    @event.listens_for(engine, "rollback")
+    def rollback_write(conn):
+        if not conn.info.get(_WRITE_TXN):
+            return
+        try:
+            conn.connection.dbapi_connection.rollback()
+        finally:
+            release(conn.info)
+
+    @event.listens_for(engine, "reset")
+    def reset_write(dbapi_connection, connection_record, reset_state):
+        # Conexão devolvida ao pool com a transação de escrita ainda aberta
+        if connection_record.info.get(_WRITE_TXN):
+            dbapi_connection.rollback()
+            release(connection_record.info)
+
+    @event.listens_for(engine, "invalidate")
+    def invalidate_write(dbapi_connection, connection_record, exception):
+        if connection_record.info.get(_WRITE_TXN):
+            release(connection_record.info)
@@ -0,0 +1,89 @@
+"""
+Cache de tokens JWT já verificados.
+
+Os tablets mandam o mesmo token a cada poucos segundos durante o turno
+inteiro. ``get_current_user`` verifica a assinatura só na primeira vez e
+guarda o ``TokenData`` resultante, indexado pelo SHA-256 do token, até o
+``exp`` do token (limitado a ``AUTH_CACHE_TTL_SECONDS``). O cache é LRU e
+tem no máximo ``AUTH_CACHE_SIZE`` entradas; acertos e falhas ficam em
+contadores expostos em ``GET /system/auth-cache``.
+
+Tokens inválidos não entram no cache.
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.config import Settings
+from app.schemas.auth import TokenData
+
+settings = Settings()
+
+
+def _digest(token: str) -> bytes:
+    return hashlib.sha256(token.encode("utf-8")).digest()
+
+
+class TokenCache:
+    """LRU limitada de ``TokenData`` por token, com validade."""
+
+    def __init__(self, maxsize: int, ttl_seconds: float):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[bytes, tuple[TokenData, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, token: str) -> Optional[TokenData]:
+        """``TokenData`` do token, se estiver no cache e ainda válido."""
+        key = _digest(token)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[1] > time.time():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return entry[0]
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+    def put(self, token: str, data: TokenData, exp: Optional[float]) -> None:
+        """Guarda um token verificado até ``exp`` (timestamp Unix)."""
+        if self.maxsize <= 0:
+            return
+        expires_at = time.time() + self.ttl_seconds
+        if exp is not None:
+            expires_at = min(expires_at, exp)
+        key = _digest(token)
+        with self._lock:
+            self._entries[key] = (data, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+token_cache = TokenCache(settings.AUTH_CACHE_SIZE, settings.AUTH_CACHE_TTL_SECONDS)
@@ -0,0 +1,60 @@
+"""
+Concorrência otimista.
+
+``Order``, ``Table`` e ``Product`` têm uma coluna ``version_id`` usada como
+``version_id_col`` do SQLAlchemy: todo UPDATE leva ``WHERE version_id = ?``
+e incrementa a versão. Se outra requisição gravou a linha no meio do
+caminho, o UPDATE não encontra nada e o ORM levanta ``StaleDataError``,
+que vira 409 em vez de sobrescrever a alteração do outro garçom.
+
+O estoque é a exceção: pedidos baixam o estoque com um ``UPDATE`` atômico
+condicionado à quantidade (``app.crud.product.adjust_stock``), que só
+incrementa a versão. Dois pedidos simultâneos do mesmo produto não geram
+409; falta de estoque vira 400.
+
+A versão também é o ``ETag`` do recurso. O cliente que manda
+``If-Match`` com o ETag que leu recebe 409 se a versão atual for outra,
+antes de qualquer escrita.
+"""
+
+from typing import Optional
+
+from fastapi import HTTPException, Request, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy import Column, Integer
+from sqlalchemy.orm.exc import StaleDataError
+
+VERSION_CONFLICT = "Resource was modified by another request; reload and try again"
+
+
+def version_column() -> Column:
+    return Column(Integer, nullable=False, default=1, server_default="1")
+
+
+def etag(version_id: int) -> str:
+    return f'"{version_id}"'
+
+
+def set_etag(response: Response, resource) -> None:
+    response.headers["ETag"] = etag(resource.version_id)
+
+
+def check_if_match(if_match: Optional[str], resource) -> None:
+    """Falha com 409 se ``If-Match`` não bate com a versão atual."""
+    if if_match is None:
+        return
+    current = etag(resource.version_id)
+    for tag in if_match.split(","):
+        tag = tag.strip()
+        if tag.startswith("W/"):
+            tag = tag[2:]
+        if tag in ("*", current):
+            return
+    raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=VERSION_CONFLICT)
+
+
+async def stale_data_handler(request: Request, exc: StaleDataError) -> JSONResponse:
+    """Converte a perda da corrida de escrita (``StaleDataError``) em 409."""
+    return JSONResponse(
+        status_code=status.HTTP_409_CONFLICT, content={"detail": VERSION_CONFLICT}
+    )
@@ -0,0 +1,74 @@
+"""
+Arquivamento de mesas fechadas (dados quentes -> frios).
+
+Um lote escolhe as mesas fechadas antes do corte, mais antigas primeiro,
+e move para as tabelas ``archive_*`` as mesas, os pedidos, os itens, os
+pagamentos e as impressões delas: ``INSERT ... SELECT`` no arquivo e
+``DELETE`` na tabela quente, tudo na transação do lote. Mesas com
+impressão ainda pendente ficam para depois.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import exists, or_, select
+from sqlalchemy.orm import Session
+
+from app.models.archive import ARCHIVED_MODELS
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.print_queue import PrintQueue, PrintQueueStatus
+from app.models.table import Table
+
+
+def archive_closed_tables(
+    db: Session, closed_before: datetime, batch_size: int
+) -> dict[str, int]:
+    """Arquiva um lote de até ``batch_size`` mesas fechadas antes do corte.
+
+    Devolve quantas linhas saíram de cada tabela quente (vazio quando não
+    há mais nada a arquivar). Só faz ``flush``; o commit é de quem chama.
+    """
+    table_ids = list(
+        db.scalars(
+            select(Table.id)
+            .where(
+                Table.is_closed == True,
+                Table.closed_at < closed_before,
+                ~exists().where(
+                    PrintQueue.table_id == Table.id,
+                    PrintQueue.status == PrintQueueStatus.PENDING,
+                ),
+            )
+            .order_by(Table.id)
+            .limit(batch_size)
+        )
+    )
+    if not table_ids:
+        return {}
+
+    order_ids = select(Order.id).where(Order.table_id.in_(table_ids))
+    criteria = {
+        PrintQueue: or_(
+            PrintQueue.table_id.in_(table_ids), PrintQueue.order_id.in_(order_ids)
+        ),
+        Payment: Payment.order_id.in_(order_ids),
+        OrderItem: OrderItem.order_id.in_(order_ids),
+        Order: Order.table_id.in_(table_ids),
+        Table: Table.id.in_(table_ids),
+    }
+
+    moved = {}
+    for model, archive in ARCHIVED_MODELS:
+        hot = model.__table__
+        criterion = criteria[model]
+        db.execute(
+            archive.insert().from_select(
+                [column.name for column in hot.columns],
+                select(hot).where(criterion),
+            )
+        )
+        moved[hot.name] = db.execute(hot.delete().where(criterion)).rowcount
+    # Instâncias carregadas nesta sessão não existem mais na tabela quente
+    db.expunge_all()
+    return moved
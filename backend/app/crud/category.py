@@ -9,8 +9,7 @@ def create_category(db: Session, category_data: CategoryCreate) -> Category:
     """Cria uma nova categoria."""
     category = Category(**category_data.model_dump())
     db.add(category)
-    db.commit()
-    db.refresh(category)
+    db.flush()
     return category
 
 
@@ -36,15 +35,14 @@ def update_category(db: Session, category: Category, updates: CategoryUpdate) ->
     """Atualiza uma categoria existente."""
     for field, value in updates.model_dump(exclude_unset=True).items():
         setattr(category, field, value)
-    db.commit()
-    db.refresh(category)
+    db.flush()
     return category
 
 
 def delete_category(db: Session, category: Category) -> None:
     """Remove uma categoria."""
     db.delete(category)
-    db.commit()
+    db.flush()
 
 
 def get_category_with_products(db: Session, category_id: int) -> Category | None:
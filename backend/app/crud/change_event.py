@@ -0,0 +1,86 @@
+"""
+CRUD do feed de alterações (outbox transacional).
+
+As funções CRUD de escrita chamam ``record_change`` depois de alterar a
+entidade. Os eventos ficam guardados na sessão e são gravados num único
+INSERT (executemany) logo antes do commit, dentro da mesma transação da
+escrita: ou os dois ficam gravados, ou nenhum. Se a requisição falhar, o
+rollback descarta os eventos pendentes.
+
+Leitores acompanham o feed pelo cursor (``id`` do último evento visto)
+em vez de reler tabelas inteiras.
+"""
+
+from datetime import datetime
+from typing import Iterable, Optional
+
+from sqlalchemy import event, func, insert, select
+from sqlalchemy.orm import Session
+
+from app.models.change_event import ChangeEvent
+
+_PENDING = "change_events"
+# No PostgreSQL, ids de sequence de transações concorrentes podem ficar
+# visíveis fora de ordem e um leitor pularia eventos. O lock (liberado no
+# commit) serializa só o trecho final da gravação dos eventos.
+_POSTGRES_LOCK_KEY = 7301
+
+
+def record_change(
+    db: Session, entity: str, entity_id: int, action: str, **data
+) -> None:
+    """Registra a alteração de ``entity``/``entity_id`` na transação atual."""
+    db.info.setdefault(_PENDING, []).append(
+        {
+            "entity": entity,
+            "entity_id": entity_id,
+            "action": action,
+            "data": data or None,
+            "created_at": datetime.utcnow(),
+        }
+    )
+
+
+def get_changes(
+    db: Session,
+    after: int = 0,
+    limit: int = 100,
+    entity: Optional[str] = None,
+    entities: Optional[Iterable[str]] = None,
+    exclude_entities: Iterable[str] = (),
+) -> list[ChangeEvent]:
+    """Eventos com ``id`` maior que o cursor ``after``, em ordem.
+
+    ``entity`` filtra uma entidade; ``entities``, várias;
+    ``exclude_entities`` omite as entidades listadas.
+    """
+    query = select(ChangeEvent).where(ChangeEvent.id > after)
+    if entity:
+        query = query.where(ChangeEvent.entity == entity)
+    if entities is not None:
+        query = query.where(ChangeEvent.entity.in_(list(entities)))
+    if exclude_entities:
+        query = query.where(ChangeEvent.entity.not_in(list(exclude_entities)))
+    return list(db.scalars(query.order_by(ChangeEvent.id).limit(limit)))
+
+
+def get_last_change_id(db: Session) -> int:
+    """Cursor atual do feed (0 se não houver eventos)."""
+    return db.scalar(select(func.coalesce(func.max(ChangeEvent.id), 0)))
+
+
+@event.listens_for(Session, "before_commit")
+def _write_pending_changes(session: Session) -> None:
+    pending = session.info.pop(_PENDING, None)
+    if not pending:
+        return
+    if session.get_bind().dialect.name == "postgresql":
+        session.execute(select(func.pg_advisory_xact_lock(_POSTGRES_LOCK_KEY)))
+    session.execute(insert(ChangeEvent), pending)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_changes(session: Session, transaction) -> None:
+    # Fim da transação principal sem commit (rollback/close): descarta
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
@@ -1,18 +1,95 @@
 """
 Operações CRUD para clientes.
 
-Este módulo contém as operações de banco de dados para clientes.
+Este módulo contém as operações de banco de dados para clientes. As
+credenciais usadas no login ficam num cache em memória por
+``CLIENT_CACHE_TTL_SECONDS``: agentes que renovam o token com frequência
+não vão ao banco a cada login. Alterações feitas neste processo limpam o
+cache logo após o commit; nos outros workers valem depois do TTL.
+
+Excluir, desativar, trocar papel/escopos ou rotacionar o segredo incrementa
+o ``token_version`` do cliente e publica um evento ``client`` no feed: os
+tokens já emitidos deixam de valer em todos os workers
+(``app.core.revocation``).
 """
 
+import secrets
+import time
+from typing import NamedTuple
+
+from sqlalchemy import event
 from sqlalchemy.orm import Session
 
+from app.core.config import Settings
+from app.core.revocation import DELETED, revoke_on_commit
+from app.core.security import hash_client_secret, verify_client_secret
+from app.crud.change_event import record_change
 from app.models.client import Client
 from app.schemas.client import ClientCreate, ClientUpdate
 
+settings = Settings()
+
+_PENDING = "client_credentials_evictions"
+
+
+class ClientCredentials(NamedTuple):
+    """O que o login de cliente precisa, sem prender uma instância do ORM."""
+
+    id: int
+    client_id: str
+    secret_hash: str
+    role: str
+    scopes: list[str]
+    is_active: bool
+    token_version: int
+
+
+# client_id -> (expira em, credenciais)
+_credentials_cache: dict[str, tuple[float, ClientCredentials]] = {}
+
+
+# Alterações que invalidam os tokens já emitidos
+_REVOKING_FIELDS = ("is_active", "role", "scopes")
+
+
+def _forget_credentials(db: Session, client_id: str) -> None:
+    """Tira o cliente do cache quando a transação for confirmada.
+
+    Limpar antes do commit deixaria um login concorrente guardar de novo as
+    credenciais antigas, ainda as únicas visíveis no banco.
+    """
+    db.info.setdefault(_PENDING, []).append(client_id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed_credentials(session: Session) -> None:
+    for client_id in session.info.pop(_PENDING, ()):
+        _credentials_cache.pop(client_id, None)
+
+
+@event.listens_for(Session, "after_transaction_end")
+def _discard_pending_evictions(session: Session, transaction) -> None:
+    if transaction.parent is None:
+        session.info.pop(_PENDING, None)
+
+
+def _record_client_change(db: Session, client: Client, action: str) -> None:
+    # Publica a versão dos tokens para os outros workers (app.core.revocation)
+    version = DELETED if action == "deleted" else client.token_version
+    data = {} if action == "deleted" else {"token_version": client.token_version}
+    record_change(db, "client", client.id, action, client_id=client.client_id, **data)
+    revoke_on_commit(db, "client", client.id, version)
+
+
+def _revoke_tokens(db: Session, client: Client) -> None:
+    """Invalida os tokens já emitidos para o cliente."""
+    client.token_version = (client.token_version or 1) + 1
+    _record_client_change(db, client, "revoked")
+
 
 def get_client_by_id(db: Session, client_id: int) -> Client | None:
     """Busca um cliente pelo ID."""
-    return db.query(Client).filter(Client.id == client_id).first()
+    return db.get(Client, client_id)
 
 
 def get_client_by_client_id(db: Session, client_id: str) -> Client | None:
@@ -30,18 +107,21 @@ def get_clients(db: Session, skip: int = 0, limit: int = 100) -> list[Client]:
     return db.query(Client).offset(skip).limit(limit).all()
 
 
-def create_client(db: Session, client: ClientCreate) -> Client:
-    """Cria um novo cliente."""
+def create_client(db: Session, client: ClientCreate) -> tuple[Client, str]:
+    """Cria um novo cliente e devolve o segredo gerado (mostrado uma vez)."""
+    client_secret = secrets.token_urlsafe(32)
     db_client = Client(
         client_id=client.client_id,
-        client_secret=client.client_secret,
+        client_secret_hash=hash_client_secret(client_secret),
         name=client.name,
         role=client.role,
+        scopes=" ".join(client.scopes),
     )
     db.add(db_client)
-    db.commit()
-    db.refresh(db_client)
-    return db_client
+    db.flush()
+    _record_client_change(db, db_client, "created")
+    _forget_credentials(db, db_client.client_id)
+    return db_client, client_secret
 
 
 def update_client(
@@ -52,15 +132,36 @@ def update_client(
     if not db_client:
         return None
 
-    update_data = client_update.dict(exclude_unset=True)
+    update_data = client_update.model_dump(exclude_unset=True)
+    if "scopes" in update_data:
+        update_data["scopes"] = " ".join(update_data["scopes"] or [])
+    revoke = any(
+        field in update_data and update_data[field] != getattr(db_client, field)
+        for field in _REVOKING_FIELDS
+    )
     for field, value in update_data.items():
         setattr(db_client, field, value)
 
-    db.commit()
-    db.refresh(db_client)
+    if revoke:
+        _revoke_tokens(db, db_client)
+    db.flush()
+    _forget_credentials(db, db_client.client_id)
     return db_client
 
 
+def rotate_client_secret(db: Session, client_id: int) -> tuple[Client, str] | None:
+    """Gera um novo segredo para o cliente; o anterior deixa de valer."""
+    db_client = get_client_by_id(db, client_id)
+    if not db_client:
+        return None
+    client_secret = secrets.token_urlsafe(32)
+    db_client.client_secret_hash = hash_client_secret(client_secret)
+    _revoke_tokens(db, db_client)
+    db.flush()
+    _forget_credentials(db, db_client.client_id)
+    return db_client, client_secret
+
+
 def delete_client(db: Session, client_id: int) -> bool:
     """Remove um cliente."""
     db_client = get_client_by_id(db, client_id)
@@ -68,20 +169,47 @@ def delete_client(db: Session, client_id: int) -> bool:
         return False
 
     db.delete(db_client)
-    db.commit()
+    _record_client_change(db, db_client, "deleted")
+    db.flush()
+    _forget_credentials(db, db_client.client_id)
     return True
 
 
+def get_client_credentials(db: Session, client_id: str) -> ClientCredentials | None:
+    """Credenciais do cliente, do cache quando ainda válidas."""
+    cached = _credentials_cache.get(client_id)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    client = get_client_by_client_id(db, client_id)
+    if client is None:
+        return None
+    credentials = ClientCredentials(
+        id=client.id,
+        client_id=client.client_id,
+        secret_hash=client.client_secret_hash,
+        role=client.role,
+        scopes=client.scopes.split(),
+        is_active=bool(client.is_active),
+        token_version=client.token_version,
+    )
+    _credentials_cache[client_id] = (
+        time.monotonic() + settings.CLIENT_CACHE_TTL_SECONDS,
+        credentials,
+    )
+    return credentials
+
+
 def authenticate_client(
     db: Session, client_id: str, client_secret: str
-) -> Client | None:
+) -> ClientCredentials | None:
     """Autentica um cliente usando client_id e client_secret."""
-    client = get_client_by_client_id(db, client_id)
-    if not client or not client.is_active:
+    credentials = get_client_credentials(db, client_id)
+    if not credentials or not credentials.is_active:
         return None
 
-    # Verifica se o client_secret está correto
-    if client.client_secret != client_secret:
+    # Compara o HMAC do segredo informado em tempo constante
+    if not verify_client_secret(client_secret, credentials.secret_hash):
         return None
 
-    return client
+    return credentials
@@ -1,6 +1,10 @@
 from fastapi import HTTPException
+from sqlalchemy import delete, func, or_, select, update
 from sqlalchemy.orm import Session
 
+from app.core.money import money_sum
+from app.crud.change_event import record_change
+from app.crud.product import adjust_stock, get_products_by_ids, record_product_change
 from app.models.order import Order
 from app.models.order_item import OrderItem
 from app.models.product import Product
@@ -10,20 +14,11 @@ from app.schemas.order import OrderCreate, OrderUpdate, OrderUpdateWithItems, Or
 def create_order(
     db: Session, order_data: OrderCreate, table_id: int, created_by: str
 ) -> Order:
-    # Criar o pedido
-    new_order = Order(
-        table_id=table_id,
-        comment=order_data.comment,
-        status="pending",  # garante o status padrão
-        created_by=created_by,
-    )
-    db.add(new_order)
-    db.flush()  # Para obter o ID do pedido
-
     # Validar estoque de todos os itens antes de criar
+    products = get_products_by_ids(db, (item.product_id for item in order_data.items))
     insufficient = []
     for item_data in order_data.items:
-        product = db.query(Product).filter(Product.id == item_data.product_id).first()
+        product = products.get(item_data.product_id)
         if not product:
             insufficient.append(
                 {
@@ -32,50 +27,77 @@ def create_order(
                 }
             )
         elif product.stock_quantity < item_data.quantity:
-            insufficient.append(
-                {
-                    "product_id": product.id,
-                    "product_name": product.name,
-                    "stock_quantity": product.stock_quantity,
-                    "requested": item_data.quantity,
-                    "message": f"Estoque insuficiente para o produto '{product.name}'. Estoque atual: {product.stock_quantity}, solicitado: {item_data.quantity}.",
-                }
-            )
+            insufficient.append(_insufficient_stock(product, item_data.quantity))
     if insufficient:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "error": "Um ou mais produtos não possuem estoque suficiente.",
-                "products": insufficient,
-            },
-        )
+        _raise_insufficient_stock(insufficient)
+
+    # Criar o pedido
+    new_order = Order(
+        table_id=table_id,
+        comment=order_data.comment,
+        status="pending",  # garante o status padrão
+        created_by=created_by,
+    )
 
     # Criar os itens do pedido e atualizar estoque
     for item_data in order_data.items:
-        product = db.query(Product).filter(Product.id == item_data.product_id).first()
-        # Decrementar estoque
-        product.stock_quantity -= item_data.quantity
-        # Se zerar estoque, desativar produto
-        if product.stock_quantity == 0:
-            product.is_active = False
-        db.add(product)
-
-        order_item = OrderItem(
-            order_id=new_order.id,
-            product_id=item_data.product_id,
-            quantity=item_data.quantity,
-            unit_price=item_data.unit_price,
-            comment=item_data.comment,
+        product = products[item_data.product_id]
+        # Baixa atômica: outro pedido pode ter levado o estoque depois da
+        # conferência acima
+        if not adjust_stock(db, product, -item_data.quantity):
+            db.refresh(product, ["stock_quantity"])
+            _raise_insufficient_stock(
+                [_insufficient_stock(product, item_data.quantity)]
+            )
+
+        # Itens entram pela relação: o pedido já sai do flush com eles
+        new_order.items.append(
+            OrderItem(
+                product_id=item_data.product_id,
+                quantity=item_data.quantity,
+                unit_price=item_data.unit_price,
+                comment=item_data.comment,
+            )
         )
-        db.add(order_item)
+    new_order.recalculate_totals()
 
-    db.commit()
-    db.refresh(new_order)
+    db.add(new_order)
+    # INSERT ... RETURNING: id e created_at voltam no próprio INSERT
+    db.flush()
+    _record_order_change(db, new_order, "created")
+    for product in products.values():
+        record_product_change(db, product)
     return new_order
 
 
+def _insufficient_stock(product: Product, requested: int) -> dict:
+    return {
+        "product_id": product.id,
+        "product_name": product.name,
+        "stock_quantity": product.stock_quantity,
+        "requested": requested,
+        "message": f"Estoque insuficiente para o produto '{product.name}'. Estoque atual: {product.stock_quantity}, solicitado: {requested}.",
+    }
+
+
+def _raise_insufficient_stock(products: list[dict]):
+    raise HTTPException(
+        status_code=400,
+        detail={
+            "error": "Um ou mais produtos não possuem estoque suficiente.",
+            "products": products,
+        },
+    )
+
+
+def _record_order_change(db: Session, order: Order, action: str) -> None:
+    record_change(
+        db, "order", order.id, action, table_id=order.table_id, status=order.status
+    )
+
+
 def update_order(db: Session, order_id: int, order_update: OrderUpdate, updated_by: str = None) -> Order | None:
-    db_order = db.query(Order).filter(Order.id == order_id).first()
+    db_order = db.get(Order, order_id)
     if not db_order:
         return None
 
@@ -96,14 +118,14 @@ def update_order(db: Session, order_id: int, order_update: OrderUpdate, updated_
         if updated_by:
             db_order.cancelled_by = updated_by
 
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
+    _record_order_change(db, db_order, "updated")
     return db_order
 
 
 def update_order_with_items(db: Session, order_id: int, order_update: OrderUpdateWithItems, updated_by: str = None) -> Order | None:
     """Atualiza um pedido incluindo modificações nos itens."""
-    db_order = db.query(Order).filter(Order.id == order_id).first()
+    db_order = db.get(Order, order_id)
     if not db_order:
         return None
 
@@ -139,8 +161,8 @@ def update_order_with_items(db: Session, order_id: int, order_update: OrderUpdat
                     detail=f"Ação inválida: {action.action}. Ações válidas: add, update, remove"
                 )
 
-    db.commit()
-    db.refresh(db_order)
+    db.flush()
+    _record_order_change(db, db_order, "updated")
     return db_order
 
 
@@ -153,34 +175,36 @@ def _add_item_to_order(db: Session, order: Order, action: OrderItemAction):
         )
 
     # Verificar se produto existe e tem estoque
-    product = db.query(Product).filter(Product.id == action.product_id).first()
+    product = db.get(Product, action.product_id)
     if not product:
         raise HTTPException(
             status_code=404,
             detail=f"Produto {action.product_id} não encontrado"
         )
 
-    if product.stock_quantity < action.quantity:
+    # Baixa atômica: falha se não houver estoque no momento do UPDATE
+    if not adjust_stock(db, product, -action.quantity):
+        db.refresh(product, ["stock_quantity"])
         raise HTTPException(
             status_code=400,
             detail=f"Estoque insuficiente para o produto '{product.name}'. Estoque atual: {product.stock_quantity}, solicitado: {action.quantity}"
         )
-
-    # Decrementar estoque
-    product.stock_quantity -= action.quantity
-    if product.stock_quantity == 0:
-        product.is_active = False
-    db.add(product)
-
-    # Criar item do pedido
-    order_item = OrderItem(
-        order_id=order.id,
-        product_id=action.product_id,
-        quantity=action.quantity,
-        unit_price=action.unit_price,
-        comment=action.comment,
+    record_product_change(db, product)
+
+    # Criar item do pedido (pela relação, para a resposta já incluí-lo)
+    order.items.append(
+        OrderItem(
+            product_id=action.product_id,
+            quantity=action.quantity,
+            unit_price=action.unit_price,
+            comment=action.comment,
+        )
     )
-    db.add(order_item)
+    order.recalculate_totals()
+
+
+def _find_order_item(order: Order, item_id: int) -> OrderItem | None:
+    return next((item for item in order.items if item.id == item_id), None)
 
 
 def _update_order_item(db: Session, order: Order, action: OrderItemAction):
@@ -191,11 +215,8 @@ def _update_order_item(db: Session, order: Order, action: OrderItemAction):
             detail="item_id é obrigatório para atualizar item"
         )
 
-    # Buscar item do pedido
-    order_item = db.query(OrderItem).filter(
-        OrderItem.id == action.item_id,
-        OrderItem.order_id == order.id
-    ).first()
+    # Buscar item do pedido (itens já carregados com o pedido)
+    order_item = _find_order_item(order, action.item_id)
     
     if not order_item:
         raise HTTPException(
@@ -204,7 +225,7 @@ def _update_order_item(db: Session, order: Order, action: OrderItemAction):
         )
 
     # Buscar produto
-    product = db.query(Product).filter(Product.id == order_item.product_id).first()
+    product = db.get(Product, order_item.product_id)
     if not product:
         raise HTTPException(
             status_code=404,
@@ -216,25 +237,15 @@ def _update_order_item(db: Session, order: Order, action: OrderItemAction):
     new_quantity = action.quantity or old_quantity
     quantity_diff = new_quantity - old_quantity
 
-    # Se está aumentando a quantidade, verificar estoque
-    if quantity_diff > 0:
-        if product.stock_quantity < quantity_diff:
-            raise HTTPException(
-                status_code=400,
-                detail=f"Estoque insuficiente para o produto '{product.name}'. Estoque atual: {product.stock_quantity}, necessário: {quantity_diff}"
-            )
-        # Decrementar estoque
-        product.stock_quantity -= quantity_diff
-    elif quantity_diff < 0:
-        # Se está diminuindo, incrementar estoque
-        product.stock_quantity += abs(quantity_diff)
-
-    # Atualizar estoque do produto
-    if product.stock_quantity == 0:
-        product.is_active = False
-    elif not product.is_active and product.stock_quantity > 0:
-        product.is_active = True
-    db.add(product)
+    # Aumentando a quantidade: baixa atômica, que falha sem estoque;
+    # diminuindo: devolve a diferença ao estoque
+    if quantity_diff and not adjust_stock(db, product, -quantity_diff):
+        db.refresh(product, ["stock_quantity"])
+        raise HTTPException(
+            status_code=400,
+            detail=f"Estoque insuficiente para o produto '{product.name}'. Estoque atual: {product.stock_quantity}, necessário: {quantity_diff}"
+        )
+    record_product_change(db, product)
 
     # Atualizar item do pedido
     if action.quantity is not None:
@@ -243,8 +254,7 @@ def _update_order_item(db: Session, order: Order, action: OrderItemAction):
         order_item.unit_price = action.unit_price
     if action.comment is not None:
         order_item.comment = action.comment
-
-    db.add(order_item)
+    order.recalculate_totals()
 
 
 def _remove_item_from_order(db: Session, order: Order, action: OrderItemAction):
@@ -255,11 +265,8 @@ def _remove_item_from_order(db: Session, order: Order, action: OrderItemAction):
             detail="item_id é obrigatório para remover item"
         )
 
-    # Buscar item do pedido
-    order_item = db.query(OrderItem).filter(
-        OrderItem.id == action.item_id,
-        OrderItem.order_id == order.id
-    ).first()
+    # Buscar item do pedido (itens já carregados com o pedido)
+    order_item = _find_order_item(order, action.item_id)
     
     if not order_item:
         raise HTTPException(
@@ -268,21 +275,20 @@ def _remove_item_from_order(db: Session, order: Order, action: OrderItemAction):
         )
 
     # Buscar produto para restaurar estoque
-    product = db.query(Product).filter(Product.id == order_item.product_id).first()
+    product = db.get(Product, order_item.product_id)
     if product:
         # Restaurar estoque
-        product.stock_quantity += order_item.quantity
-        if product.stock_quantity > 0 and not product.is_active:
-            product.is_active = True
-        db.add(product)
+        adjust_stock(db, product, order_item.quantity)
+        record_product_change(db, product)
 
-    # Remover item do pedido
-    db.delete(order_item)
+    # Remover item do pedido (delete-orphan remove a linha no flush)
+    order.items.remove(order_item)
+    order.recalculate_totals()
 
 
 def get_order_by_id(db: Session, order_id: int) -> Order | None:
     """Busca um pedido por ID."""
-    return db.query(Order).filter(Order.id == order_id).first()
+    return db.get(Order, order_id)
 
 
 # Alias para manter compatibilidade com código existente
@@ -300,10 +306,86 @@ def get_orders_by_table(db: Session, table_id: int) -> list[Order]:
 
 
 def delete_orders_by_table(db: Session, table_id: int):
-    db.query(Order).filter(Order.table_id == table_id).delete(synchronize_session=False)
-    db.commit()
+    _delete_orders(db, Order.table_id == table_id)
 
 
 def delete_order(db: Session, order_id: int):
-    db.query(Order).filter(Order.id == order_id).delete(synchronize_session=False)
-    db.commit()
+    _delete_orders(db, Order.id == order_id)
+
+
+def _delete_orders(db: Session, criterion) -> None:
+    deleted = db.execute(
+        delete(Order)
+        .where(criterion)
+        .returning(Order.id, Order.table_id)
+        .execution_options(synchronize_session=False)
+    )
+    for order_id, table_id in deleted:
+        record_change(db, "order", order_id, "deleted", table_id=table_id)
+    db.flush()
+
+
+def _item_totals(order_id_column):
+    """Soma dos itens de cada pedido (subconsultas correlacionadas)."""
+    amount = (
+        select(money_sum(OrderItem.unit_price * OrderItem.quantity))
+        .where(OrderItem.order_id == order_id_column)
+        .scalar_subquery()
+    )
+    quantity = (
+        select(func.coalesce(func.sum(OrderItem.quantity), 0))
+        .where(OrderItem.order_id == order_id_column)
+        .scalar_subquery()
+    )
+    return amount, quantity
+
+
+def find_order_total_mismatches(db: Session, limit: int | None = 100) -> list[dict]:
+    """Pedidos cujos totais persistidos divergem da soma dos itens."""
+    amount, quantity = _item_totals(Order.id)
+    query = (
+        select(
+            Order.id,
+            Order.total_amount,
+            Order.total_items,
+            amount.label("items_amount"),
+            quantity.label("items_quantity"),
+        )
+        .where(or_(Order.total_amount != amount, Order.total_items != quantity))
+        .order_by(Order.id)
+        .limit(limit)
+    )
+    return [
+        {
+            "order_id": row.id,
+            "total_amount": row.total_amount,
+            "total_items": row.total_items,
+            "expected_total_amount": row.items_amount,
+            "expected_total_items": row.items_quantity,
+        }
+        for row in db.execute(query)
+    ]
+
+
+def repair_order_totals(db: Session, order_ids: list[int]) -> int:
+    """Regrava os totais dos pedidos informados a partir dos itens."""
+    if not order_ids:
+        return 0
+    amount, quantity = _item_totals(Order.id)
+    repaired = db.execute(
+        update(Order)
+        .where(Order.id.in_(order_ids))
+        .values(
+            total_amount=amount,
+            total_items=quantity,
+            version_id=Order.version_id + 1,
+        )
+        .returning(Order.id, Order.table_id, Order.status)
+        .execution_options(synchronize_session="fetch")
+    ).all()
+    for order_id, table_id, status in repaired:
+        record_change(
+            db, "order", order_id, "updated", table_id=table_id, status=status
+        )
+    db.flush()
+    return len(repaired)
@@ -8,6 +8,8 @@ from datetime import datetime
 
 from sqlalchemy.orm import Session
 
+from app.core.money import ZERO, calculate_service_tax, to_money
+from app.crud.change_event import record_change
 from app.models.order import Order
 from app.models.payment import Payment, PaymentStatus
 from app.schemas.payment import PaymentCreate, PaymentUpdate
@@ -17,18 +19,18 @@ def create_payment(db: Session, payment_data: PaymentCreate, order_id: int) -> P
     """Cria um novo pagamento para um pedido."""
 
     # Buscar o pedido para obter o valor total
-    order = db.query(Order).filter(Order.id == order_id).first()
+    order = db.get(Order, order_id)
     if not order:
         raise ValueError("Order not found")
 
     # Calcular taxa de serviço (10%)
-    service_tax = 0.0
+    service_tax = ZERO
     if payment_data.service_tax_included == "yes":
-        service_tax = order.total_amount * 0.10
+        service_tax = calculate_service_tax(order.total_amount)
 
     # Calcular troco
     total_with_tax = order.total_amount + service_tax
-    change = payment_data.amount_paid - total_with_tax
+    change = to_money(payment_data.amount_paid) - total_with_tax
 
     # Validar se o valor pago é suficiente
     if change < 0:
@@ -47,11 +49,22 @@ def create_payment(db: Session, payment_data: PaymentCreate, order_id: int) -> P
     )
 
     db.add(payment)
-    db.commit()
-    db.refresh(payment)
+    db.flush()
+    _record_payment_change(db, payment, "created")
     return payment
 
 
+def _record_payment_change(db: Session, payment: Payment, action: str) -> None:
+    record_change(
+        db,
+        "payment",
+        payment.id,
+        action,
+        order_id=payment.order_id,
+        status=payment.status,
+    )
+
+
 def get_payment_by_order(db: Session, order_id: int) -> Payment | None:
     """Busca pagamento por ID do pedido."""
     return db.query(Payment).filter(Payment.order_id == order_id).first()
@@ -81,8 +94,8 @@ def update_payment(
             total_with_tax += payment.service_tax
         payment.change = payment.amount_paid - total_with_tax
 
-    db.commit()
-    db.refresh(payment)
+    db.flush()
+    _record_payment_change(db, payment, "updated")
     return payment
 
 
@@ -95,8 +108,8 @@ def process_payment(db: Session, payment_id: int) -> Payment | None:
     payment.status = PaymentStatus.PAID
     payment.paid_at = datetime.utcnow()
 
-    db.commit()
-    db.refresh(payment)
+    db.flush()
+    _record_payment_change(db, payment, "paid")
     return payment
 
 
@@ -108,8 +121,8 @@ def cancel_payment(db: Session, payment_id: int) -> Payment | None:
 
     payment.status = PaymentStatus.CANCELLED
 
-    db.commit()
-    db.refresh(payment)
+    db.flush()
+    _record_payment_change(db, payment, "cancelled")
     return payment
 
 
@@ -141,6 +154,7 @@ def delete_payment(db: Session, payment_id: int):
     payment = db.query(Payment).filter(Payment.id == payment_id).first()
     if payment:
         db.delete(payment)
-        db.commit()
+        db.flush()
+        record_change(db, "payment", payment_id, "deleted", order_id=payment.order_id)
         return True
     return False
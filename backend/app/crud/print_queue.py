@@ -5,10 +5,12 @@ Este módulo contém as operações CRUD para a fila de impressão.
 """
 
 from datetime import datetime
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
+from sqlalchemy import func, select, update
 from sqlalchemy.orm import Session
 
+from app.crud.change_event import record_change
 from app.models.print_queue import PrintQueue, PrintQueueStatus
 from app.schemas.print_queue import PrintQueueCreate, PrintQueueUpdate
 
@@ -27,8 +29,8 @@ def create_print_queue_item(
         status=PrintQueueStatus.PENDING,
     )
     db.add(db_print_queue)
-    db.commit()
-    db.refresh(db_print_queue)
+    db.flush()
+    _record_print_queue_change(db, db_print_queue, "created")
     return db_print_queue
 
 
@@ -44,16 +46,14 @@ def get_next_print_queue_item(db: Session) -> Optional[PrintQueue]:
 
 def get_print_queue_item(db: Session, print_queue_id: int) -> Optional[PrintQueue]:
     """Busca um item específico na fila de impressão."""
-    return db.query(PrintQueue).filter(PrintQueue.id == print_queue_id).first()
+    return db.get(PrintQueue, print_queue_id)
 
 
 def update_print_queue_item(
     db: Session, print_queue_id: int, print_queue_update: PrintQueueUpdate
 ) -> Optional[PrintQueue]:
     """Atualiza um item na fila de impressão."""
-    db_print_queue = (
-        db.query(PrintQueue).filter(PrintQueue.id == print_queue_id).first()
-    )
+    db_print_queue = db.get(PrintQueue, print_queue_id)
     if not db_print_queue:
         return None
 
@@ -61,60 +61,74 @@ def update_print_queue_item(
     for key, value in update_data.items():
         setattr(db_print_queue, key, value)
 
-    db.commit()
-    db.refresh(db_print_queue)
+    db.flush()
+    _record_print_queue_change(db, db_print_queue, "updated")
     return db_print_queue
 
 
 def mark_as_printed(
     db: Session, print_queue_id: int, printer: str = None
 ) -> Optional[PrintQueue]:
-    """Marca um item como impresso."""
-    db_print_queue = (
-        db.query(PrintQueue).filter(PrintQueue.id == print_queue_id).first()
-    )
-    if not db_print_queue:
-        return None
+    """Marca um item como impresso.
 
-    db_print_queue.status = PrintQueueStatus.PRINTED
-    db_print_queue.printed_at = datetime.utcnow()
+    Um único ``UPDATE ... RETURNING``: sem SELECT antes nem refresh depois.
+    """
+    values = {"status": PrintQueueStatus.PRINTED, "printed_at": datetime.utcnow()}
     if printer:
-        db_print_queue.printer = printer
-
-    db.commit()
-    db.refresh(db_print_queue)
-    return db_print_queue
+        values["printer"] = printer
+    return _update_returning(db, print_queue_id, values, "printed")
 
 
 def mark_as_error(
     db: Session, print_queue_id: int, error_message: str
 ) -> Optional[PrintQueue]:
-    """Marca um item como erro na impressão."""
-    db_print_queue = (
-        db.query(PrintQueue).filter(PrintQueue.id == print_queue_id).first()
-    )
-    if not db_print_queue:
-        return None
+    """Marca um item como erro na impressão (também via ``UPDATE ... RETURNING``)."""
+    values = {
+        "status": PrintQueueStatus.ERROR,
+        "error_message": error_message,
+        "retry_count": PrintQueue.retry_count + 1,
+    }
+    return _update_returning(db, print_queue_id, values, "error")
 
-    db_print_queue.status = PrintQueueStatus.ERROR
-    db_print_queue.error_message = error_message
-    db_print_queue.retry_count += 1
 
-    db.commit()
-    db.refresh(db_print_queue)
+def _update_returning(
+    db: Session, print_queue_id: int, values: dict, action: str
+) -> Optional[PrintQueue]:
+    stmt = (
+        update(PrintQueue)
+        .where(PrintQueue.id == print_queue_id)
+        .values(**values)
+        .returning(PrintQueue)
+    )
+    db_print_queue = db.scalars(stmt).first()
+    if db_print_queue:
+        _record_print_queue_change(db, db_print_queue, action)
     return db_print_queue
 
 
+def _record_print_queue_change(
+    db: Session, db_print_queue: PrintQueue, action: str
+) -> None:
+    record_change(
+        db,
+        "print_queue",
+        db_print_queue.id,
+        action,
+        status=db_print_queue.status,
+        order_id=db_print_queue.order_id,
+        table_id=db_print_queue.table_id,
+    )
+
+
 def delete_print_queue_item(db: Session, print_queue_id: int) -> bool:
     """Remove um item da fila de impressão."""
-    db_print_queue = (
-        db.query(PrintQueue).filter(PrintQueue.id == print_queue_id).first()
-    )
+    db_print_queue = db.get(PrintQueue, print_queue_id)
     if not db_print_queue:
         return False
 
     db.delete(db_print_queue)
-    db.commit()
+    db.flush()
+    record_change(db, "print_queue", print_queue_id, "deleted")
     return True
 
 
@@ -127,6 +141,15 @@ def get_pending_print_queue_count(db: Session) -> int:
     )
 
 
+def get_pending_print_queue_summary(db: Session) -> Tuple[int, Optional[datetime]]:
+    """Número de itens pendentes e o ``created_at`` do mais antigo."""
+    return db.execute(
+        select(func.count(), func.min(PrintQueue.created_at)).where(
+            PrintQueue.status == PrintQueueStatus.PENDING
+        )
+    ).one()
+
+
 def get_all_print_queue_items(
     db: Session, status: str = None, print_type: str = None, limit: int = 100
 ) -> List[PrintQueue]:
@@ -169,8 +192,8 @@ def create_room_consumption_report_print_item(
     )
     
     db.add(db_print_queue)
-    db.commit()
-    db.refresh(db_print_queue)
+    db.flush()
+    _record_print_queue_change(db, db_print_queue, "created")
     return db_print_queue
 
 
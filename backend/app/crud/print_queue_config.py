@@ -19,8 +19,7 @@ def create_print_queue_config(db: Session, print_queue_data: PrintQueueConfigCre
     
     db_print_queue = PrintQueueConfig(**print_queue_data.model_dump())
     db.add(db_print_queue)
-    db.commit()
-    db.refresh(db_print_queue)
+    db.flush()
     return db_print_queue
 
 
@@ -61,8 +60,7 @@ def update_print_queue_config(
     for key, value in update_data.items():
         setattr(db_print_queue, key, value)
 
-    db.commit()
-    db.refresh(db_print_queue)
+    db.flush()
     return db_print_queue
 
 
@@ -85,10 +83,10 @@ def delete_print_queue_config(db: Session, print_queue_id: int) -> bool:
         ).first()
         if other_queue:
             other_queue.is_default = True
-            db.commit()
+            db.flush()
 
     db.delete(db_print_queue)
-    db.commit()
+    db.flush()
     return True
 
 
@@ -100,7 +98,7 @@ def ensure_default_queue_exists(db: Session) -> PrintQueueConfig:
         first_queue = db.query(PrintQueueConfig).first()
         if first_queue:
             first_queue.is_default = True
-            db.commit()
+            db.flush()
             return first_queue
         else:
             # Criar uma fila padrão se não existir nenhuma
@@ -110,7 +108,6 @@ def ensure_default_queue_exists(db: Session) -> PrintQueueConfig:
                 is_default=True
             )
             db.add(default_queue)
-            db.commit()
-            db.refresh(default_queue)
+            db.flush()
             return default_queue
     return default_queue 
\ No newline at end of file
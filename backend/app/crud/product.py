@@ -1,9 +1,57 @@
 # app/crud/product.py
+from sqlalchemy import case, func, update
 from sqlalchemy.orm import Session, joinedload
+from sqlalchemy.orm.attributes import set_committed_value
 
 from app.models.product import Product
 from app.schemas.product import ProductCreate, ProductUpdate
 from app.crud.category import get_category
+from app.crud.change_event import record_change
+
+
+def record_product_change(db: Session, product: Product, action: str = "updated"):
+    """Registra a alteração do produto no feed (estoque e disponibilidade)."""
+    record_change(
+        db,
+        "product",
+        product.id,
+        action,
+        stock_quantity=product.stock_quantity,
+        is_active=product.is_active,
+    )
+
+
+def adjust_stock(db: Session, product: Product, delta: int) -> bool:
+    """Soma ``delta`` ao estoque num único ``UPDATE`` atômico.
+
+    Baixas (``delta`` negativo) só acontecem se ainda houver estoque: dois
+    garçons pedindo o mesmo produto ao mesmo tempo não disputam a versão da
+    linha (o ``UPDATE`` não confere ``version_id``, só o incrementa) e o
+    segundo recebe False se o primeiro levou as últimas unidades.
+    """
+    stock = func.coalesce(Product.stock_quantity, 0)
+    stmt = update(Product).where(Product.id == product.id)
+    if delta < 0:
+        stmt = stmt.where(stock >= -delta)
+        # Zerou: sai do cardápio
+        is_active = case((stock + delta == 0, False), else_=Product.is_active)
+    else:
+        is_active = case((stock + delta > 0, True), else_=Product.is_active)
+    row = db.execute(
+        stmt.values(
+            stock_quantity=stock + delta,
+            is_active=is_active,
+            version_id=Product.version_id + 1,
+        )
+        .returning(Product.stock_quantity, Product.is_active, Product.version_id)
+        .execution_options(synchronize_session=False)
+    ).first()
+    if row is None:
+        return False
+    # Objeto da sessão com os valores gravados, sem marcá-lo como alterado
+    for key, value in row._mapping.items():
+        set_committed_value(product, key, value)
+    return True
 
 
 def create_product(db: Session, product_data: ProductCreate) -> Product:
@@ -22,13 +70,22 @@ def create_product(db: Session, product_data: ProductCreate) -> Product:
 
     product = Product(**product_dict)
     db.add(product)
-    db.commit()
-    db.refresh(product)
+    db.flush()
+    record_product_change(db, product, "created")
     return product
 
 
 def get_product(db: Session, product_id: int) -> Product | None:
-    return db.query(Product).filter(Product.id == product_id).first()
+    return db.get(Product, product_id)
+
+
+def get_products_by_ids(db: Session, product_ids) -> dict[int, Product]:
+    """Busca vários produtos em um único SELECT, indexados pelo ID."""
+    ids = set(product_ids)
+    if not ids:
+        return {}
+    products = db.query(Product).filter(Product.id.in_(ids)).all()
+    return {product.id: product for product in products}
 
 
 def get_all_products(db: Session, is_active: bool | None = None, category_id: int | None = None) -> list[Product]:
@@ -65,14 +122,15 @@ def update_product(db: Session, product: Product, updates: ProductUpdate) -> Pro
         and product.stock_quantity > 0
     ):
         product.is_active = True
-    db.commit()
-    db.refresh(product)
+    db.flush()
+    record_product_change(db, product)
     return product
 
 
 def delete_product(db: Session, product: Product) -> None:
     db.delete(product)
-    db.commit()
+    db.flush()
+    record_change(db, "product", product.id, "deleted")
 
 
 def get_product_with_category(db: Session, product_id: int) -> Product | None:
@@ -80,25 +138,34 @@ def get_product_with_category(db: Session, product_id: int) -> Product | None:
     return db.query(Product).options(joinedload(Product.category_rel)).filter(Product.id == product_id).first()
 
 
+def set_product_image(
+    db: Session,
+    product: Product,
+    image_data: bytes | None,
+    filename: str | None,
+    content_type: str | None,
+) -> Product:
+    """Grava (ou remove, com None) a imagem do produto."""
+    product.image_data = image_data
+    product.image_filename = filename
+    product.image_content_type = content_type
+    db.flush()
+    record_product_change(db, product)
+    return product
+
+
 def increase_stock(db: Session, product: Product, quantity: int) -> Product:
     if quantity < 0:
         raise ValueError("Quantidade deve ser positiva para aumentar o estoque.")
-    product.stock_quantity = (product.stock_quantity or 0) + quantity
-    if product.stock_quantity > 0:
-        product.is_active = True
-    db.commit()
-    db.refresh(product)
+    adjust_stock(db, product, quantity)
+    record_product_change(db, product)
     return product
 
 
 def decrease_stock(db: Session, product: Product, quantity: int) -> Product:
     if quantity < 0:
         raise ValueError("Quantidade deve ser positiva para diminuir o estoque.")
-    if (product.stock_quantity or 0) < quantity:
+    if not adjust_stock(db, product, -quantity):
         raise ValueError("Estoque insuficiente para a operação.")
-    product.stock_quantity -= quantity
-    if product.stock_quantity == 0:
-        product.is_active = False
-    db.commit()
-    db.refresh(product)
+    record_product_change(db, product)
     return product
@@ -0,0 +1,114 @@
+"""
+CRUD de refresh tokens.
+
+O token entregue ao cliente é aleatório (256 bits); no banco fica só o
+SHA-256 dele, suficiente para um segredo dessa entropia e barato de
+conferir (sem bcrypt). Cada renovação gasta o token usado e emite outro
+da mesma família.
+"""
+
+import hashlib
+import secrets
+import uuid
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import Settings
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+
+settings = Settings()
+
+
+def _hash_token(token: str) -> str:
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+def issue_refresh_token(
+    db: Session, username: str, family_id: Optional[str] = None
+) -> str:
+    """Cria um refresh token para ``username`` e devolve o valor em claro."""
+    now = datetime.utcnow()
+    # Limpeza oportunista dos tokens vencidos do usuário
+    db.execute(
+        delete(RefreshToken).where(
+            RefreshToken.username == username, RefreshToken.expires_at < now
+        )
+    )
+    token = secrets.token_urlsafe(32)
+    db.add(
+        RefreshToken(
+            token_hash=_hash_token(token),
+            family_id=family_id or uuid.uuid4().hex,
+            username=username,
+            created_at=now,
+            expires_at=now + settings.refresh_token_expiration,
+        )
+    )
+    db.flush()
+    return token
+
+
+def rotate_refresh_token(db: Session, token: str) -> Optional[tuple[User, str]]:
+    """Gasta ``token`` e devolve o usuário e o próximo refresh token.
+
+    Devolve ``None`` se o token não existe, venceu, já foi usado (nesse
+    caso a família inteira é revogada) ou o usuário não está mais ativo.
+    """
+    now = datetime.utcnow()
+    stored = db.scalar(
+        select(RefreshToken).where(RefreshToken.token_hash == _hash_token(token))
+    )
+    if stored is None or stored.expires_at <= now:
+        return None
+    # UPDATE condicional: de duas renovações simultâneas só uma gasta o token
+    spent = db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.id == stored.id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not spent:
+        revoke_refresh_token_family(db, stored.family_id)
+        return None
+
+    user = db.scalar(select(User).where(User.username == stored.username))
+    if user is None or user.is_active is False:
+        return None
+    return user, issue_refresh_token(db, user.username, stored.family_id)
+
+
+def revoke_refresh_token_family(db: Session, family_id: str) -> int:
+    """Revoga todos os tokens ainda válidos da família."""
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.family_id == family_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
+
+
+def revoke_refresh_token(db: Session, token: str) -> bool:
+    """Logout: revoga a família do token informado."""
+    family_id = db.scalar(
+        select(RefreshToken.family_id).where(
+            RefreshToken.token_hash == _hash_token(token)
+        )
+    )
+    if family_id is None:
+        return False
+    revoke_refresh_token_family(db, family_id)
+    return True
+
+
+def revoke_user_refresh_tokens(db: Session, username: str) -> int:
+    """Revoga todas as sessões do usuário (exclusão, troca de senha)."""
+    return db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.username == username, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.utcnow())
+        .execution_options(synchronize_session=False)
+    ).rowcount
@@ -5,77 +5,140 @@ Este módulo contém as operações de banco de dados para relatórios.
 """
 
 import json
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
-
-from sqlalchemy import and_, extract, func
-from sqlalchemy.orm import Session
-
-from app.models.order import Order
-from app.models.order_item import OrderItem
-from app.models.payment import Payment, PaymentStatus
+from decimal import Decimal
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import and_, case, func, select, union_all
+from sqlalchemy.orm import Session, joinedload, lazyload
+
+from app.core.business_day import business_date, parse_business_date
+from app.core.money import SERVICE_TAX_RATE, ZERO, calculate_service_tax, money_sum
+from app.crud.user import get_user_by_username
+
+# Relatórios leem dados quentes + arquivados: os aliases *History se usam
+# como os próprios modelos (app.models.archive)
+from app.models.archive import ORDER_TIERS
+from app.models.archive import OrderHistory as Order
+from app.models.archive import OrderItemHistory as OrderItem
+from app.models.archive import PaymentHistory as Payment
+from app.models.archive import TableHistory as Table
+from app.models.payment import PaymentStatus
 from app.models.product import Product
 from app.models.report import Report, ReportType
-from app.models.table import Table
 from app.models.user import User
 
 
-def get_daily_sales_report(db: Session, date: str) -> Dict:
-    """Gera relatório de vendas diárias."""
+def _orders_query(db: Session):
+    """Pedidos sem os itens: os relatórios usam só os totais persistidos."""
+    return db.query(Order).options(lazyload(Order.items))
 
-    # Converter string para datetime
-    report_date = datetime.strptime(date, "%Y-%m-%d")
-    next_date = report_date + timedelta(days=1)
 
-    # Buscar pedidos do dia
-    orders = (
-        db.query(Order)
-        .filter(and_(Order.created_at >= report_date, Order.created_at < next_date))
-        .all()
-    )
+def _orders_summary(db: Session, *criteria) -> Dict:
+    """Contagem por status e receita (sem cancelados) dos pedidos filtrados."""
+    rows = db.execute(
+        select(Order.status, func.count(Order.id), money_sum(Order.total_amount))
+        .where(*criteria)
+        .group_by(Order.status)
+    ).all()
+    return {
+        "total_orders": sum(count for _, count, _ in rows),
+        "total_revenue": sum(
+            (amount for status, _, amount in rows if status != "cancelled"), ZERO
+        ),
+        "orders_by_status": {status: count for status, count, _ in rows},
+    }
 
-    # Buscar pagamentos do dia
-    payments = (
-        db.query(Payment)
-        .filter(and_(Payment.created_at >= report_date, Payment.created_at < next_date))
-        .all()
-    )
 
-    # Calcular totais (excluindo pedidos cancelados)
-    total_orders = len(orders)
-    total_revenue = sum(order.total_amount for order in orders if order.status != "cancelled")
-    total_revenue_with_tax = sum(
-        payment.amount + payment.service_tax for payment in payments
-    )
-    total_service_tax = sum(payment.service_tax for payment in payments)
-    average_order_value = total_revenue / total_orders if total_orders > 0 else 0
-
-    # Contar por status
-    orders_by_status = {}
-    for order in orders:
-        status = order.status
-        orders_by_status[status] = orders_by_status.get(status, 0) + 1
+def _payments_by_method(db: Session, *criteria) -> list:
+    """Quantidade, total com taxa e taxa de serviço dos pagamentos, por método."""
+    return db.execute(
+        select(
+            Payment.method,
+            func.count(Payment.id).label("count"),
+            money_sum(Payment.amount + Payment.service_tax).label("total"),
+            money_sum(Payment.service_tax).label("service_tax"),
+        )
+        .where(*criteria)
+        .group_by(Payment.method)
+    ).all()
 
-    # Resumo de métodos de pagamento
-    payment_methods_summary = {}
-    for payment in payments:
-        method = payment.method
-        payment_methods_summary[method] = payment_methods_summary.get(method, 0) + 1
 
-    # Top produtos do dia
-    top_products = (
-        db.query(
+def _order_totals_by_table(db: Session, table_ids: List[int], *criteria) -> Dict:
+    """Pedidos, valor total e receita (sem cancelados) de cada mesa."""
+    totals = defaultdict(lambda: {"orders": 0, "amount": ZERO, "revenue": ZERO})
+    if table_ids:
+        rows = db.execute(
+            select(
+                Order.table_id,
+                func.count(Order.id),
+                money_sum(Order.total_amount),
+                money_sum(
+                    case((Order.status != "cancelled", Order.total_amount), else_=0)
+                ),
+            )
+            .where(Order.table_id.in_(table_ids), *criteria)
+            .group_by(Order.table_id)
+        )
+        for table_id, orders, amount, revenue in rows:
+            totals[table_id] = {"orders": orders, "amount": amount, "revenue": revenue}
+    return totals
+
+
+def _top_products(db: Session, orders_where: Callable, limit: int = 10) -> list:
+    """Produtos mais vendidos nos pedidos filtrados por ``orders_where``.
+
+    ``orders_where(order)`` devolve os filtros para a entidade de pedido de
+    cada nível (quente e arquivo); a soma por produto é feita sobre a
+    união dos dois níveis.
+    """
+    items = union_all(
+        *(
+            select(
+                item.product_id,
+                item.quantity,
+                (item.quantity * item.unit_price).label("amount"),
+            )
+            .join(order, order.id == item.order_id)
+            .where(*orders_where(order))
+            for order, item in ORDER_TIERS
+        )
+    ).subquery()
+    return db.execute(
+        select(
             Product.name,
-            func.sum(OrderItem.quantity).label("total_quantity"),
-            func.sum(OrderItem.quantity * OrderItem.unit_price).label("total_revenue"),
+            func.sum(items.c.quantity).label("total_quantity"),
+            money_sum(items.c.amount).label("total_revenue"),
         )
-        .join(OrderItem, Product.id == OrderItem.product_id)
-        .join(Order, OrderItem.order_id == Order.id)
-        .filter(and_(Order.created_at >= report_date, Order.created_at < next_date))
+        .join(items, items.c.product_id == Product.id)
         .group_by(Product.name)
-        .order_by(func.sum(OrderItem.quantity).desc())
-        .limit(10)
-        .all()
+        .order_by(func.sum(items.c.quantity).desc())
+        .limit(limit)
+    ).all()
+
+
+def get_daily_sales_report(db: Session, date: str) -> Dict:
+    """Gera relatório de vendas diárias."""
+
+    report_date = parse_business_date(date)
+
+    # Pedidos e pagamentos do dia comercial, agregados no banco
+    orders = _orders_summary(db, Order.business_date == report_date)
+    payments = _payments_by_method(db, Payment.business_date == report_date)
+
+    # Totais (receita sem pedidos cancelados)
+    total_orders = orders["total_orders"]
+    total_revenue = orders["total_revenue"]
+    total_revenue_with_tax = sum((row.total for row in payments), ZERO)
+    total_service_tax = sum((row.service_tax for row in payments), ZERO)
+    average_order_value = total_revenue / total_orders if total_orders > 0 else 0
+    orders_by_status = orders["orders_by_status"]
+    payment_methods_summary = {row.method: row.count for row in payments}
+
+    # Top produtos do dia
+    top_products = _top_products(
+        db, lambda order: (order.business_date == report_date,)
     )
 
     top_products_list = [
@@ -113,7 +176,9 @@ def get_top_products_report(db: Session, limit: int = 10, days: int = 30) -> Dic
             Product.name,
             Product.category,
             func.sum(OrderItem.quantity).label("total_quantity"),
-            func.sum(OrderItem.quantity * OrderItem.unit_price).label("total_revenue"),
+            money_sum(OrderItem.quantity * OrderItem.unit_price).label(
+                "total_revenue"
+            ),
         )
         .join(OrderItem, Product.id == OrderItem.product_id)
         .join(Order, OrderItem.order_id == Order.id)
@@ -172,57 +237,53 @@ def get_waiter_commission_report(
     # Buscar garçons
     waiters = db.query(User).filter(User.role == "waiter").all()
 
-    commission_rate = 0.10  # 10%
-    total_commission = 0
-    total_orders = 0
-    total_revenue = 0
-    waiters_data = []
-
-    for waiter in waiters:
-        # Buscar mesas criadas pelo garçom
+    # Mesas de todos os garçons e seus pedidos em duas consultas
+    tables_by_waiter = defaultdict(list)
+    if waiters:
         tables = (
             db.query(Table)
             .filter(
                 and_(
-                    Table.created_by == waiter.username,
+                    Table.created_by.in_([waiter.username for waiter in waiters]),
                     Table.created_at >= start,
                     Table.created_at <= end,
                 )
             )
             .all()
         )
-
-        waiter_orders = []
-        waiter_revenue = 0
-
         for table in tables:
-            orders = (
-                db.query(Order)
-                .filter(
-                    and_(
-                        Order.table_id == table.id,
-                        Order.created_at >= start,
-                        Order.created_at <= end,
-                    )
-                )
-                .all()
-            )
+            tables_by_waiter[table.created_by].append(table)
+    totals_by_table = _order_totals_by_table(
+        db,
+        [table.id for tables in tables_by_waiter.values() for table in tables],
+        Order.created_at >= start,
+        Order.created_at <= end,
+    )
 
-            for order in orders:
-                waiter_orders.append(order)
-                waiter_revenue += order.total_amount
+    commission_rate = SERVICE_TAX_RATE  # 10%
+    total_commission = ZERO
+    total_orders = 0
+    total_revenue = ZERO
+    waiters_data = []
+
+    for waiter in waiters:
+        tables = tables_by_waiter[waiter.username]
+        waiter_orders = sum(totals_by_table[table.id]["orders"] for table in tables)
+        waiter_revenue = sum(
+            (totals_by_table[table.id]["amount"] for table in tables), ZERO
+        )
 
-        waiter_commission = waiter_revenue * commission_rate
+        waiter_commission = calculate_service_tax(waiter_revenue)
         total_commission += waiter_commission
-        total_orders += len(waiter_orders)
+        total_orders += waiter_orders
         total_revenue += waiter_revenue
 
         waiters_data.append(
             {
                 "username": waiter.username,
-                "orders_count": len(waiter_orders),
-                "revenue": waiter_revenue,
-                "commission": waiter_commission,
+                "orders_count": waiter_orders,
+                "revenue": float(waiter_revenue),
+                "commission": float(waiter_commission),
                 "tables_created": len(tables),
             }
         )
@@ -243,45 +304,27 @@ def get_payment_methods_report(db: Session, days: int = 30) -> Dict:
     end_date = datetime.now()
     start_date = end_date - timedelta(days=days)
 
-    # Buscar pagamentos do período
-    payments = (
-        db.query(Payment)
-        .filter(and_(Payment.created_at >= start_date, Payment.created_at <= end_date))
-        .all()
+    # Pagamentos do período agrupados por método no banco
+    payments = _payments_by_method(
+        db, Payment.created_at >= start_date, Payment.created_at <= end_date
     )
 
-    total_transactions = len(payments)
-    total_revenue = sum(payment.amount + payment.service_tax for payment in payments)
-
-    # Agrupar por método
-    methods_data = {}
-    for payment in payments:
-        method = payment.method
-        if method not in methods_data:
-            methods_data[method] = {"count": 0, "total_amount": 0, "average_amount": 0}
-
-        methods_data[method]["count"] += 1
-        methods_data[method]["total_amount"] += payment.amount + payment.service_tax
-
-    # Calcular médias
-    for method in methods_data:
-        count = methods_data[method]["count"]
-        total = methods_data[method]["total_amount"]
-        methods_data[method]["average_amount"] = total / count if count > 0 else 0
+    total_transactions = sum(row.count for row in payments)
+    total_revenue = sum((row.total for row in payments), ZERO)
 
     methods_list = [
         {
-            "method": method,
-            "count": data["count"],
-            "total_amount": data["total_amount"],
-            "average_amount": data["average_amount"],
+            "method": row.method,
+            "count": row.count,
+            "total_amount": float(row.total),
+            "average_amount": float(row.total / row.count),
             "percentage": (
-                (data["count"] / total_transactions * 100)
+                (row.count / total_transactions * 100)
                 if total_transactions > 0
                 else 0
             ),
         }
-        for method, data in methods_data.items()
+        for row in payments
     ]
 
     return {
@@ -311,18 +354,19 @@ def get_table_performance_report(db: Session, days: int = 30) -> Dict:
 
     tables_data = []
     total_orders = 0
-    total_revenue = 0
+    total_revenue = ZERO
 
+    totals_by_table = _order_totals_by_table(db, [table.id for table in tables])
     for table in tables:
-        orders = db.query(Order).filter(Order.table_id == table.id).all()
-        table_revenue = sum(order.total_amount for order in orders if order.status != "cancelled")
+        totals = totals_by_table[table.id]
+        table_revenue = totals["revenue"]
 
         tables_data.append(
             {
                 "name": table.name,
                 "is_closed": table.is_closed,
-                "orders_count": len(orders),
-                "revenue": table_revenue,
+                "orders_count": totals["orders"],
+                "revenue": float(table_revenue),
                 "created_at": (
                     table.created_at.isoformat() if table.created_at else None
                 ),
@@ -330,7 +374,7 @@ def get_table_performance_report(db: Session, days: int = 30) -> Dict:
             }
         )
 
-        total_orders += len(orders)
+        total_orders += totals["orders"]
         total_revenue += table_revenue
 
     average_orders_per_table = total_orders / total_tables if total_tables > 0 else 0
@@ -350,26 +394,24 @@ def get_table_performance_report(db: Session, days: int = 30) -> Dict:
 def get_hourly_sales_report(db: Session, date: str) -> Dict:
     """Gera relatório de vendas por hora."""
 
-    report_date = datetime.strptime(date, "%Y-%m-%d")
-    next_date = report_date + timedelta(days=1)
+    report_date = parse_business_date(date)
 
-    # Buscar pedidos do dia
-    orders = (
-        db.query(Order)
-        .filter(and_(Order.created_at >= report_date, Order.created_at < next_date))
-        .all()
-    )
+    # Pedidos do dia comercial (sem cancelados) agrupados pela hora local
+    rows = db.execute(
+        select(
+            Order.business_hour, func.count(Order.id), money_sum(Order.total_amount)
+        )
+        .where(Order.business_date == report_date, Order.status != "cancelled")
+        .group_by(Order.business_hour)
+    ).all()
 
-    # Agrupar por hora
     hourly_data = {}
     for hour in range(24):
         hourly_data[hour] = {"orders_count": 0, "revenue": 0, "hour": f"{hour:02d}:00"}
 
-    for order in orders:
-        if order.status != "cancelled":
-            hour = order.created_at.hour
-            hourly_data[hour]["orders_count"] += 1
-            hourly_data[hour]["revenue"] += order.total_amount
+    for hour, orders_count, revenue in rows:
+        hourly_data[int(hour)]["orders_count"] = orders_count
+        hourly_data[int(hour)]["revenue"] = revenue
 
     # Converter para lista e encontrar picos
     hourly_list = list(hourly_data.values())
@@ -380,8 +422,10 @@ def get_hourly_sales_report(db: Session, date: str) -> Dict:
         if data["revenue"] == max_revenue and max_revenue > 0:
             peak_hours.append(data["hour"])
 
-    total_revenue = sum(data["revenue"] for data in hourly_list)
+    total_revenue = sum((data["revenue"] for data in hourly_list), ZERO)
     total_orders = sum(data["orders_count"] for data in hourly_list)
+    for data in hourly_list:
+        data["revenue"] = float(data["revenue"])
 
     return {
         "date": date,
@@ -412,7 +456,7 @@ def get_user_sales_report(
         period = f"Hoje ({start.strftime('%Y-%m-%d')})"
 
     # Buscar usuário
-    user = db.query(User).filter(User.username == username).first()
+    user = get_user_by_username(db, username)
     if not user:
         raise ValueError(f"Usuário '{username}' não encontrado")
 
@@ -433,84 +477,40 @@ def get_user_sales_report(
     active_tables = len([t for t in tables if not t.is_closed])
     closed_tables = len([t for t in tables if t.is_closed])
 
-    # Buscar pedidos das mesas criadas pelo usuário
+    # Pedidos das mesas criadas pelo usuário e seus pagamentos, agregados no banco
     table_ids = [table.id for table in tables]
-    orders = []
-    if table_ids:
-        orders = (
-            db.query(Order)
-            .filter(
-                and_(
-                    Order.table_id.in_(table_ids),
-                    Order.created_at >= start,
-                    Order.created_at <= end,
-                )
-            )
-            .all()
+
+    def user_orders(order):
+        return (
+            order.table_id.in_(table_ids),
+            order.created_at >= start,
+            order.created_at <= end,
         )
 
-    # Buscar pagamentos dos pedidos
-    order_ids = [order.id for order in orders]
+    orders = {"total_orders": 0, "total_revenue": ZERO, "orders_by_status": {}}
     payments = []
-    if order_ids:
-        payments = (
-            db.query(Payment)
-            .filter(
-                and_(
-                    Payment.order_id.in_(order_ids),
-                    Payment.created_at >= start,
-                    Payment.created_at <= end,
-                )
-            )
-            .all()
+    if tables:
+        orders = _orders_summary(db, *user_orders(Order))
+        payments = _payments_by_method(
+            db,
+            Payment.order_id.in_(select(Order.id).where(*user_orders(Order))),
+            Payment.created_at >= start,
+            Payment.created_at <= end,
         )
 
-    # Calcular métricas (excluindo pedidos cancelados)
-    total_orders = len(orders)
-    total_revenue = sum(order.total_amount for order in orders if order.status != "cancelled")
-    total_revenue_with_tax = sum(
-        payment.amount + payment.service_tax for payment in payments
-    )
-    total_service_tax = sum(payment.service_tax for payment in payments)
+    # Métricas (receita sem pedidos cancelados)
+    total_orders = orders["total_orders"]
+    total_revenue = orders["total_revenue"]
+    total_revenue_with_tax = sum((row.total for row in payments), ZERO)
+    total_service_tax = sum((row.service_tax for row in payments), ZERO)
     average_order_value = total_revenue / total_orders if total_orders > 0 else 0
-
-    # Contar por status
-    orders_by_status = {}
-    for order in orders:
-        status = order.status
-        orders_by_status[status] = orders_by_status.get(status, 0) + 1
-
-    # Resumo de métodos de pagamento
-    payment_methods_summary = {}
-    for payment in payments:
-        method = payment.method
-        payment_methods_summary[method] = payment_methods_summary.get(method, 0) + 1
+    orders_by_status = orders["orders_by_status"]
+    payment_methods_summary = {row.method: row.count for row in payments}
 
     # Top produtos vendidos pelo usuário
     top_products = []
-    if orders:
-        top_products = (
-            db.query(
-                Product.name,
-                func.sum(OrderItem.quantity).label("total_quantity"),
-                func.sum(OrderItem.quantity * OrderItem.unit_price).label(
-                    "total_revenue"
-                ),
-            )
-            .join(OrderItem, Product.id == OrderItem.product_id)
-            .join(Order, OrderItem.order_id == Order.id)
-            .filter(
-                and_(
-                    Order.id.in_(order_ids),
-                    Order.created_at >= start,
-                    Order.created_at <= end,
-                )
-            )
-            .group_by(Product.name)
-            .order_by(func.sum(OrderItem.quantity).desc())
-            .limit(10)
-            .all()
-        )
+    if total_orders:
+        top_products = _top_products(db, user_orders)
 
     top_products_list = [
         {
@@ -539,6 +539,13 @@ def get_user_sales_report(
     }
 
 
+def _json_default(value):
+    # Valores monetários (Decimal) vão para o JSON como número
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
 def save_report(
     db: Session,
     report_type: str,
@@ -552,12 +559,11 @@ def save_report(
         report_type=report_type,
         generated_by=generated_by,
         parameters=parameters,
-        data=json.dumps(data, default=str),
+        data=json.dumps(data, default=_json_default),
     )
 
     db.add(report)
-    db.commit()
-    db.refresh(report)
+    db.flush()
     return report
 
 
@@ -567,7 +573,6 @@ def get_room_consumption_report(
     """Gera relatório de consumo de um quarto específico em uma data."""
     
     from app.models.room import Room
-    from datetime import datetime, timedelta
     
     # Verificar se o quarto existe
     room = db.query(Room).filter(Room.id == room_id).first()
@@ -576,22 +581,19 @@ def get_room_consumption_report(
     
     # Usar data atual se não fornecida
     if not date:
-        date = datetime.now().strftime("%Y-%m-%d")
+        date = business_date().isoformat()
     
-    # Converter string para datetime
-    report_date = datetime.strptime(date, "%Y-%m-%d")
-    next_date = report_date + timedelta(days=1)
+    report_date = parse_business_date(date)
     
-    # Buscar mesas associadas ao quarto que foram fechadas no dia específico
-    # Filtrar por data de fechamento (closed_at) em vez de data de criação
+    # Buscar mesas associadas ao quarto que foram fechadas no dia comercial
+    # Filtrar pelo dia do fechamento em vez do dia de criação
     tables = (
         db.query(Table)
         .filter(
             and_(
                 Table.room_id == room_id,
                 Table.is_closed == True,
-                Table.closed_at >= report_date,
-                Table.closed_at < next_date
+                Table.closed_business_date == report_date,
             )
         )
         .all()
@@ -602,12 +604,11 @@ def get_room_consumption_report(
     orders = []
     if table_ids:
         orders = (
-            db.query(Order)
+            _orders_query(db)
             .filter(
                 and_(
                     Order.table_id.in_(table_ids),
-                    Order.created_at >= report_date,
-                    Order.created_at < next_date
+                    Order.business_date == report_date,
                 )
             )
             .all()
@@ -622,8 +623,7 @@ def get_room_consumption_report(
             .filter(
                 and_(
                     Payment.order_id.in_(order_ids),
-                    Payment.created_at >= report_date,
-                    Payment.created_at < next_date
+                    Payment.business_date == report_date,
                 )
             )
             .all()
@@ -646,6 +646,7 @@ def get_room_consumption_report(
     if order_ids:
         order_items = (
             db.query(OrderItem)
+            .options(joinedload(OrderItem.product))
             .filter(OrderItem.order_id.in_(order_ids))
             .all()
         )
@@ -681,8 +682,8 @@ def get_room_consumption_report(
         {
             "name": name,
             "quantity": data["quantity"],
-            "total_amount": data["total_amount"],
-            "unit_price": data["unit_price"]
+            "total_amount": float(data["total_amount"]),
+            "unit_price": float(data["unit_price"])
         }
         for name, data in products_consumption.items()
     ]
@@ -707,7 +708,7 @@ def get_room_consumption_report(
                 "name": table.name,
                 "orders_count": len(table_orders),
                 "total_items": table_items,
-                "revenue": table_revenue,
+                "revenue": float(table_revenue),
                 "created_at": table.created_at.isoformat() if table.created_at else None,
                 "closed_at": table.closed_at.isoformat() if table.closed_at else None,
                 "created_by": table.created_by,
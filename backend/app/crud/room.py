@@ -24,8 +24,7 @@ def create_room(db: Session, room_data: RoomCreate):
         guest_name=room_data.guest_name,
     )
     db.add(room)
-    db.commit()
-    db.refresh(room)
+    db.flush()
     return room
 
 
@@ -71,7 +70,7 @@ def disassociate_room_tables(db: Session, room_id: int):
     for table in tables:
         table.room_id = None
     
-    db.commit()
+    db.flush()
     
     return {
         "message": f"Desassociadas {len(tables)} mesa(s) do quarto {room.number}",
@@ -87,8 +86,7 @@ def update_room(db: Session, room_id: int, room_update: RoomUpdate):
         raise HTTPException(status_code=404, detail="Room not found")
     for field, value in room_update.dict(exclude_unset=True).items():
         setattr(room, field, value)
-    db.commit()
-    db.refresh(room)
+    db.flush()
     return room
 
 
@@ -109,4 +107,4 @@ def delete_room(db: Session, room_id: int):
     
     # Se não há mesas associadas, pode excluir o quarto
     db.delete(room)
-    db.commit()
+    db.flush()
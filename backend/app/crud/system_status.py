@@ -12,8 +12,7 @@ def get_system_status(db: Session) -> SystemStatus:
         # Criar status padrão se não existir
         status = SystemStatus(orders_enabled=True)
         db.add(status)
-        db.commit()
-        db.refresh(status)
+        db.flush()
     
     return status
 
@@ -26,8 +25,7 @@ def update_system_status(db: Session, updates: SystemStatusUpdate, updated_by: s
     status.reason = updates.reason
     status.updated_by = updated_by
     
-    db.commit()
-    db.refresh(status)
+    db.flush()
     return status
 
 
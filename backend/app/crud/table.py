@@ -2,9 +2,13 @@ from datetime import datetime
 from typing import Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import select
 from sqlalchemy.orm import Session
 
-from app.crud.order import get_orders_by_table
+from app.core.business_day import business_date
+from app.core.money import ZERO, calculate_service_tax, money_sum
+from app.crud.change_event import record_change
+from app.models.order import Order
 from app.models.room import Room
 from app.models.table import Table
 from app.schemas.table import TableCreate
@@ -37,13 +41,19 @@ def create_table(db: Session, table_data: TableCreate, created_by: str):
         name=table_data.name, is_closed=False, created_by=created_by, room_id=room_id
     )
     db.add(new_table)
-    db.commit()
-    db.refresh(new_table)
+    db.flush()
+    _record_table_change(db, new_table, "created")
     return new_table
 
 
+def _record_table_change(db: Session, table: Table, action: str) -> None:
+    record_change(
+        db, "table", table.id, action, is_closed=table.is_closed, room_id=table.room_id
+    )
+
+
 def get_table(db: Session, table_id: int) -> Optional[Table]:
-    return db.query(Table).filter(Table.id == table_id).first()
+    return db.get(Table, table_id)
 
 
 def get_tables(db: Session, is_closed: bool) -> list[Table]:
@@ -59,14 +69,18 @@ def close_table(
 ) -> dict:
     table.is_closed = True
     table.closed_at = datetime.utcnow()
+    table.closed_business_date = business_date(table.closed_at)
     if closed_by:
         table.closed_by = closed_by
-    db.commit()
-    db.refresh(table)
-    # Calcular total dos pedidos da mesa (excluindo pedidos cancelados)
-    orders = get_orders_by_table(db, table.id)
-    total = sum(order.total_amount for order in orders if order.status != "cancelled")
-    taxa = total * 0.10 if service_tax else 0.0
+    db.flush()
+    _record_table_change(db, table, "closed")
+    # Total dos pedidos da mesa (excluindo cancelados), somado no banco
+    total = db.scalar(
+        select(money_sum(Order.total_amount)).where(
+            Order.table_id == table.id, Order.status != "cancelled"
+        )
+    )
+    taxa = calculate_service_tax(total) if service_tax else ZERO
     total_com_taxa = total + taxa
     return {
         "table": table,
@@ -80,7 +94,8 @@ def close_table(
 
 def delete_table(db: Session, table: Table):
     db.delete(table)
-    db.commit()
+    db.flush()
+    record_change(db, "table", table.id, "deleted")
 
 
 def update_table(db: Session, table_id: int, table_update):
@@ -101,6 +116,6 @@ def update_table(db: Session, table_id: int, table_update):
             )
     for key, value in update_data.items():
         setattr(table, key, value)
-    db.commit()
-    db.refresh(table)
+    db.flush()
+    _record_table_change(db, table, "updated")
     return table
@@ -1,21 +1,44 @@
 # app/crud/user.py
+from typing import Optional
+
 from fastapi import HTTPException, status
+from sqlalchemy import lambda_stmt, select
 from sqlalchemy.orm import Session
 
+from app.core.revocation import DELETED, revoke_on_commit
 from app.core.security import hash_password
+from app.crud.change_event import record_change
+from app.crud.refresh_token import revoke_user_refresh_tokens
 from app.models.user import User
 from app.schemas.user import UserCreate
 
 
 def get_user_by_username(db: Session, username: str):
-    return db.query(User).filter(User.username == username).first()
+    # lambda_stmt: o statement é montado e compilado uma vez e reaproveitado
+    stmt = lambda_stmt(lambda: select(User).where(User.username == username))
+    return db.execute(stmt).scalars().first()
+
+
+def _record_user_change(db: Session, user: User, action: str) -> None:
+    # Publica a versão dos tokens para os outros workers (app.core.revocation)
+    version = DELETED if action == "deleted" else user.token_version
+    data = {} if action == "deleted" else {"token_version": user.token_version}
+    record_change(db, "user", user.id, action, username=user.username, **data)
+    revoke_on_commit(db, "user", user.id, version)
+
+
+def _revoke_tokens(db: Session, user: User) -> None:
+    """Invalida os access tokens já emitidos para o usuário."""
+    user.token_version = (user.token_version or 1) + 1
+    _record_user_change(db, user, "revoked")
 
 
 def get_users(db: Session, skip: int = 0, limit: int = 100):
     return db.query(User).offset(skip).limit(limit).all()
 
 
-def create_user(db: Session, user: UserCreate):
+def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+    # As rotas calculam o hash antes, no pool de bcrypt (hash_password_async)
     existing_user = get_user_by_username(db, user.username)
     if existing_user:
         raise HTTPException(
@@ -23,31 +46,39 @@ def create_user(db: Session, user: UserCreate):
         )
     db_user = User(
         username=user.username,
-        hashed_password=hash_password(user.password),
+        hashed_password=hashed_password or hash_password(user.password),
         role=user.role,
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    db.flush()
+    _record_user_change(db, db_user, "created")
     return db_user
 
 
 def delete_user(db: Session, username: str):
-    user = db.query(User).filter(User.username == username).first()
+    user = get_user_by_username(db, username)
     if user:
         db.delete(user)
-        db.commit()
+        revoke_user_refresh_tokens(db, username)
+        _record_user_change(db, user, "deleted")
+        db.flush()
         return True
     return False
 
 
-def update_user_password(db: Session, username: str, new_password: str):
-    user = db.query(User).filter(User.username == username).first()
+def update_user_password(
+    db: Session, username: str, hashed_password: str, revoke_sessions: bool = False
+):
+    user = get_user_by_username(db, username)
     if not user:
         return None
-    user.hashed_password = hash_password(new_password)
-    db.commit()
-    db.refresh(user)
+    user.hashed_password = hashed_password
+    # Troca de senha pelo administrador encerra as sessões (refresh tokens);
+    # a refação do hash no login não
+    if revoke_sessions:
+        revoke_user_refresh_tokens(db, username)
+        _revoke_tokens(db, user)
+    db.flush()
     return user
 
 
@@ -55,7 +86,8 @@ def update_user_role(db: Session, username: str, new_role: str):
     user = get_user_by_username(db, username)
     if not user:
         return None
-    user.role = new_role
-    db.commit()
-    db.refresh(user)
+    if user.role != new_role:
+        user.role = new_role
+        _revoke_tokens(db, user)
+    db.flush()
     return user
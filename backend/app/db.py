@@ -3,24 +3,187 @@ Configuração do banco de dados.
 
 Este módulo contém a configuração do SQLAlchemy para conexão
 com o banco de dados PostgreSQL.
+
+Com ``DATABASE_ASYNC=true`` as rotas recebem uma ``AsyncSession``
+(asyncpg/aiosqlite) e o acesso ao banco roda no event loop, sem ocupar
+um worker do threadpool durante o round-trip. O engine síncrono continua
+disponível para o startup, o healthcheck e o Alembic.
+
+Com ``REPORTS_DATABASE_URL`` os relatórios leem de uma réplica
+(``get_read_db``), sem competir com os pedidos pelo primário.
+
+Bancos SQLite em arquivo recebem o perfil de ``app.core.sqlite_profile``
+(WAL, pragmas e escritas serializadas), desligável com ``SQLITE_PROFILE``.
 """
 
+import threading
+from typing import Any, Callable, TypeVar, Union
+
 from sqlalchemy import create_engine
-from sqlalchemy.orm import declarative_base, sessionmaker
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import Session, declarative_base, sessionmaker
+from starlette.concurrency import run_in_threadpool
 
 from app.core.config import Settings
+from app.core.metrics import install_pool_metrics
+from app.core.pool_monitor import monitored_pool_class
+from app.core.query_counter import install_query_counter
+from app.core.sqlite_profile import configure_sqlite_engine, is_file_sqlite
 
 settings = Settings()
 SQLALCHEMY_DATABASE_URL = settings.DATABASE_URL  # pega do .env
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL,
-    connect_args=(
-        {"check_same_thread": False}
-        if SQLALCHEMY_DATABASE_URL.startswith("sqlite")
-        else {}
-    ),
+# Drivers assíncronos equivalentes aos drivers síncronos configurados
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+T = TypeVar("T")
+_sqlite_write_locks: dict[str, threading.Lock] = {}
+DbSession = Union[Session, AsyncSession]
+
+
+def get_async_database_url(database_url: str) -> str:
+    """Converte a URL do banco para o driver assíncrono correspondente."""
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"Banco '{backend}' não suporta o modo assíncrono")
+    return url.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(
+        hide_password=False
+    )
+
+
+def pool_options(database_url: str, name: str, async_mode: bool = False) -> dict:
+    """Parâmetros de pool do engine, vindos do ``Settings``.
+
+    SQLite em memória usa um pool próprio de conexão única e fica de fora.
+    """
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+    return {
+        "poolclass": monitored_pool_class(
+            name, settings.DB_POOL_SLOW_CHECKOUT_MS, async_mode=async_mode
+        ),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def sqlite_write_lock(database_url: str) -> threading.Lock:
+    """Lock de escrita do processo, um por arquivo SQLite."""
+    database = make_url(database_url).database
+    return _sqlite_write_locks.setdefault(database, threading.Lock())
+
+
+def create_db_engine(database_url: str, name: str):
+    """Engine síncrono com o pool monitorado sob o nome ``name``."""
+    db_engine = create_engine(
+        database_url,
+        connect_args=(
+            {"check_same_thread": False} if database_url.startswith("sqlite") else {}
+        ),
+        **pool_options(database_url, name),
+    )
+    install_query_counter(db_engine)
+    install_pool_metrics(db_engine, name)
+    if settings.SQLITE_PROFILE and is_file_sqlite(database_url):
+        configure_sqlite_engine(
+            db_engine, settings, write_lock=sqlite_write_lock(database_url)
+        )
+    return db_engine
+
+
+def create_db_async_engine(database_url: str, name: str):
+    """Engine assíncrono com o pool monitorado sob o nome ``name``."""
+    db_engine = create_async_engine(
+        get_async_database_url(database_url),
+        **pool_options(database_url, name, async_mode=True),
+    )
+    install_query_counter(db_engine.sync_engine)
+    install_pool_metrics(db_engine.sync_engine, name)
+    if settings.SQLITE_PROFILE and is_file_sqlite(database_url):
+        configure_sqlite_engine(db_engine.sync_engine, settings)
+    return db_engine
+
+
+engine = create_db_engine(SQLALCHEMY_DATABASE_URL, "primary")
+
+# expire_on_commit=False: as rotas são async e serializam a resposta no event
+# loop, então os objetos devolvidos pelo CRUD não podem recarregar atributos
+# expirados (I/O bloqueante ou MissingGreenlet com AsyncSession)
+SessionLocal = sessionmaker(
+    autocommit=False, autoflush=False, expire_on_commit=False, bind=engine
 )
 
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+async_engine = None
+AsyncSessionLocal = None
+if settings.DATABASE_ASYNC:
+    async_engine = create_db_async_engine(SQLALCHEMY_DATABASE_URL, "primary_async")
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine, autoflush=False, expire_on_commit=False
+    )
+
+# Réplica de leitura para relatórios. Sem REPORTS_DATABASE_URL os relatórios
+# usam os mesmos engines/sessões do primário.
+REPORTS_DATABASE_URL = settings.REPORTS_DATABASE_URL
+read_engine = engine
+ReadSessionLocal = SessionLocal
+async_read_engine = async_engine
+AsyncReadSessionLocal = AsyncSessionLocal
+if REPORTS_DATABASE_URL:
+    read_engine = create_db_engine(REPORTS_DATABASE_URL, "reports")
+    ReadSessionLocal = sessionmaker(
+        autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine
+    )
+    if settings.DATABASE_ASYNC:
+        async_read_engine = create_db_async_engine(
+            REPORTS_DATABASE_URL, "reports_async"
+        )
+        AsyncReadSessionLocal = async_sessionmaker(
+            async_read_engine, autoflush=False, expire_on_commit=False
+        )
+
 Base = declarative_base()
+
+
+async def run_db(db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Executa uma função CRUD na sessão da requisição, sem bloquear o event loop.
+
+    As funções de ``app/crud`` recebem uma ``Session`` síncrona como primeiro
+    argumento. Com ``AsyncSession`` a função roda via ``run_sync`` (I/O
+    assíncrono no próprio event loop); com ``Session`` ela roda no threadpool,
+    como nas rotas síncronas.
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn, *args, **kwargs)
+    return await run_in_threadpool(fn, db, *args, **kwargs)
+
+
+def _unit_of_work(db: Session, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    try:
+        result = fn(db, *args, **kwargs)
+        db.commit()
+    except BaseException:
+        db.rollback()
+        raise
+    return result
+
+
+async def run_db_commit(
+    db: DbSession, fn: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Executa uma função CRUD de escrita e faz o commit da requisição.
+
+    As funções de ``app/crud`` só fazem ``flush``: a rota decide quando a
+    unidade de trabalho termina. Tudo o que ``fn`` gravar (pedido, itens,
+    estoque, job de impressão...) vai em um único commit, na mesma ida ao
+    threadpool/greenlet; em caso de erro a transação inteira é desfeita.
+    """
+    return await run_db(db, _unit_of_work, fn, *args, **kwargs)
@@ -1,17 +1,25 @@
 # app/dependencies.py
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from sqlalchemy.orm import Session
 
-from app.core.security import ALGORITHM, SECRET_KEY
-from app.db import SessionLocal
+from app.core.revocation import revocations
+from app.core.security import ALGORITHM, SECRET_KEY, scope_allows
+from app.core.server_timing import timed
+from app.core.token_cache import token_cache
+from app.db import (
+    AsyncReadSessionLocal,
+    AsyncSessionLocal,
+    ReadSessionLocal,
+    SessionLocal,
+    settings,
+)
 from app.schemas.auth import TokenData
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/login")
 
 
-def get_current_user(token: str = Depends(oauth2_scheme)):
+def _verify_token(token: str) -> TokenData:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -22,14 +30,85 @@ def get_current_user(token: str = Depends(oauth2_scheme)):
         role: str = payload.get("role")
         if username is None or role is None:
             raise credentials_exception
-        return TokenData(username=username, role=role)
+        scope = payload.get("scope")
+        token_data = TokenData(
+            username=username,
+            role=role,
+            scopes=scope.split() if scope is not None else None,
+            user_id=payload.get("uid"),
+            client_pk=payload.get("cid"),
+            token_version=payload.get("ver", 1),
+        )
+        token_cache.put(token, token_data, payload.get("exp"))
+        return token_data
     except JWTError:
         raise credentials_exception
 
 
-def get_db():
+def _authorize(request: Request, token: str) -> TokenData:
+    # Token já verificado e ainda dentro da validade: sem decodificar de novo
+    token_data = token_cache.get(token) or _verify_token(token)
+    # Usuário ou cliente excluído, desativado ou alterado depois da emissão
+    # (tokens sem o id são anteriores à revogação por id: renovar)
+    if token_data.scopes is None:
+        entity, entity_id = "user", token_data.user_id
+    else:
+        entity, entity_id = "client", token_data.client_pk
+    if entity_id is None or revocations.is_revoked(
+        entity, entity_id, token_data.token_version
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token has been revoked",
+        )
+    # Tokens de clientes (agentes) só valem nos endpoints dos seus escopos
+    if token_data.scopes is not None and not scope_allows(
+        token_data.scopes, request.scope["path"]
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Token scope does not allow this endpoint",
+        )
+    # Usuário no log de acesso (LoggingMiddleware), em vez do token
+    request.state.username = token_data.username
+    return token_data
+
+
+async def get_current_user(request: Request, token: str = Depends(oauth2_scheme)):
+    with timed("auth"):
+        return _authorize(request, token)
+
+
+def get_sync_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+# Sessão entregue às rotas: AsyncSession com DATABASE_ASYNC, Session caso contrário
+get_db = get_async_db if settings.DATABASE_ASYNC else get_sync_db
+
+
+def get_sync_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+# Sessão somente leitura (relatórios): réplica se REPORTS_DATABASE_URL estiver
+# configurada, primário caso contrário
+get_read_db = get_async_read_db if settings.DATABASE_ASYNC else get_sync_read_db
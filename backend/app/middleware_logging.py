@@ -1,26 +1,106 @@
+"""
+Log de acesso em ASGI puro.
+
+Uma linha por requisição com método, rota, status, duração e comandos SQL.
+O usuário vem de ``request.state.username``, gravado por
+``get_current_user`` depois de validar o token: o header ``Authorization``
+nunca é logado.
+
+Rotas de polling (``LOG_SAMPLED_PATHS``, como ``/tables/`` e ``/health``)
+são logadas só numa fração ``LOG_SAMPLE_RATE`` das vezes; erros (status >=
+400) e requisições mais lentas que ``LOG_SLOW_REQUEST_MS`` sempre entram.
+
+Cada linha traz também o tempo de auth, banco, rota e serialização
+(``app.core.server_timing``); com ``SERVER_TIMING=true`` eles vão para o
+header ``Server-Timing`` da resposta.
+"""
+
+import random
 import time
 
 from loguru import logger
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.requests import Request
-from starlette.responses import Response
-
-
-class LoggingMiddleware(BaseHTTPMiddleware):
-    async def dispatch(self, request: Request, call_next):
-        start_time = time.time()
-        response: Response = await call_next(request)
-        process_time = (time.time() - start_time) * 1000
-        user = request.headers.get("authorization", "anonymous")
-        logger.info(
-            {
-                "event": "request",
-                "method": request.method,
-                "path": request.url.path,
-                "status_code": response.status_code,
-                "duration_ms": round(process_time, 2),
-                "user": user,
-                "query_params": str(request.query_params),
-            }
-        )
-        return response
+
+from app.core.config import Settings
+from app.core.query_counter import current_query_stats
+from app.core.server_timing import RequestTimings, request_timings
+
+settings = Settings()
+
+
+class LoggingMiddleware:
+    def __init__(self, app):
+        self.app = app
+        self.sampled_paths = frozenset(settings.log_sampled_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        # Compartilhado com o request.state das rotas
+        state = scope.setdefault("state", {})
+
+        start_time = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.SERVER_TIMING:
+                    message = self.add_server_timing(message, timings, start_time)
+            await send(message)
+
+        with request_timings() as timings:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                duration_ms = (time.perf_counter() - start_time) * 1000
+                self.log_request(scope, state, timings, status_code, duration_ms)
+
+    @staticmethod
+    def add_server_timing(message, timings: RequestTimings, start_time: float):
+        total_ms = (time.perf_counter() - start_time) * 1000
+        header = timings.header(current_query_stats(), total_ms)
+        headers = [
+            *message.get("headers", []),
+            (b"server-timing", header.encode("latin-1")),
+            # Libera os tempos para o frontend servido em outra origem
+            (b"timing-allow-origin", b"*"),
+        ]
+        return {**message, "headers": headers}
+
+    def log_request(
+        self,
+        scope,
+        state,
+        timings: RequestTimings,
+        status_code: int,
+        duration_ms: float,
+    ):
+        sample_rate = 1.0
+        if (
+            scope["path"] in self.sampled_paths
+            and status_code < 400
+            and duration_ms < settings.LOG_SLOW_REQUEST_MS
+        ):
+            sample_rate = settings.LOG_SAMPLE_RATE
+            if random.random() >= sample_rate:
+                return
+
+        query_stats = current_query_stats()
+        record = {
+            "event": "request",
+            "method": scope["method"],
+            "path": scope["path"],
+            "status_code": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_queries": query_stats.count if query_stats else None,
+            "user": state.get("username", "anonymous"),
+            "query_params": scope["query_string"].decode("latin-1"),
+            **timings.log_fields(query_stats),
+        }
+        if sample_rate < 1.0:
+            # Cada linha amostrada representa 1 / sample_rate requisições
+            record["sample_rate"] = sample_rate
+        logger.info(record)
@@ -5,13 +5,20 @@ Este módulo contém todos os modelos da aplicação para importação centraliz
 """
 
 from .category import Category
+from .change_event import ChangeEvent
+from .client import Client
 from .order import Order
 from .order_item import OrderItem
 from .payment import Payment
 from .print_queue import PrintQueue
+from .print_queue_config import PrintQueueConfig
 from .product import Product
+from .refresh_token import RefreshToken
 from .report import Report
 from .room import Room
 from .system_status import SystemStatus
 from .table import Table
 from .user import User
+
+# Depois dos modelos: as tabelas de arquivo copiam as colunas deles
+from .archive import OrderHistory, OrderItemHistory, PaymentHistory, TableHistory
@@ -0,0 +1,103 @@
+"""
+Tabelas de arquivo (dados frios).
+
+Mesas fechadas há mais de ``ARCHIVE_AFTER_DAYS`` dias saem das tabelas
+quentes junto com seus pedidos, itens, pagamentos e impressões
+(``app.crud.archive``). Cada tabela de arquivo tem as mesmas colunas e os
+mesmos ids da tabela quente, sem chaves estrangeiras.
+
+As rotas operacionais leem só as tabelas quentes. Os relatórios usam as
+entidades ``*History`` deste módulo: aliases dos modelos sobre
+``quente UNION ALL arquivo``, que se comportam como os modelos originais
+nas consultas. Um JOIN entre duas uniões impede o SQLite de usar os
+índices de cada lado; consultas que juntam pedidos e itens usam
+``ORDER_TIERS`` e fazem a união por nível.
+"""
+
+from sqlalchemy import Column, Index, Table, select, union_all
+from sqlalchemy.orm import aliased
+
+from app.db import Base
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.print_queue import PrintQueue
+from app.models.table import Table as DiningTable
+
+
+def _archive_table(model, *indexes: Index) -> Table:
+    """Cópia das colunas de ``model`` em ``archive_<tabela>``."""
+    hot = model.__table__
+    return Table(
+        f"archive_{hot.name}",
+        Base.metadata,
+        *(
+            Column(
+                column.name,
+                column.type,
+                primary_key=column.primary_key,
+                nullable=column.nullable,
+                autoincrement=False,
+            )
+            for column in hot.columns
+        ),
+        *indexes,
+    )
+
+
+archive_tables = _archive_table(
+    DiningTable,
+    Index("ix_archive_tables_business_date", "business_date"),
+    Index(
+        "ix_archive_tables_room_id_closed_business_date",
+        "room_id",
+        "closed_business_date",
+    ),
+    Index("ix_archive_tables_created_by_created_at", "created_by", "created_at"),
+)
+archive_orders = _archive_table(
+    Order,
+    Index("ix_archive_orders_table_id", "table_id"),
+    Index("ix_archive_orders_business_date_hour", "business_date", "business_hour"),
+    Index("ix_archive_orders_created_at", "created_at"),
+)
+archive_order_items = _archive_table(
+    OrderItem,
+    Index("ix_archive_order_items_order_id_product_id", "order_id", "product_id"),
+)
+archive_payments = _archive_table(
+    Payment,
+    Index("ix_archive_payments_order_id", "order_id"),
+    Index("ix_archive_payments_business_date", "business_date"),
+    Index("ix_archive_payments_created_at", "created_at"),
+)
+archive_print_queue = _archive_table(
+    PrintQueue, Index("ix_archive_print_queue_table_id", "table_id")
+)
+
+# Ordem de remoção das tabelas quentes: filhos antes dos pais
+ARCHIVED_MODELS = (
+    (PrintQueue, archive_print_queue),
+    (Payment, archive_payments),
+    (OrderItem, archive_order_items),
+    (Order, archive_orders),
+    (DiningTable, archive_tables),
+)
+
+
+def _history(model, archive: Table):
+    hot = model.__table__
+    union = union_all(select(hot), select(archive)).subquery(f"{hot.name}_history")
+    return aliased(model, union, name=f"{model.__name__}History")
+
+
+# Pedidos e itens são arquivados juntos: JOINs entre os dois ficam dentro
+# de um mesmo nível (quente com quente, arquivo com arquivo)
+ArchivedOrder = aliased(Order, archive_orders, adapt_on_names=True)
+ArchivedOrderItem = aliased(OrderItem, archive_order_items, adapt_on_names=True)
+ORDER_TIERS = ((Order, OrderItem), (ArchivedOrder, ArchivedOrderItem))
+
+TableHistory = _history(DiningTable, archive_tables)
+OrderHistory = _history(Order, archive_orders)
+OrderItemHistory = _history(OrderItem, archive_order_items)
+PaymentHistory = _history(Payment, archive_payments)
@@ -0,0 +1,31 @@
+"""
+Modelo do feed de alterações (outbox transacional).
+
+Cada escrita de pedidos, mesas, produtos, fila de impressão e pagamentos
+grava um evento nesta tabela na mesma transação. O ``id`` é a sequência
+monotônica usada como cursor por quem acompanha as mudanças.
+"""
+
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, Index, Integer, String
+
+from app.db import Base
+
+
+class ChangeEvent(Base):
+    """Evento de alteração de uma entidade do domínio."""
+
+    __tablename__ = "change_events"
+    __table_args__ = (
+        Index("ix_change_events_entity_id", "entity", "id"),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids após exclusões
+        {"sqlite_autoincrement": True},
+    )
+
+    id = Column(Integer, primary_key=True)
+    entity = Column(String, nullable=False)  # order, table, product, ...
+    entity_id = Column(Integer, nullable=False)
+    action = Column(String, nullable=False)  # created, updated, deleted, ...
+    data = Column(JSON, nullable=True)  # Campos relevantes para o cliente
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -2,13 +2,14 @@
 Modelos de cliente.
 
 Este módulo contém os modelos SQLAlchemy para clientes e suas funções.
+Clientes são credenciais de máquina (agentes de impressão): o segredo é
+gerado pelo servidor e só o HMAC dele fica no banco.
 """
 
 from datetime import datetime
 from enum import Enum
 
 from sqlalchemy import Boolean, Column, DateTime, Integer, String
-from sqlalchemy.orm import relationship
 
 from app.db import Base
 
@@ -18,18 +19,26 @@ class ClientRoleEnum(str, Enum):
 
     WAITER = "waiter"
     ADMINISTRATOR = "administrator"
+    AGENT = "agent"
 
 
 class Client(Base):
     """Modelo de cliente com autenticação via client_id e client_secret."""
 
     __tablename__ = "clients"
+    # SQLite: AUTOINCREMENT impede reaproveitar o id de um cliente excluído
+    # (a revogação de tokens é indexada pelo id)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(String, unique=True, index=True, nullable=False)
-    client_secret = Column(String, nullable=False)
+    client_secret_hash = Column(String, nullable=False)
     name = Column(String, nullable=False)
-    role = Column(String, nullable=False, default=ClientRoleEnum.WAITER)
+    role = Column(String, nullable=False, default=ClientRoleEnum.AGENT)
+    # Escopos separados por espaço (app.core.security.CLIENT_SCOPES)
+    scopes = Column(String, nullable=False, default="print_queue")
     is_active = Column(Boolean, default=True)
+    # Claim "ver" dos tokens; incrementar revoga os tokens já emitidos
+    token_version = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -7,11 +7,14 @@ Este módulo contém os modelos SQLAlchemy para pedidos e seus status.
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime
+from sqlalchemy import Column, Date, DateTime
 from sqlalchemy import Enum as SqlEnum
-from sqlalchemy import ForeignKey, Integer, String, func
+from sqlalchemy import ForeignKey, Index, Integer, String, func
 from sqlalchemy.orm import relationship
 
+from app.core.business_day import business_date_default, business_hour_default
+from app.core.money import ZERO, Money
+from app.core.versioning import version_column
 from app.db import Base
 
 
@@ -27,34 +30,53 @@ class Order(Base):
     """Modelo de pedido com relacionamento para itens."""
 
     __tablename__ = "orders"
-
+    __table_args__ = (
+        Index("ix_orders_table_id_created_at", "table_id", "created_at"),
+        Index("ix_orders_created_at", "created_at"),
+        Index("ix_orders_business_date_hour", "business_date", "business_hour"),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids de linhas arquivadas
+        {"sqlite_autoincrement": True},
+    )
     id = Column(Integer, primary_key=True, index=True)
     table_id = Column(Integer, ForeignKey("tables.id"), nullable=False)
     comment = Column(String, nullable=True)  # Comentário geral do pedido
     status = Column(String, default="pending", nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     created_by = Column(String, nullable=False)
+    # Dia comercial e hora local da criação (app.core.business_day)
+    business_date = Column(Date, default=business_date_default)
+    business_hour = Column(Integer, default=business_hour_default)
     updated_at = Column(DateTime(timezone=True), nullable=True)
     updated_by = Column(String, nullable=True)
     cancelled_at = Column(DateTime(timezone=True), nullable=True)
     cancelled_by = Column(String, nullable=True)
+    # Totais persistidos, mantidos por recalculate_totals() a cada mudança nos
+    # itens: listagens e relatórios não precisam carregar order_items
+    total_amount = Column(Money, default=0, server_default="0", nullable=False)
+    total_items = Column(Integer, default=0, server_default="0", nullable=False)
+    # Concorrência otimista (app.core.versioning)
+    version_id = version_column()
+
+    # Defaults do servidor voltam no próprio INSERT/UPDATE (RETURNING)
+    __mapper_args__ = {"eager_defaults": True, "version_id_col": version_id}
 
     # Relacionamentos
     table = relationship("Table", back_populates="orders")
+    # selectin: os itens são sempre serializados junto com o pedido (OrderOut)
     items = relationship(
-        "OrderItem", back_populates="order", cascade="all, delete-orphan"
+        "OrderItem",
+        back_populates="order",
+        cascade="all, delete-orphan",
+        lazy="selectin",
     )
     payment = relationship(
         "Payment", back_populates="order", uselist=False, cascade="all, delete-orphan"
     )
     print_queue_items = relationship("PrintQueue", back_populates="order")
 
-    @property
-    def total_amount(self):
-        """Calcula o valor total do pedido."""
-        return sum(item.unit_price * item.quantity for item in self.items)
-
-    @property
-    def total_items(self):
-        """Calcula o total de itens no pedido."""
-        return sum(item.quantity for item in self.items)
+    def recalculate_totals(self) -> None:
+        """Recalcula total_amount e total_items a partir dos itens do pedido."""
+        self.total_amount = sum(
+            (item.unit_price * item.quantity for item in self.items), ZERO
+        )
+        self.total_items = sum(item.quantity for item in self.items)
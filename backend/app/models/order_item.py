@@ -4,9 +4,10 @@ Modelo de item de pedido.
 Este módulo contém o modelo SQLAlchemy para itens individuais de pedidos.
 """
 
-from sqlalchemy import Column, Float, ForeignKey, Integer, String
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, ForeignKey, Index, Integer, String
+from sqlalchemy.orm import relationship, validates
 
+from app.core.money import Money, to_money
 from app.db import Base
 
 
@@ -14,14 +15,23 @@ class OrderItem(Base):
     """Modelo de item individual em um pedido."""
 
     __tablename__ = "order_items"
+    __table_args__ = (
+        Index("ix_order_items_order_id_product_id", "order_id", "product_id"),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids de linhas arquivadas
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     product_id = Column(Integer, ForeignKey("products.id"), nullable=False)
     quantity = Column(Integer, default=1, nullable=False)
-    unit_price = Column(Float, nullable=False)  # Preço no momento do pedido
+    unit_price = Column(Money, nullable=False)  # Preço no momento do pedido
     comment = Column(String, nullable=True)  # Comentário específico do item
 
     # Relacionamentos
     order = relationship("Order", back_populates="items")
     product = relationship("Product")
+
+    @validates("unit_price")
+    def _validate_money(self, key, value):
+        return to_money(value)
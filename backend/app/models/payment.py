@@ -7,9 +7,20 @@ Este módulo contém o modelo SQLAlchemy para pagamentos do sistema.
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Column, DateTime, Float, ForeignKey, Integer, String, func
-from sqlalchemy.orm import relationship
-
+from sqlalchemy import (
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.orm import relationship, validates
+
+from app.core.business_day import business_date_default, business_hour_default
+from app.core.money import Money, to_money
 from app.db import Base
 
 
@@ -34,20 +45,36 @@ class Payment(Base):
     """Modelo de pagamento com controle de troco e taxa de serviço."""
 
     __tablename__ = "payments"
+    __table_args__ = (
+        Index("ix_payments_order_id", "order_id"),
+        Index("ix_payments_created_at", "created_at"),
+        Index("ix_payments_business_date", "business_date"),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids de linhas arquivadas
+        {"sqlite_autoincrement": True},
+    )
+    # Defaults do servidor voltam no próprio INSERT/UPDATE (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     order_id = Column(Integer, ForeignKey("orders.id"), nullable=False)
     method = Column(String, nullable=False)  # PaymentMethod
     status = Column(String, default="pending", nullable=False)  # PaymentStatus
-    amount = Column(Float, nullable=False)  # Valor total do pedido
-    amount_paid = Column(Float, nullable=False)  # Valor pago pelo cliente
-    change = Column(Float, default=0.0)  # Troco
-    service_tax = Column(Float, default=0.0)  # Taxa de serviço (10%)
+    amount = Column(Money, nullable=False)  # Valor total do pedido
+    amount_paid = Column(Money, nullable=False)  # Valor pago pelo cliente
+    change = Column(Money, default=0)  # Troco
+    service_tax = Column(Money, default=0)  # Taxa de serviço (10%)
     service_tax_included = Column(String, default="no")  # "yes" ou "no"
     created_at = Column(DateTime(timezone=True), server_default=func.now())
+    # Dia comercial e hora local da criação (app.core.business_day)
+    business_date = Column(Date, default=business_date_default)
+    business_hour = Column(Integer, default=business_hour_default)
     paid_at = Column(DateTime(timezone=True), nullable=True)
 
     # Relacionamentos
     order = relationship("Order", back_populates="payment")
 
+    @validates("amount", "amount_paid", "change", "service_tax")
+    def _validate_money(self, key, value):
+        return to_money(value)
+
     # Métodos de cálculo serão implementados no CRUD
@@ -7,7 +7,16 @@ Este módulo contém o modelo SQLAlchemy para a fila de impressão.
 from datetime import datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import relationship
 
 from app.db import Base
@@ -25,6 +34,20 @@ class PrintQueue(Base):
     """Modelo de item na fila de impressão."""
 
     __tablename__ = "print_queue"
+    __table_args__ = (
+        Index("ix_print_queue_status_created_at", "status", "created_at"),
+        # Polling da impressora: próximo item pendente por ordem de chegada
+        Index(
+            "ix_print_queue_pending_created_at",
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+            sqlite_where=text("status = 'pending'"),
+        ),
+        # Arquivamento: impressões das mesas arquivadas
+        Index("ix_print_queue_table_id", "table_id"),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids de linhas arquivadas
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     type = Column(String, nullable=False)  # "order", "table", "fiscal"
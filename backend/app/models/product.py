@@ -4,9 +4,11 @@ Modelo de produto.
 Este módulo contém o modelo SQLAlchemy para produtos do sistema.
 """
 
-from sqlalchemy import Boolean, Column, Float, Integer, String, Time, LargeBinary, ForeignKey
-from sqlalchemy.orm import relationship
+from sqlalchemy import Boolean, Column, Integer, String, Time, LargeBinary, ForeignKey
+from sqlalchemy.orm import relationship, validates
 
+from app.core.money import Money, to_money
+from app.core.versioning import version_column
 from app.db import Base
 
 
@@ -18,7 +20,7 @@ class Product(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False)
     description = Column(String)
-    price = Column(Float, nullable=False)
+    price = Column(Money, nullable=False)
     is_active = Column(Boolean, default=True, nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     image_data = Column(LargeBinary, nullable=True)
@@ -27,6 +29,14 @@ class Product(Base):
     stock_quantity = Column(Integer, default=0)
     available_from = Column(Time, nullable=True)
     available_until = Column(Time, nullable=True)
+    # Concorrência otimista (app.core.versioning)
+    version_id = version_column()
+
+    __mapper_args__ = {"version_id_col": version_id}
     
     # Relacionamento com categoria
     category_rel = relationship("Category", back_populates="products")
+
+    @validates("price")
+    def _validate_money(self, key, value):
+        return to_money(value)
@@ -0,0 +1,28 @@
+"""
+Modelo de refresh tokens (sessões longas de tablets e agentes).
+
+Só o SHA-256 do token é gravado. Cada uso do token (``/login/refresh``)
+revoga a linha e cria outra na mesma família; reapresentar um token já
+usado revoga a família inteira (o token vazou ou foi copiado).
+"""
+
+from datetime import datetime
+
+from sqlalchemy import Column, DateTime, Integer, String
+
+from app.db import Base
+
+
+class RefreshToken(Base):
+    """Refresh token emitido no login, guardado como hash."""
+
+    __tablename__ = "refresh_tokens"
+
+    id = Column(Integer, primary_key=True)
+    token_hash = Column(String, unique=True, index=True, nullable=False)
+    # Todos os tokens obtidos por rotação a partir do mesmo login
+    family_id = Column(String, index=True, nullable=False)
+    username = Column(String, index=True, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime, nullable=False)
+    revoked_at = Column(DateTime, nullable=True)
@@ -30,6 +30,8 @@ class Report(Base):
     """Modelo para armazenar relatórios gerados."""
 
     __tablename__ = "reports"
+    # Defaults do servidor voltam no próprio INSERT/UPDATE (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     report_type = Column(String, nullable=False)
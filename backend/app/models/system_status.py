@@ -14,6 +14,8 @@ class SystemStatus(Base):
     """Modelo de status do sistema para controle de pedidos."""
 
     __tablename__ = "system_status"
+    # Defaults do servidor voltam no próprio INSERT/UPDATE (RETURNING)
+    __mapper_args__ = {"eager_defaults": True}
 
     id = Column(Integer, primary_key=True, index=True)
     orders_enabled = Column(Boolean, default=True, nullable=False)
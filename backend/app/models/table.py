@@ -6,9 +6,21 @@ Este módulo contém o modelo SQLAlchemy para mesas do sistema.
 
 from datetime import datetime
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String
+from sqlalchemy import (
+    Boolean,
+    Column,
+    Date,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    text,
+)
 from sqlalchemy.orm import relationship
 
+from app.core.business_day import business_date_default
+from app.core.versioning import version_column
 from app.db import Base
 
 
@@ -16,6 +28,25 @@ class Table(Base):
     """Modelo de mesa com relacionamento para pedidos."""
 
     __tablename__ = "tables"
+    __table_args__ = (
+        Index("ix_tables_is_closed", "is_closed"),
+        Index("ix_tables_room_id_closed_at", "room_id", "closed_at"),
+        Index("ix_tables_created_by_created_at", "created_by", "created_at"),
+        Index("ix_tables_created_at", "created_at"),
+        Index("ix_tables_business_date", "business_date"),
+        Index(
+            "ix_tables_room_id_closed_business_date", "room_id", "closed_business_date"
+        ),
+        # Checagem de nome duplicado só considera mesas abertas
+        Index(
+            "ix_tables_open_name",
+            "name",
+            postgresql_where=text("is_closed = false"),
+            sqlite_where=text("is_closed = 0"),
+        ),
+        # SQLite: AUTOINCREMENT impede reaproveitar ids de linhas arquivadas
+        {"sqlite_autoincrement": True},
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String, nullable=False, index=True)
@@ -24,6 +55,13 @@ class Table(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     closed_at = Column(DateTime, nullable=True)
     closed_by = Column(String, nullable=True)
+    # Dia comercial da abertura e do fechamento (app.core.business_day)
+    business_date = Column(Date, default=business_date_default)
+    closed_business_date = Column(Date, nullable=True)
+    # Concorrência otimista (app.core.versioning)
+    version_id = version_column()
+
+    __mapper_args__ = {"version_id_col": version_id}
     room_id = Column(
         Integer, ForeignKey("rooms.id"), nullable=True
     )  # Associação opcional a quarto
@@ -24,9 +24,14 @@ class User(Base):
     """Modelo de usuário com autenticação e autorização."""
 
     __tablename__ = "users"
+    # SQLite: AUTOINCREMENT impede reaproveitar o id de um usuário excluído
+    # (a revogação de tokens é indexada pelo id)
+    __table_args__ = {"sqlite_autoincrement": True}
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     hashed_password = Column(String, nullable=False)
     role = Column(String, nullable=False)
     is_active = Column(Boolean, default=True)
+    # Claim "ver" dos access tokens; incrementar revoga os tokens já emitidos
+    token_version = Column(Integer, nullable=False, default=1, server_default="1")
@@ -1,16 +1,31 @@
+from typing import List, Optional
+
 from pydantic import BaseModel
 
 
 class Token(BaseModel):
     access_token: str
     token_type: str
+    # Troca-se em /login/refresh por um novo par de tokens (uso único)
+    refresh_token: Optional[str] = None
 
 
 class TokenData(BaseModel):
     username: str
     role: str
+    # Só em tokens de clientes: escopos liberados (app.core.security)
+    scopes: Optional[List[str]] = None
+    # Claims "uid"/"cid" e "ver": id do usuário ou do cliente e versão dos
+    # seus tokens (app.core.revocation)
+    user_id: Optional[int] = None
+    client_pk: Optional[int] = None
+    token_version: int = 1
 
 
 class LoginRequest(BaseModel):
     username: str
     password: str
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
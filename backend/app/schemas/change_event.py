@@ -0,0 +1,27 @@
+from datetime import datetime
+from typing import Any, List, Optional
+
+from pydantic import BaseModel, ConfigDict
+
+
+class ChangeEventOut(BaseModel):
+    id: int
+    entity: str
+    entity_id: int
+    action: str
+    data: Optional[dict[str, Any]] = None
+    created_at: datetime
+
+    model_config = ConfigDict(from_attributes=True)
+
+
+class ChangeFeed(BaseModel):
+    events: List[ChangeEventOut]
+    # Passar como ``after`` na próxima chamada
+    cursor: int
+    # Há mais eventos depois do cursor (chamar de novo sem esperar)
+    has_more: bool
+
+
+class ChangeCursor(BaseModel):
+    cursor: int
@@ -5,32 +5,50 @@ Este módulo contém os schemas Pydantic para validação de dados de clientes.
 """
 
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
+
+from app.core.security import CLIENT_SCOPES
+from app.models.client import ClientRoleEnum
+
+
+def _validate_scopes(scopes):
+    # No banco os escopos ficam numa string separada por espaço
+    if isinstance(scopes, str):
+        scopes = scopes.split()
+    unknown = set(scopes or ()) - set(CLIENT_SCOPES)
+    if unknown:
+        raise ValueError(f"Unknown scopes: {', '.join(sorted(unknown))}")
+    return scopes
 
 
 class ClientBase(BaseModel):
     """Schema base para clientes."""
 
     name: str
-    role: str = "waiter"
+    role: ClientRoleEnum = ClientRoleEnum.AGENT
+    scopes: List[str] = ["print_queue"]
+
+    _check_scopes = field_validator("scopes", mode="before")(_validate_scopes)
 
 
 class ClientCreate(ClientBase):
-    """Schema para criação de clientes."""
+    """Schema para criação de clientes (o segredo é gerado pelo servidor)."""
 
     client_id: str
-    client_secret: str
 
 
 class ClientUpdate(BaseModel):
     """Schema para atualização de clientes."""
 
     name: Optional[str] = None
-    role: Optional[str] = None
+    role: Optional[ClientRoleEnum] = None
+    scopes: Optional[List[str]] = None
     is_active: Optional[bool] = None
 
+    _check_scopes = field_validator("scopes", mode="before")(_validate_scopes)
+
 
 class ClientResponse(ClientBase):
     """Schema para resposta de clientes."""
@@ -45,6 +63,12 @@ class ClientResponse(ClientBase):
         from_attributes = True
 
 
+class ClientSecretResponse(ClientResponse):
+    """Resposta da criação/rotação: o único momento em que o segredo aparece."""
+
+    client_secret: str
+
+
 class ClientLogin(BaseModel):
     """Schema para login de clientes."""
 
@@ -59,6 +83,7 @@ class ClientToken(BaseModel):
     token_type: str = "bearer"
     client_id: str
     role: str
+    scopes: List[str] = ["print_queue"]
 
 
 class ClientTokenData(BaseModel):
@@ -29,6 +29,7 @@ class OrderOut(OrderBase):
     items: List[OrderItemOut]
     total_amount: float
     total_items: int
+    version_id: int
 
     model_config = ConfigDict(from_attributes=True)
 
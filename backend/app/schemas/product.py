@@ -38,6 +38,7 @@ class ProductUpdate(BaseModel):
 
 class ProductOut(ProductBase):
     id: int
+    version_id: int
 
     model_config = {"from_attributes": True}
 
@@ -18,4 +18,29 @@ class SystemStatusOut(SystemStatusBase):
     updated_by: Optional[str] = None
     updated_at: datetime
 
-    model_config = {"from_attributes": True} 
\ No newline at end of file
+    model_config = {"from_attributes": True} 
+
+class OrderTotalsMismatch(BaseModel):
+    order_id: int
+    total_amount: float
+    total_items: int
+    expected_total_amount: float
+    expected_total_items: int
+
+
+class OrderTotalsCheck(BaseModel):
+    consistent: bool
+    mismatches: list[OrderTotalsMismatch]
+
+
+class OrderTotalsRepair(BaseModel):
+    repaired: int
+
+
+class ArchiveRun(BaseModel):
+    closed_before: datetime
+    batches: int
+    # Linhas movidas para o arquivo, por tabela
+    moved: dict[str, int]
+    # False quando parou em max_batches e ainda há mesas a arquivar
+    done: bool
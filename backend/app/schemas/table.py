@@ -26,6 +26,7 @@ class TableOut(TableBase):
     created_at: datetime
     closed_at: Optional[datetime] = None
     room_id: Optional[int] = None
+    version_id: int
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -0,0 +1,22 @@
+"""
+Funções executadas nos processos do pool de bcrypt.
+
+Fica fora do pacote ``app`` de propósito: os workers do pool (spawn)
+importam este módulo para rodar as funções, e importar qualquer coisa de
+``app`` carregaria ``app/__init__`` (a aplicação inteira, as configurações
+e o loguru) em cada processo. Só depende do ``bcrypt``.
+"""
+
+import bcrypt
+
+
+def hash_password(password: str, rounds: int) -> str:
+    salt = bcrypt.gensalt(rounds)
+    hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
+    return hashed.decode("utf-8")
+
+
+def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return bcrypt.checkpw(
+        plain_password.encode("utf-8"), hashed_password.encode("utf-8")
+    )
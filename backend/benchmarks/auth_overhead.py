@@ -0,0 +1,65 @@
+"""
+Micro-benchmark da autenticação por requisição (``get_current_user``).
+
+Compara a verificação do JWT a cada chamada (cache desligado) com o cache
+de tokens verificados de ``app.core.token_cache``. Cada "tablet" tem seu
+próprio token e as chamadas se alternam entre eles, como no polling do
+salão.
+
+Uso (a partir de ``backend/``):
+
+    python -m benchmarks.auth_overhead --iterations 20000 --tablets 30
+"""
+
+import argparse
+import asyncio
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from fastapi import Request  # noqa: E402
+
+import app.dependencies  # noqa: E402
+from app.core.security import create_access_token  # noqa: E402
+from app.core.token_cache import TokenCache  # noqa: E402
+from app.dependencies import get_current_user  # noqa: E402
+
+REQUEST = Request({"type": "http", "path": "/tables/"})
+
+
+async def timed(tokens: list[str], iterations: int) -> float:
+    """Microssegundos por chamada."""
+    start = time.perf_counter()
+    for i in range(iterations):
+        await get_current_user(REQUEST, tokens[i % len(tokens)])
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+async def run(iterations: int, tablets: int) -> None:
+    tokens = [
+        create_access_token({"sub": f"garcom{i}", "uid": i, "role": "waiter"})
+        for i in range(tablets)
+    ]
+    print(f"{'cenário':<16}{'us/requisição':>15}{'acertos':>10}")
+    for name, maxsize in (("sem cache", 0), ("com cache", 4096)):
+        cache = TokenCache(maxsize=maxsize, ttl_seconds=900)
+        app.dependencies.token_cache = cache
+        await timed(tokens, 100)  # aquecimento
+        elapsed = await timed(tokens, iterations)
+        print(f"{name:<16}{elapsed:>15.1f}{cache.snapshot()['hit_ratio']:>10.2%}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--tablets", type=int, default=30)
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.tablets))
+
+
+if __name__ == "__main__":
+    main()
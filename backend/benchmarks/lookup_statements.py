@@ -0,0 +1,124 @@
+"""
+Micro-benchmark das buscas de uma linha mais quentes.
+
+Compara o formato antigo (``db.query(...).filter(...).first()``, que monta
+o statement a cada chamada) com o atual: ``Session.get`` para chave
+primária e ``lambda_stmt`` para ``get_user_by_username``.
+
+- ``frio``: identity map vazio, sempre vai ao banco;
+- ``repetido``: a mesma linha buscada de novo na mesma requisição, que o
+  ``Session.get`` responde sem SQL.
+
+Uso (a partir de ``backend/``):
+
+    python -m benchmarks.lookup_statements --iterations 20000
+"""
+
+import argparse
+import os
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine  # noqa: E402
+from sqlalchemy.orm import Session, sessionmaker  # noqa: E402
+from sqlalchemy.pool import StaticPool  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.crud.order import get_order_by_id  # noqa: E402
+from app.crud.print_queue import get_print_queue_item  # noqa: E402
+from app.crud.product import get_product  # noqa: E402
+from app.crud.table import get_table  # noqa: E402
+from app.crud.user import get_user_by_username  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.order import Order  # noqa: E402
+from app.models.print_queue import PrintQueue  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.table import Table  # noqa: E402
+from app.models.user import User  # noqa: E402
+
+
+def legacy_lookup(model, column):
+    def lookup(db: Session, value):
+        return db.query(model).filter(column == value).first()
+
+    return lookup
+
+
+LOOKUPS = [
+    ("get_table", legacy_lookup(Table, Table.id), get_table, 1),
+    ("get_order_by_id", legacy_lookup(Order, Order.id), get_order_by_id, 1),
+    ("get_product", legacy_lookup(Product, Product.id), get_product, 1),
+    (
+        "get_print_queue_item",
+        legacy_lookup(PrintQueue, PrintQueue.id),
+        get_print_queue_item,
+        1,
+    ),
+    (
+        "get_user_by_username",
+        legacy_lookup(User, User.username),
+        get_user_by_username,
+        "admin",
+    ),
+]
+
+
+def seed(db: Session) -> None:
+    category = Category(name="Bebidas")
+    table = Table(name="Mesa 1", created_by="admin")
+    db.add_all([category, table])
+    db.flush()
+    db.add(Product(name="Água", price=3.5, category_id=category.id))
+    db.add(Order(table_id=table.id, created_by="admin"))
+    db.add(PrintQueue(type="order", table_id=table.id, content="..."))
+    db.add(User(username="admin", hashed_password="x", role="administrator"))
+    db.commit()
+
+
+def timed(db: Session, fn, value, iterations: int, cold: bool) -> float:
+    """Microssegundos por chamada."""
+    # O identity map guarda referências fracas: a requisição segura o objeto
+    held = fn(db, value)  # noqa: F841
+    start = time.perf_counter()
+    for _ in range(iterations):
+        if cold:
+            db.expunge_all()
+        fn(db, value)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=20000)
+    args = parser.parse_args()
+
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    SessionFactory = sessionmaker(bind=engine, expire_on_commit=False)
+    with SessionFactory() as db:
+        seed(db)
+
+    print(f"{'busca':<22}{'cenário':<10}{'antes (us)':>12}{'depois (us)':>13}")
+    for name, before, after, value in LOOKUPS:
+        for cold in (True, False):
+            with SessionFactory() as db:
+                # aquece o cache de compilação dos dois formatos
+                timed(db, before, value, 100, cold)
+                timed(db, after, value, 100, cold)
+                old = timed(db, before, value, args.iterations, cold)
+                new = timed(db, after, value, args.iterations, cold)
+            scenario = "frio" if cold else "repetido"
+            print(f"{name:<22}{scenario:<10}{old:>12.1f}{new:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
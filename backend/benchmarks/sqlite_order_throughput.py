@@ -0,0 +1,154 @@
+"""
+Benchmark de vazão de pedidos no SQLite.
+
+Simula garçons lançando pedidos em paralelo (uma thread e uma sessão por
+garçom, cada pedido em sua própria transação via ``order_crud.create_order``)
+enquanto outras threads varrem os pedidos como os relatórios fazem, e
+compara o SQLite padrão com o perfil de produção de
+``app.core.sqlite_profile``.
+
+Uso (a partir de ``backend/``):
+
+    python -m benchmarks.sqlite_order_throughput --workers 16 --orders 50 --readers 4
+"""
+
+import argparse
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+from sqlalchemy import create_engine, func, select  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+from sqlalchemy.orm import sessionmaker  # noqa: E402
+
+import app.models  # noqa: E402,F401
+from app.core.config import Settings  # noqa: E402
+from app.core.sqlite_profile import configure_sqlite_engine  # noqa: E402
+from app.crud import order as order_crud  # noqa: E402
+from app.db import Base  # noqa: E402
+from app.models.category import Category  # noqa: E402
+from app.models.order import Order  # noqa: E402
+from app.models.order_item import OrderItem  # noqa: E402
+from app.models.product import Product  # noqa: E402
+from app.models.table import Table  # noqa: E402
+from app.schemas.order import OrderCreate  # noqa: E402
+from app.schemas.order_item import OrderItemCreate  # noqa: E402
+
+
+def build_engine(path: str, profile: bool, workers: int):
+    engine = create_engine(
+        f"sqlite:///{path}",
+        connect_args={"check_same_thread": False},
+        pool_size=workers,
+        max_overflow=0,
+    )
+    if profile:
+        configure_sqlite_engine(engine, Settings(), write_lock=threading.Lock())
+    Base.metadata.create_all(bind=engine)
+    return engine
+
+
+def seed(SessionFactory, workers: int) -> list[int]:
+    """Cria um produto com estoque de sobra e uma mesa por garçom."""
+    with SessionFactory() as db:
+        category = Category(name="Bebidas")
+        db.add(category)
+        db.flush()
+        db.add(
+            Product(
+                name="Água",
+                price=3.5,
+                category_id=category.id,
+                stock_quantity=10_000_000,
+            )
+        )
+        tables = [Table(name=f"Mesa {i}", created_by="bench") for i in range(workers)]
+        db.add_all(tables)
+        db.commit()
+        return [table.id for table in tables]
+
+
+def run(profile: bool, workers: int, orders: int, readers: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(os.path.join(tmp, "bench.db"), profile, workers)
+        SessionFactory = sessionmaker(bind=engine, expire_on_commit=False)
+        table_ids = seed(SessionFactory, workers)
+        order = OrderCreate(
+            items=[OrderItemCreate(product_id=1, quantity=1, unit_price=3.5)]
+        )
+        errors = 0
+        errors_lock = threading.Lock()
+        scans = 0
+        done = threading.Event()
+        report_query = (
+            select(Order.table_id, func.sum(OrderItem.quantity * OrderItem.unit_price))
+            .join(OrderItem, OrderItem.order_id == Order.id)
+            .group_by(Order.table_id)
+        )
+
+        def waiter(table_id: int) -> None:
+            nonlocal errors
+            with SessionFactory() as db:
+                for _ in range(orders):
+                    try:
+                        order_crud.create_order(db, order, table_id, "bench")
+                        # A CRUD só faz flush: cada pedido é uma transação
+                        db.commit()
+                    except OperationalError:
+                        db.rollback()
+                        with errors_lock:
+                            errors += 1
+
+        def reader() -> None:
+            nonlocal scans
+            with SessionFactory() as db:
+                while not done.is_set():
+                    db.execute(report_query).all()
+                    db.rollback()
+                    with errors_lock:
+                        scans += 1
+
+        with ThreadPoolExecutor(max_workers=readers or 1) as report_pool:
+            report_jobs = [report_pool.submit(reader) for _ in range(readers)]
+            start = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(waiter, table_ids))
+            elapsed = time.perf_counter() - start
+            done.set()
+            for job in report_jobs:
+                job.result()
+        engine.dispose()
+
+    total = workers * orders
+    return {
+        "profile": "producao" if profile else "padrao",
+        "orders": total - errors,
+        "errors": errors,
+        "seconds": round(elapsed, 3),
+        "orders_per_s": round((total - errors) / elapsed, 1),
+        "report_scans": scans,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--orders", type=int, default=50, help="pedidos por garçom")
+    parser.add_argument(
+        "--readers", type=int, default=4, help="threads simulando relatórios"
+    )
+    args = parser.parse_args()
+
+    for profile in (False, True):
+        print(run(profile, args.workers, args.orders, args.readers))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Fixtures compartilhadas dos testes que rodam a aplicação em processo.
+
+O ambiente é configurado antes de importar ``app``: banco SQLite em um
+arquivo temporário (criado no startup) e orçamento de SQL obrigatório,
+para que um N+1 novo derrube o teste com ``QueryBudgetExceeded``.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+_DB_DIR = tempfile.mkdtemp(prefix="quiosque-tests-")
+
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+os.environ.setdefault("ALGORITHM", "HS256")
+os.environ.setdefault("ACCESS_TOKEN_EXPIRE_MINUTES", "30")
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{_DB_DIR}/test.db")
+os.environ.setdefault("SQL_QUERY_BUDGET_ENFORCE", "true")
+
+import pytest  # noqa: E402
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app import app  # noqa: E402
+from app.db import SessionLocal  # noqa: E402
+
+
+def ok(response, status_code=200):
+    """Confere o status e devolve o JSON da resposta (None sem corpo)."""
+    assert response.status_code == status_code, response.text
+    return response.json() if response.content else None
+
+
+def unique_suffix() -> str:
+    # Os testes dividem o banco da sessão: nomes únicos por chamada
+    return datetime.now().strftime("%H%M%S%f")
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def admin_headers(client):
+    response = client.post(
+        "/login/", data={"username": "admin", "password": "admin123"}
+    )
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+@pytest.fixture
+def db(client):
+    # Depende do client: as tabelas são criadas no startup da aplicação
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def make_product(client, admin_headers):
+    """Cria produtos numa categoria nova: ``make_product(stock_quantity=2)``."""
+    category = ok(
+        client.post(
+            "/categories/",
+            json={"name": f"Categoria {unique_suffix()}"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+
+    def make(name="Produto", price=5.0, stock_quantity=10):
+        return ok(
+            client.post(
+                "/products/",
+                json={
+                    "name": name,
+                    "price": price,
+                    "category_id": category["id"],
+                    "stock_quantity": stock_quantity,
+                },
+                headers=admin_headers,
+            ),
+            201,
+        )
+
+    return make
+
+
+@pytest.fixture
+def product(make_product):
+    return make_product()
+
+
+@pytest.fixture
+def seeded_table(client, admin_headers):
+    """Mesa aberta, criada pelo admin."""
+    return ok(
+        client.post(
+            "/tables/", json={"name": f"Mesa {unique_suffix()}"}, headers=admin_headers
+        ),
+        201,
+    )
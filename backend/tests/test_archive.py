@@ -0,0 +1,84 @@
+"""
+Arquivamento de mesas fechadas e relatórios sobre quente + arquivo.
+"""
+
+from datetime import date, datetime
+
+from sqlalchemy import func, select
+
+from app.crud import report as report_crud
+from app.models.archive import archive_orders, archive_tables
+from app.models.category import Category
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.print_queue import PrintQueue, PrintQueueStatus
+from app.models.product import Product
+from app.models.table import Table
+
+CLOSED_AT = datetime(2015, 6, 1, 23, 0)
+REPORT_DATE = date(2015, 6, 1)
+
+
+def _closed_table(product, name, print_status):
+    order = Order(
+        created_by="admin",
+        created_at=CLOSED_AT,
+        items=[OrderItem(product=product, quantity=2, unit_price=15)],
+    )
+    order.recalculate_totals()
+    order.payment = Payment(
+        method="cash", status="paid", amount=30, amount_paid=30, created_at=CLOSED_AT
+    )
+    table = Table(
+        name=name,
+        created_by="admin",
+        created_at=CLOSED_AT,
+        is_closed=True,
+        closed_at=CLOSED_AT,
+        closed_business_date=REPORT_DATE,
+        orders=[order],
+    )
+    table.print_queue_items.append(
+        PrintQueue(type="table", content="Conta", status=print_status, order=order)
+    )
+    return table
+
+
+def test_archive_moves_closed_tables_and_reports_still_see_them(
+    db, client, admin_headers
+):
+    product = Product(name="Moqueca", price=15, category_rel=Category(name="Pratos"))
+    archived = _closed_table(product, "Mesa antiga", PrintQueueStatus.PRINTED)
+    # Impressão pendente: a mesa fica na tabela quente
+    pending = _closed_table(product, "Mesa pendente", PrintQueueStatus.PENDING)
+    db.add_all([archived, pending])
+    db.commit()
+    archived_id, pending_id = archived.id, pending.id
+
+    response = client.post(
+        "/system/archive?older_than_days=3650&batch_size=1", headers=admin_headers
+    )
+    assert response.status_code == 200, response.text
+    run = response.json()
+    assert run["done"] is True
+    assert run["moved"] == {
+        "print_queue": 1,
+        "payments": 1,
+        "order_items": 1,
+        "orders": 1,
+        "tables": 1,
+    }
+
+    db.expire_all()
+    assert db.get(Table, archived_id) is None
+    assert db.get(Table, pending_id) is not None
+    archived_rows = (
+        select(func.count()).where(archive_tables.c.id == archived_id),
+        select(func.count()).where(archive_orders.c.table_id == archived_id),
+    )
+    assert [db.scalar(query) for query in archived_rows] == [1, 1]
+
+    daily = report_crud.get_daily_sales_report(db, REPORT_DATE.isoformat())
+    assert (daily["total_orders"], float(daily["total_revenue"])) == (2, 60.0)
+    assert daily["top_products"][0]["quantity_sold"] == 4
@@ -0,0 +1,53 @@
+"""
+Dia comercial (``business_date``/``business_hour``) e relatórios do dia.
+"""
+
+from datetime import date, datetime
+
+from app.core import business_day
+from app.crud import report as report_crud
+from app.models.category import Category
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.product import Product
+from app.models.table import Table
+
+
+def test_business_date_respects_timezone_and_cutoff(monkeypatch):
+    monkeypatch.setattr(business_day.settings, "BUSINESS_DAY_CUTOFF_HOUR", 4)
+    # America/Sao_Paulo é UTC-3: 05:30 UTC são 02:30 locais, antes do corte
+    assert business_day.business_date(datetime(2020, 2, 15, 5, 30)) == date(2020, 2, 14)
+    assert business_day.business_hour(datetime(2020, 2, 15, 5, 30)) == 2
+    assert business_day.business_date(datetime(2020, 2, 15, 7, 30)) == date(2020, 2, 15)
+
+
+def test_late_night_orders_stay_in_the_same_business_day(db):
+    product = Product(name="Caipirinha", price=10, category_rel=Category(name="Drinks"))
+    # Mesa aberta às 22h locais e pedidos às 23h e à 01h (já no dia seguinte)
+    table = Table(
+        name="Mesa madrugada",
+        created_by="admin",
+        created_at=datetime(2020, 2, 15, 1, 0),
+    )
+    for created_at in (datetime(2020, 2, 15, 2, 0), datetime(2020, 2, 15, 4, 0)):
+        order = Order(
+            created_by="admin",
+            created_at=created_at,
+            items=[OrderItem(product=product, quantity=1, unit_price=10)],
+        )
+        order.recalculate_totals()
+        table.orders.append(order)
+    db.add(table)
+    db.commit()
+
+    assert table.business_date == date(2020, 2, 14)
+    assert [order.business_date for order in table.orders] == [date(2020, 2, 14)] * 2
+    assert [order.business_hour for order in table.orders] == [23, 1]
+
+    daily = report_crud.get_daily_sales_report(db, "2020-02-14")
+    assert (daily["total_orders"], float(daily["total_revenue"])) == (2, 20.0)
+    assert report_crud.get_daily_sales_report(db, "2020-02-15")["total_orders"] == 0
+
+    hourly = report_crud.get_hourly_sales_report(db, "2020-02-14")
+    by_hour = {data["hour"]: data["orders_count"] for data in hourly["hourly_data"]}
+    assert (by_hour["23:00"], by_hour["01:00"]) == (1, 1)
@@ -0,0 +1,78 @@
+"""
+Feed de alterações (outbox transacional) e leitura por cursor.
+"""
+
+from tests.conftest import ok, unique_suffix
+
+
+def test_writes_append_events_in_the_same_transaction(
+    client, admin_headers, make_product
+):
+    cursor = ok(client.get("/changes/cursor", headers=admin_headers))["cursor"]
+
+    product = make_product(name="Pastel", price=8.0, stock_quantity=2)
+    table = ok(
+        client.post(
+            "/tables/", json={"name": f"Feed {unique_suffix()}"}, headers=admin_headers
+        ),
+        201,
+    )
+    orders_url = f"/tables/{table['id']}/orders"
+    item = {"product_id": product["id"], "quantity": 2, "unit_price": 8.0}
+    order = ok(
+        client.post(orders_url, json={"items": [item]}, headers=admin_headers), 201
+    )
+    # Sem estoque: a requisição falha e não deixa evento nenhum
+    response = client.post(orders_url, json={"items": [item]}, headers=admin_headers)
+    assert response.status_code == 400
+
+    feed = ok(client.get(f"/changes/?after={cursor}", headers=admin_headers))
+    events = [
+        (event["entity"], event["entity_id"], event["action"])
+        for event in feed["events"]
+    ]
+    assert events == [
+        ("product", product["id"], "created"),
+        ("table", table["id"], "created"),
+        ("order", order["id"], "created"),
+        ("product", product["id"], "updated"),
+        ("print_queue", events[4][1], "created"),
+    ]
+    assert feed["events"][3]["data"] == {"stock_quantity": 0, "is_active": False}
+    assert feed["cursor"] == feed["events"][-1]["id"]
+    assert not feed["has_more"]
+
+    # Paginação pelo cursor
+    page = ok(client.get(f"/changes/?after={cursor}&limit=2", headers=admin_headers))
+    assert page["has_more"] and page["cursor"] == feed["events"][1]["id"]
+    page = ok(
+        client.get(
+            f"/changes/?after={page['cursor']}&entity=order", headers=admin_headers
+        )
+    )
+    assert [event["entity_id"] for event in page["events"]] == [order["id"]]
+
+
+def test_user_and_client_events_are_only_for_administrators(client, admin_headers):
+    cursor = ok(client.get("/changes/cursor", headers=admin_headers))["cursor"]
+    username = f"garcom-feed-{unique_suffix()}"
+    user = {"username": username, "password": "garcom-2024", "role": "waiter"}
+    ok(client.post("/users/", json=user, headers=admin_headers), 201)
+    login = ok(
+        client.post("/login/", data={"username": username, "password": "garcom-2024"})
+    )
+    waiter_headers = {"Authorization": f"Bearer {login['access_token']}"}
+    table = ok(
+        client.post(
+            "/tables/", json={"name": f"Feed {unique_suffix()}"}, headers=admin_headers
+        ),
+        201,
+    )
+
+    feed = ok(client.get(f"/changes/?after={cursor}", headers=admin_headers))
+    assert [event["entity"] for event in feed["events"]] == ["user", "table"]
+    feed = ok(client.get(f"/changes/?after={cursor}", headers=waiter_headers))
+    assert [event["entity_id"] for event in feed["events"]] == [table["id"]]
+    for entity in ("user", "client"):
+        url = f"/changes/?after={cursor}&entity={entity}"
+        assert client.get(url, headers=waiter_headers).status_code == 403
@@ -0,0 +1,122 @@
+"""
+Credenciais de máquina (agentes de impressão) e tokens com escopo.
+"""
+
+from app.core.revocation import RevocationCache
+from app.crud import client as client_crud
+from app.db import SessionLocal
+from app.models.client import Client
+from tests.conftest import ok
+
+
+def test_agent_logs_in_with_hashed_secret_and_scoped_token(client, admin_headers, db):
+    created = ok(
+        client.post(
+            "/client/",
+            json={"client_id": "impressora-bar", "name": "Impressora do bar"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    secret = created["client_secret"]
+    stored = db.query(Client).filter_by(client_id="impressora-bar").one()
+    assert secret not in stored.client_secret_hash
+
+    bad = {"client_id": "impressora-bar", "client_secret": "errado"}
+    assert client.post("/client/login", json=bad).status_code == 401
+    login = ok(
+        client.post(
+            "/client/login",
+            json={"client_id": "impressora-bar", "client_secret": secret},
+        )
+    )
+    assert (login["role"], login["scopes"]) == ("agent", ["print_queue"])
+    assert "impressora-bar" in client_crud._credentials_cache
+
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    ok(client.get("/print-queue/pending-count", headers=headers))
+    ok(client.get("/print-queues/", headers=headers))
+    assert client.get("/tables/", headers=headers).status_code == 403
+
+    # Segredo rotacionado: o antigo deixa de valer na hora
+    ok(client.post(f"/client/{created['id']}/rotate-secret", headers=admin_headers))
+    old = {"client_id": "impressora-bar", "client_secret": secret}
+    assert client.post("/client/login", json=old).status_code == 401
+
+
+def test_cached_credentials_are_evicted_only_after_commit(client, admin_headers, db):
+    created = ok(
+        client.post(
+            "/client/",
+            json={"client_id": "impressora-caixa", "name": "Impressora do caixa"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    old_secret = created["client_secret"]
+
+    with SessionLocal() as admin_db:
+        client_crud.rotate_client_secret(admin_db, created["id"])
+        # Login neste processo antes do commit: o banco ainda tem o segredo
+        # antigo e ele volta para o cache
+        assert client_crud.authenticate_client(db, "impressora-caixa", old_secret)
+        admin_db.commit()
+
+    db.rollback()
+    assert client_crud.authenticate_client(db, "impressora-caixa", old_secret) is None
+    old = {"client_id": "impressora-caixa", "client_secret": old_secret}
+    assert client.post("/client/login", json=old).status_code == 401
+
+
+def _create_and_login(client, admin_headers, client_id):
+    created = ok(
+        client.post(
+            "/client/",
+            json={"client_id": client_id, "name": client_id},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    credentials = {"client_id": client_id, "client_secret": created["client_secret"]}
+    login = ok(client.post("/client/login", json=credentials))
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    ok(client.get("/print-queue/pending-count", headers=headers))
+    return created, headers
+
+
+def test_deactivation_revokes_issued_tokens(client, admin_headers, db):
+    created, headers = _create_and_login(client, admin_headers, "impressora-velha")
+    # Outro worker, iniciado antes da desativação
+    other_worker = RevocationCache()
+    other_worker.load(db)
+
+    url = f"/client/{created['id']}"
+    ok(client.put(url, json={"is_active": False}, headers=admin_headers))
+    assert client.get("/print-queue/pending-count", headers=headers).status_code == 401
+    db.rollback()
+    assert other_worker.sync(db) >= 1
+    assert other_worker.is_revoked("client", created["id"], 1)
+
+    # Reativar não devolve a validade aos tokens antigos
+    ok(client.put(url, json={"is_active": True}, headers=admin_headers))
+    assert client.get("/print-queue/pending-count", headers=headers).status_code == 401
+
+
+def test_secret_rotation_and_deletion_revoke_issued_tokens(client, admin_headers):
+    created, headers = _create_and_login(client, admin_headers, "impressora-cozinha")
+
+    rotated = ok(
+        client.post(f"/client/{created['id']}/rotate-secret", headers=admin_headers)
+    )
+    assert client.get("/print-queue/pending-count", headers=headers).status_code == 401
+
+    credentials = {
+        "client_id": "impressora-cozinha",
+        "client_secret": rotated["client_secret"],
+    }
+    login = ok(client.post("/client/login", json=credentials))
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    ok(client.get("/print-queue/pending-count", headers=headers))
+
+    ok(client.delete(f"/client/{created['id']}", headers=admin_headers))
+    assert client.get("/print-queue/pending-count", headers=headers).status_code == 401
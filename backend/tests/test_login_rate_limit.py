@@ -0,0 +1,47 @@
+"""
+Limite de tentativas de login (token bucket) antes do bcrypt.
+"""
+
+from app.api import auth
+from app.core import rate_limit
+
+
+def test_login_burst_gets_429_without_hashing(client, monkeypatch):
+    limiter = rate_limit.LoginRateLimiter(rate_limit.MemoryBuckets(max_keys=100))
+    monkeypatch.setattr(auth, "login_rate_limiter", limiter)
+    monkeypatch.setattr(rate_limit.settings, "LOGIN_RATE_LIMIT_BURST", 2)
+    monkeypatch.setattr(rate_limit.settings, "LOGIN_RATE_LIMIT_PER_MINUTE", 1.0)
+    checks = []
+
+    async def counting_verify(plain_password, hashed_password):
+        checks.append(plain_password)
+        return False
+
+    monkeypatch.setattr(auth, "verify_password_async", counting_verify)
+
+    statuses = [
+        client.post(
+            "/login/", data={"username": "admin", "password": "chute"}
+        ).status_code
+        for _ in range(4)
+    ]
+
+    assert statuses == [401, 401, 429, 429]
+    assert len(checks) == 2
+    # Outro usuário no mesmo IP tem o próprio balde
+    response = client.post("/login/", data={"username": "outro", "password": "x"})
+    assert response.status_code == 401
+    assert limiter.snapshot()["rejected"] == {"user_ip": 2, "ip": 0}
+
+
+def test_rejected_login_reports_retry_after(client, monkeypatch):
+    limiter = rate_limit.LoginRateLimiter(rate_limit.MemoryBuckets(max_keys=100))
+    monkeypatch.setattr(auth, "login_rate_limiter", limiter)
+    monkeypatch.setattr(rate_limit.settings, "LOGIN_IP_RATE_LIMIT_BURST", 1)
+    monkeypatch.setattr(rate_limit.settings, "LOGIN_IP_RATE_LIMIT_PER_MINUTE", 6.0)
+
+    client.post("/login/", data={"username": "a", "password": "x"})
+    response = client.post("/login/", data={"username": "b", "password": "x"})
+
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "10"
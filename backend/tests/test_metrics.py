@@ -0,0 +1,69 @@
+"""
+Scrape local do /metrics, em processo único e com vários workers.
+"""
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from prometheus_client.parser import text_string_to_metric_families
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+
+def _samples(text):
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(text)
+        for sample in family.samples
+    }
+
+
+def test_scrape_exposes_request_and_business_metrics(client, admin_headers):
+    assert client.get("/users/admin", headers=admin_headers).status_code == 200
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    samples = _samples(response.text)
+
+    route = (("method", "GET"), ("route", "/users/{username}"), ("status", "200"))
+    assert samples[("http_request_duration_seconds_count", route)] >= 1
+    assert samples[("http_request_db_statements_count", route[1:2])] >= 1
+    login = (("kind", "user"), ("result", "success"))
+    assert samples[("login_attempts_total", login)] >= 1
+    # A requisição do scrape está em andamento
+    assert samples[("http_requests_in_progress", ())] >= 1
+    assert ("db_pool_connections_in_use", (("pool", "primary"),)) in samples
+    assert ("orders_created_total", ()) in samples
+    assert ("print_queue_pending", ()) in samples
+    assert ("print_queue_oldest_pending_age_seconds", ()) in samples
+
+
+def test_multiprocess_scrape_sums_workers(tmp_path):
+    # Importar app.core carrega a aplicação: mesmo ambiente dos testes
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    worker = (
+        "from app.core import metrics\n"
+        "metrics.LOGIN_ATTEMPTS.labels('user', 'success').inc()\n"
+        "metrics.ORDERS_CREATED.inc(2)\n"
+    )
+    for _ in range(2):
+        subprocess.run(
+            [sys.executable, "-c", worker], env=env, cwd=BACKEND_DIR, check=True
+        )
+
+    scrape = "from app.core import metrics; print(metrics.generate_metrics().decode())"
+    output = subprocess.run(
+        [sys.executable, "-c", scrape],
+        env=env,
+        cwd=BACKEND_DIR,
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    samples = _samples(output)
+    login = (("kind", "user"), ("result", "success"))
+    assert samples[("login_attempts_total", login)] == 2
+    assert samples[("orders_created_total", ())] == 4
@@ -0,0 +1,65 @@
+"""
+Totais persistidos dos pedidos (``orders.total_amount``/``total_items``).
+"""
+
+from sqlalchemy import update
+
+from app.models.order import Order
+from tests.conftest import ok
+
+
+def test_totals_follow_item_changes_and_checker_repairs(
+    client, admin_headers, db, make_product, seeded_table
+):
+    product = make_product(name="Suco", price=7.5, stock_quantity=50)
+    orders_url = f"/tables/{seeded_table['id']}/orders"
+
+    order = ok(
+        client.post(
+            orders_url,
+            json={
+                "items": [
+                    {"product_id": product["id"], "quantity": 2, "unit_price": 7.5}
+                ]
+            },
+            headers=admin_headers,
+        ),
+        201,
+    )
+    assert (order["total_amount"], order["total_items"]) == (15.0, 2)
+
+    def apply(*actions):
+        return ok(
+            client.put(
+                f"{orders_url}/{order['id']}",
+                json={"items_actions": list(actions)},
+                headers=admin_headers,
+            )
+        )
+
+    order = apply(
+        {"action": "add", "product_id": product["id"], "quantity": 1, "unit_price": 4.0}
+    )
+    assert (order["total_amount"], order["total_items"]) == (19.0, 3)
+    first, added = order["items"]
+    order = apply({"action": "update", "item_id": first["id"], "quantity": 3})
+    assert (order["total_amount"], order["total_items"]) == (26.5, 4)
+    order = apply({"action": "remove", "item_id": added["id"]})
+    assert (order["total_amount"], order["total_items"]) == (22.5, 3)
+
+    check = ok(client.get("/system/order-totals", headers=admin_headers))
+    assert check == {"consistent": True, "mismatches": []}
+
+    db.execute(
+        update(Order)
+        .where(Order.id == order["id"])
+        .values(total_amount=0, total_items=0)
+    )
+    db.commit()
+    check = ok(client.get("/system/order-totals", headers=admin_headers))
+    assert [m["order_id"] for m in check["mismatches"]] == [order["id"]]
+
+    repair = ok(client.post("/system/order-totals/repair", headers=admin_headers))
+    assert repair == {"repaired": 1}
+    check = ok(client.get("/system/order-totals", headers=admin_headers))
+    assert check["consistent"]
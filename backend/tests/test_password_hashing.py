@@ -0,0 +1,49 @@
+"""
+bcrypt no pool de processos e refação do hash no login.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+from app.core import security
+from app.models.user import User
+
+
+def test_login_rehashes_password_when_cost_changes(client, db, monkeypatch):
+    db.add(
+        User(
+            username="caixa",
+            hashed_password=security.hash_password("segredo", rounds=5),
+            role="waiter",
+        )
+    )
+    db.commit()
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 4)
+
+    for password, status_code in (("errada", 401), ("segredo", 200)):
+        response = client.post(
+            "/login/", data={"username": "caixa", "password": password}
+        )
+        assert response.status_code == status_code, response.text
+
+    db.expire_all()
+    hashed_password = db.query(User).filter_by(username="caixa").one().hashed_password
+    assert hashed_password.startswith("$2b$04$")
+    assert security.verify_password("segredo", hashed_password)
+
+
+def test_pool_workers_do_not_import_the_app():
+    # O que cada processo do pool importa para rodar as funções
+    code = (
+        "import sys, bcrypt_worker; "
+        "print(sorted(m for m in ('app', 'loguru', 'fastapi') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).resolve().parents[1],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
@@ -0,0 +1,116 @@
+"""
+Orçamento de comandos SQL das rotas quentes.
+
+Os testes rodam com ``SQL_QUERY_BUDGET_ENFORCE=true`` (ver ``conftest.py``):
+uma rota que passe do ``@query_budget`` declarado falha com
+``QueryBudgetExceeded`` listando os comandos executados.
+"""
+
+from datetime import date
+
+from app.core.query_counter import count_queries
+from app.crud import report as report_crud
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.table import Table
+from app.models.user import User
+from tests.conftest import ok, unique_suffix
+
+
+def test_hot_routes_stay_within_budget(client, admin_headers, make_product):
+    suffix = unique_suffix()
+    products = [make_product(name=f"Produto {i}", stock_quantity=100) for i in range(3)]
+    room = ok(
+        client.post(
+            "/rooms/",
+            json={"number": f"Q{suffix}", "status": "available"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    table = ok(
+        client.post(
+            "/tables/",
+            json={"name": f"Mesa {suffix}", "room_id": room["id"]},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    items = [
+        {"product_id": product["id"], "quantity": 2, "unit_price": 5.0}
+        for product in products
+    ]
+
+    for _ in range(2):
+        ok(
+            client.post(
+                f"/tables/{table['id']}/orders",
+                json={"items": items},
+                headers=admin_headers,
+            ),
+            201,
+        )
+    ok(client.get("/tables/?is_closed=false", headers=admin_headers))
+    orders = ok(client.get(f"/tables/{table['id']}/orders", headers=admin_headers))
+    ok(
+        client.get(
+            f"/tables/{table['id']}/orders/{orders[0]['id']}", headers=admin_headers
+        )
+    )
+
+    first = ok(client.get("/print-queue/next", headers=admin_headers))
+    ok(client.put(f"/print-queue/{first['id']}/mark-printed", headers=admin_headers))
+    second = ok(client.get("/print-queue/next", headers=admin_headers))
+    ok(
+        client.put(
+            f"/print-queue/{second['id']}/mark-error",
+            params={"error_message": "Sem papel"},
+            headers=admin_headers,
+        )
+    )
+    ok(client.get("/print-queue/pending-count", headers=admin_headers))
+
+    ok(
+        client.put(
+            f"/tables/{table['id']}/close",
+            json={"service_tax": True},
+            headers=admin_headers,
+        )
+    )
+
+    today = date.today().isoformat()
+    for path in (
+        f"/reports/daily-sales/{today}",
+        f"/reports/hourly-sales/{today}",
+        "/reports/waiter-commission",
+        "/reports/payment-methods",
+        "/reports/table-performance",
+        f"/rooms/{room['id']}/consumption-report?date={today}",
+    ):
+        ok(client.get(path, headers=admin_headers))
+
+
+def test_waiter_commission_queries_do_not_grow_with_tables(client, db):
+    def commission_queries() -> int:
+        with count_queries() as stats:
+            report_crud.get_waiter_commission_report(db)
+        db.rollback()
+        return stats.count
+
+    suffix = unique_suffix()
+    db.add(User(username=f"garcom{suffix}", hashed_password="x", role="waiter"))
+    db.commit()
+    baseline = commission_queries()
+
+    for i in range(5):
+        table = Table(name=f"Mesa {suffix}-{i}", created_by=f"garcom{suffix}")
+        order = Order(
+            created_by=f"garcom{suffix}",
+            items=[OrderItem(product_id=1, quantity=1, unit_price=1.0)],
+        )
+        order.recalculate_totals()
+        table.orders.append(order)
+        db.add(table)
+    db.commit()
+
+    assert commission_queries() <= baseline + 2
@@ -0,0 +1,222 @@
+"""
+Regressão de planos de consulta (SQLite ``EXPLAIN QUERY PLAN``).
+
+Um banco próprio é populado com um volume parecido com o de alguns meses
+de operação e cada consulta quente é executada de verdade; os SELECTs que
+ela emite (com os parâmetros reais) passam por ``EXPLAIN QUERY PLAN``. O
+teste falha se alguma tabela grande for lida por varredura completa
+(``SCAN <tabela>`` sem índice), sinal de índice removido ou de consulta
+que deixou de bater com ele.
+
+Os planos são conferidos sem estatísticas (como um banco recém-migrado)
+e depois de ``ANALYZE``.
+"""
+
+import re
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, event, insert, text
+from sqlalchemy.orm import sessionmaker
+
+import app.models  # noqa: F401
+from app.core.business_day import business_date
+from app.crud import print_queue as print_queue_crud
+from app.crud import report as report_crud
+from app.crud import table as table_crud
+from app.crud.order import get_orders_by_table
+from app.db import Base
+from app.models.category import Category
+from app.models.order import Order
+from app.models.order_item import OrderItem
+from app.models.payment import Payment
+from app.models.print_queue import PrintQueue
+from app.models.product import Product
+from app.models.room import Room
+from app.models.table import Table
+
+LARGE_TABLES = ("tables", "orders", "order_items", "payments", "print_queue")
+FULL_SCAN = re.compile(rf"^SCAN ({'|'.join(LARGE_TABLES)})$")
+
+DAYS = 90
+TABLES_PER_DAY = 40
+ORDERS_PER_TABLE = 3
+ITEMS_PER_ORDER = 3
+ROOMS = 50
+PRODUCTS = 100
+START = datetime(2026, 1, 1, 10, 0)
+REPORT_DATE = START + timedelta(days=DAYS // 2)
+# Primeira mesa do dia do relatório; as mesas com n % 4 == 0 vão para um quarto
+REPORT_TABLE_ID = TABLES_PER_DAY * (DAYS // 2) + 1
+REPORT_ROOM_ID = REPORT_TABLE_ID % ROOMS + 1
+
+
+def seed(connection) -> None:
+    connection.execute(insert(Category), [{"id": 1, "name": "Bebidas"}])
+    connection.execute(
+        insert(Product),
+        [
+            {"id": i, "name": f"Produto {i}", "price": 5.0, "category_id": 1}
+            for i in range(1, PRODUCTS + 1)
+        ],
+    )
+    connection.execute(
+        insert(Room),
+        [
+            {"id": i, "number": str(100 + i), "status": "occupied"}
+            for i in range(1, ROOMS + 1)
+        ],
+    )
+
+    tables, orders, items, payments, prints = [], [], [], [], []
+    for day in range(DAYS):
+        for n in range(TABLES_PER_DAY):
+            table_id = len(tables) + 1
+            opened = START + timedelta(days=day, minutes=10 * n)
+            # Só as mesas do último dia continuam abertas
+            is_closed = day < DAYS - 1
+            closed = opened + timedelta(hours=2) if is_closed else None
+            tables.append(
+                {
+                    "id": table_id,
+                    "name": f"Mesa {n}",
+                    "is_closed": is_closed,
+                    "created_by": f"garcom{n % 8}",
+                    "created_at": opened,
+                    "closed_at": closed,
+                    "closed_business_date": business_date(closed) if closed else None,
+                    "room_id": (table_id % ROOMS) + 1 if n % 4 == 0 else None,
+                }
+            )
+            for k in range(ORDERS_PER_TABLE):
+                order_id = len(orders) + 1
+                created = opened + timedelta(minutes=20 * k)
+                orders.append(
+                    {
+                        "id": order_id,
+                        "table_id": table_id,
+                        "status": "finished",
+                        "created_at": created,
+                        "created_by": f"garcom{n % 8}",
+                    }
+                )
+                items.extend(
+                    {
+                        "order_id": order_id,
+                        "product_id": (order_id + j) % PRODUCTS + 1,
+                        "quantity": 1 + j,
+                        "unit_price": 5.0,
+                    }
+                    for j in range(ITEMS_PER_ORDER)
+                )
+                payments.append(
+                    {
+                        "order_id": order_id,
+                        "method": "room_charge" if n % 4 == 0 else "cash",
+                        "status": "completed",
+                        "amount": 30.0,
+                        "amount_paid": 30.0,
+                        "created_at": created,
+                    }
+                )
+                prints.append(
+                    {
+                        "type": "order",
+                        "order_id": order_id,
+                        "table_id": table_id,
+                        "content": "...",
+                        # A fila real tem quase tudo impresso e poucos pendentes
+                        "status": "pending" if day == DAYS - 1 else "printed",
+                        "created_at": created,
+                    }
+                )
+
+    for model, rows in (
+        (Table, tables),
+        (Order, orders),
+        (OrderItem, items),
+        (Payment, payments),
+        (PrintQueue, prints),
+    ):
+        connection.execute(insert(model), rows)
+
+
+@pytest.fixture(scope="module", params=["sem_estatisticas", "analyze"])
+def plan_session(request, tmp_path_factory):
+    path = tmp_path_factory.mktemp("plans") / "plans.db"
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as connection:
+        seed(connection)
+        if request.param == "analyze":
+            connection.execute(text("ANALYZE"))
+
+    captured = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            captured.append((statement, parameters))
+
+    session = sessionmaker(bind=engine)()
+    yield session, captured
+    session.close()
+    engine.dispose()
+
+
+def full_scans(plan_session, fn, *args) -> list:
+    """Roda ``fn`` e devolve as varreduras completas dos SELECTs emitidos."""
+    session, captured = plan_session
+    captured.clear()
+    fn(session, *args)
+    session.rollback()
+    session.expunge_all()
+    assert captured, "a consulta não emitiu nenhum SELECT"
+
+    scans = []
+    connection = session.connection()
+    for statement, parameters in list(captured):
+        plan = connection.exec_driver_sql(
+            f"EXPLAIN QUERY PLAN {statement}", parameters
+        ).all()
+        for row in plan:
+            if FULL_SCAN.match(row.detail):
+                scans.append(f"{row.detail}\n    {' '.join(statement.split())}")
+    session.rollback()
+    return scans
+
+
+@pytest.mark.parametrize(
+    "fn, args",
+    [
+        pytest.param(
+            print_queue_crud.get_next_print_queue_item,
+            (),
+            id="get_next_print_queue_item",
+        ),
+        pytest.param(table_crud.get_tables, (False,), id="get_tables_open"),
+        pytest.param(
+            get_orders_by_table,
+            (REPORT_TABLE_ID,),
+            id="get_orders_by_table",
+        ),
+        pytest.param(
+            report_crud.get_daily_sales_report,
+            (business_date(REPORT_DATE).isoformat(),),
+            id="daily_sales",
+        ),
+        pytest.param(
+            report_crud.get_hourly_sales_report,
+            (business_date(REPORT_DATE).isoformat(),),
+            id="hourly_sales",
+        ),
+        pytest.param(
+            report_crud.get_room_consumption_report,
+            (REPORT_ROOM_ID, business_date(REPORT_DATE).isoformat()),
+            id="room_consumption",
+        ),
+    ],
+)
+def test_hot_queries_use_indexes(plan_session, fn, args):
+    scans = full_scans(plan_session, fn, *args)
+    assert not scans, "varredura completa em tabela grande:\n" + "\n".join(scans)
@@ -0,0 +1,64 @@
+"""
+Refresh tokens: renovação sem senha, rotação e revogação.
+"""
+
+from app.api import auth
+from app.core import security
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from tests.conftest import ok
+
+
+def test_refresh_rotates_tokens_and_detects_reuse(client, db, monkeypatch):
+    monkeypatch.setattr(security.settings, "BCRYPT_ROUNDS", 4)
+    db.add(
+        User(
+            username="tablet1",
+            hashed_password=security.hash_password("senha", rounds=4),
+            role="waiter",
+        )
+    )
+    db.commit()
+    login = ok(
+        client.post("/login/", data={"username": "tablet1", "password": "senha"})
+    )
+
+    async def no_bcrypt(*args):
+        raise AssertionError("refresh não pode usar bcrypt")
+
+    monkeypatch.setattr(auth, "verify_password_async", no_bcrypt)
+    first = login["refresh_token"]
+    renewed = ok(client.post("/login/refresh", json={"refresh_token": first}))
+    assert renewed["refresh_token"] != first
+    headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+    assert ok(client.get("/users/tablet1", headers=headers))["username"] == "tablet1"
+
+    # Token já usado: recusa e revoga também o que foi emitido a partir dele
+    for token in (first, renewed["refresh_token"]):
+        response = client.post("/login/refresh", json={"refresh_token": token})
+        assert response.status_code == 401
+    stored = db.query(RefreshToken).filter_by(username="tablet1").all()
+    assert [token.revoked_at is not None for token in stored] == [True, True]
+
+
+def test_logout_revokes_refresh_token(client, admin_headers, db):
+    ok(
+        client.post(
+            "/users/",
+            json={"username": "tablet2", "password": "tablet-2024", "role": "waiter"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    login = ok(
+        client.post("/login/", data={"username": "tablet2", "password": "tablet-2024"})
+    )
+
+    ok(
+        client.post("/login/logout", json={"refresh_token": login["refresh_token"]}),
+        204,
+    )
+    response = client.post(
+        "/login/refresh", json={"refresh_token": login["refresh_token"]}
+    )
+    assert response.status_code == 401
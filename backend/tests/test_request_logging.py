@@ -0,0 +1,63 @@
+"""
+Log de acesso: usuário sem o token e amostragem das rotas de polling.
+"""
+
+import pytest
+from loguru import logger
+
+from app import middleware_logging
+
+
+@pytest.fixture
+def access_log():
+    records = []
+
+    def sink(message):
+        record = message.record["message"]
+        if "'event': 'request'" in record:
+            records.append(record)
+
+    handler_id = logger.add(sink, format="{message}")
+    yield records
+    logger.remove(handler_id)
+
+
+def test_logs_username_instead_of_token(client, admin_headers, access_log):
+    response = client.get("/users/admin", headers=admin_headers)
+    assert response.status_code == 200, response.text
+
+    token = admin_headers["Authorization"].split()[1]
+    assert len(access_log) == 1
+    assert "'user': 'admin'" in access_log[0]
+    assert token not in access_log[0]
+
+
+def test_polling_routes_are_sampled(client, access_log, monkeypatch):
+    monkeypatch.setattr(middleware_logging.settings, "LOG_SAMPLE_RATE", 0.0)
+    for _ in range(5):
+        assert client.get("/health").status_code == 200
+    assert access_log == []
+
+    # Erros nas rotas amostradas sempre entram no log
+    assert client.get("/tables/").status_code == 401
+    assert len(access_log) == 1
+
+    monkeypatch.setattr(middleware_logging.settings, "LOG_SAMPLE_RATE", 1.0)
+    assert client.get("/health").status_code == 200
+    assert len(access_log) == 2
+
+
+def test_server_timing_breaks_down_the_request(
+    client, admin_headers, access_log, monkeypatch
+):
+    response = client.get("/users/admin", headers=admin_headers)
+    assert "server-timing" not in response.headers
+    assert "'handler_ms'" in access_log[0] and "'db_ms'" in access_log[0]
+
+    monkeypatch.setattr(middleware_logging.settings, "SERVER_TIMING", True)
+    response = client.get("/users/admin", headers=admin_headers)
+    metrics = [
+        metric.split(";")[0] for metric in response.headers["server-timing"].split(", ")
+    ]
+    assert metrics == ["auth", "handler", "serialize", "db", "total"]
+    assert 'desc="1 SQL"' in response.headers["server-timing"]
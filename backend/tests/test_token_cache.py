@@ -0,0 +1,56 @@
+"""
+Cache de tokens JWT verificados em ``get_current_user``.
+"""
+
+import asyncio
+import time
+from datetime import timedelta
+
+import pytest
+from fastapi import HTTPException, Request
+
+from app.core.security import create_access_token
+from app.core.token_cache import TokenCache
+from app.dependencies import get_current_user
+from app.schemas.auth import TokenData
+
+REQUEST = Request({"type": "http", "path": "/tables/"})
+
+
+def test_repeated_token_is_served_from_cache(monkeypatch):
+    cache = TokenCache(maxsize=8, ttl_seconds=60)
+    monkeypatch.setattr("app.dependencies.token_cache", cache)
+    token = create_access_token({"sub": "garcom", "uid": 1, "role": "waiter"})
+
+    first = asyncio.run(get_current_user(REQUEST, token))
+    second = asyncio.run(get_current_user(REQUEST, token))
+
+    assert first == second == TokenData(username="garcom", user_id=1, role="waiter")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_expired_and_invalid_tokens_are_not_served(monkeypatch):
+    cache = TokenCache(maxsize=8, ttl_seconds=60)
+    monkeypatch.setattr("app.dependencies.token_cache", cache)
+    expired = create_access_token(
+        {"sub": "garcom", "role": "waiter"}, expires_delta=timedelta(seconds=-1)
+    )
+    cache.put(expired, TokenData(username="garcom", role="waiter"), time.time() - 1)
+
+    for token in (expired, "not-a-jwt"):
+        with pytest.raises(HTTPException) as error:
+            asyncio.run(get_current_user(REQUEST, token))
+        assert error.value.status_code == 401
+    assert cache.snapshot()["size"] == 0
+
+
+def test_cache_is_bounded_lru():
+    cache = TokenCache(maxsize=2, ttl_seconds=60)
+    for token in ("a", "b"):
+        cache.put(token, TokenData(username=token, role="waiter"), None)
+    cache.get("a")  # "b" passa a ser o menos usado
+    cache.put("c", TokenData(username="c", role="waiter"), None)
+
+    assert cache.get("b") is None
+    assert [cache.get(token).username for token in ("a", "c")] == ["a", "c"]
+    assert cache.evictions == 1
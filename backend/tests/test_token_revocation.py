@@ -0,0 +1,75 @@
+"""
+Revogação de tokens por versão do usuário, sem consulta por requisição.
+"""
+
+from app.core.revocation import RevocationCache
+from app.models.user import User
+from tests.conftest import ok
+
+
+def _create_and_login(client, admin_headers, username):
+    ok(
+        client.post(
+            "/users/",
+            json={"username": username, "password": "garcom-2024", "role": "waiter"},
+            headers=admin_headers,
+        ),
+        201,
+    )
+    return ok(
+        client.post("/login/", data={"username": username, "password": "garcom-2024"})
+    )
+
+
+def test_role_change_revokes_tokens_until_refresh(client, admin_headers):
+    login = _create_and_login(client, admin_headers, "garcom-promovido")
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    ok(client.get("/users/garcom-promovido", headers=headers))
+
+    ok(
+        client.put(
+            "/users/garcom-promovido/role",
+            json={"role": "administrator"},
+            headers=admin_headers,
+        )
+    )
+    response = client.get("/users/garcom-promovido", headers=headers)
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Token has been revoked"
+
+    # O refresh emite um token com o papel e a versão novos
+    renewed = ok(
+        client.post("/login/refresh", json={"refresh_token": login["refresh_token"]})
+    )
+    headers = {"Authorization": f"Bearer {renewed['access_token']}"}
+    ok(client.get("/users/", headers=headers))
+
+
+def test_deletion_reaches_other_workers_through_the_feed(client, admin_headers, db):
+    login = _create_and_login(client, admin_headers, "garcom-demitido")
+    headers = {"Authorization": f"Bearer {login['access_token']}"}
+    user_id = db.query(User).filter_by(username="garcom-demitido").one().id
+    # Outro worker, iniciado antes da exclusão
+    other_worker = RevocationCache()
+    other_worker.load(db)
+    assert not other_worker.is_revoked("user", user_id, 1)
+
+    ok(client.delete("/users/garcom-demitido", headers=admin_headers), 204)
+
+    assert client.get("/tables/", headers=headers).status_code == 401
+    db.rollback()
+    assert other_worker.sync(db) >= 1
+    assert other_worker.is_revoked("user", user_id, 1)
+
+
+def test_recreated_username_does_not_revive_old_tokens(client, admin_headers):
+    old = _create_and_login(client, admin_headers, "garcom-recontratado")
+    ok(client.delete("/users/garcom-recontratado", headers=admin_headers), 204)
+
+    new = _create_and_login(client, admin_headers, "garcom-recontratado")
+    old_headers = {"Authorization": f"Bearer {old['access_token']}"}
+    assert (
+        client.get("/users/garcom-recontratado", headers=old_headers).status_code == 401
+    )
+    new_headers = {"Authorization": f"Bearer {new['access_token']}"}
+    ok(client.get("/users/garcom-recontratado", headers=new_headers))
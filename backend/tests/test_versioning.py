@@ -0,0 +1,113 @@
+"""
+Concorrência otimista (``version_id``, ``ETag``/``If-Match`` e 409).
+"""
+
+import pytest
+from fastapi import HTTPException
+from sqlalchemy.orm.exc import StaleDataError
+
+from app.crud.order import create_order
+from app.db import SessionLocal
+from app.models.product import Product
+from app.schemas.order import OrderCreate
+from tests.conftest import ok
+
+
+def test_if_match_rejects_stale_product_and_order_updates(
+    client, admin_headers, product, seeded_table
+):
+    url = f"/products/{product['id']}"
+    response = client.get(url, headers=admin_headers)
+    etag = response.headers["ETag"]
+    assert etag == f'"{product["version_id"]}"'
+
+    response = client.patch(
+        url, json={"price": 4.5}, headers={**admin_headers, "If-Match": etag}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+    # Outro admin ainda com o ETag antigo
+    stale = {**admin_headers, "If-Match": etag}
+    assert client.patch(url, json={"price": 5}, headers=stale).status_code == 409
+    response = client.patch(
+        f"{url}/decrease_stock", json={"quantity": 1}, headers=stale
+    )
+    assert response.status_code == 409
+    assert ok(client.get(url, headers=admin_headers))["stock_quantity"] == 10
+
+    order = ok(
+        client.post(
+            f"/tables/{seeded_table['id']}/orders",
+            json={
+                "items": [
+                    {"product_id": product["id"], "quantity": 1, "unit_price": 4.5}
+                ]
+            },
+            headers=admin_headers,
+        ),
+        201,
+    )
+    order_url = f"/tables/{seeded_table['id']}/orders/{order['id']}"
+    order_etag = client.get(order_url, headers=admin_headers).headers["ETag"]
+    response = client.put(
+        order_url,
+        json={"comment": "sem gelo"},
+        headers={**admin_headers, "If-Match": order_etag},
+    )
+    assert response.status_code == 200
+    response = client.put(
+        order_url,
+        json={"comment": "com gelo"},
+        headers={**admin_headers, "If-Match": order_etag},
+    )
+    assert response.status_code == 409
+
+
+def test_concurrent_write_loses_instead_of_overwriting(product):
+    with SessionLocal() as first, SessionLocal() as second:
+        mine = first.get(Product, product["id"])
+        theirs = second.get(Product, product["id"])
+
+        theirs.stock_quantity -= 3
+        second.commit()
+
+        mine.stock_quantity -= 1
+        with pytest.raises(StaleDataError):
+            first.commit()
+
+    with SessionLocal() as db:
+        assert db.get(Product, product["id"]).stock_quantity == 7
+
+
+def test_concurrent_orders_share_stock_without_conflict(make_product, seeded_table):
+    product = make_product(stock_quantity=3)
+
+    def order(quantity):
+        return OrderCreate(
+            items=[{"product_id": product["id"], "quantity": quantity, "unit_price": 5}]
+        )
+
+    with SessionLocal() as first, SessionLocal() as second:
+        # Os dois garçons leram o produto (estoque 3, mesma versão)
+        first.get(Product, product["id"])
+        first.commit()
+        second.get(Product, product["id"])
+        second.commit()
+
+        create_order(second, order(1), seeded_table["id"], created_by="admin")
+        second.commit()
+        # Versão desatualizada na sessão: a baixa atômica não conflita
+        create_order(first, order(1), seeded_table["id"], created_by="admin")
+        first.commit()
+
+        # Só sobrou 1: o pedido de 2 falha mesmo passando pela conferência
+        # feita com o estoque antigo da sessão
+        with pytest.raises(HTTPException) as exc_info:
+            create_order(second, order(2), seeded_table["id"], created_by="admin")
+        assert exc_info.value.status_code == 400
+        second.rollback()
+
+    with SessionLocal() as db:
+        stored = db.get(Product, product["id"])
+        assert (stored.stock_quantity, stored.is_active) == (1, True)